@@ -6,6 +6,7 @@ Purpose: Coreを上に被せる"加点オーバーレイ"。当面の優先度
 
 import json
 import yaml
+import hashlib
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
@@ -60,11 +61,15 @@ class MathGuardConfig:
 class TurboScreenEngine:
     """Turbo Screenエンジン"""
     
-    def __init__(self, config: TurboScreenConfig = None, math_guard: MathGuardConfig = None):
+    def __init__(self, config: TurboScreenConfig = None, math_guard: MathGuardConfig = None,
+                 dedup_index=None):
         self.config = config or TurboScreenConfig()
         self.math_guard = math_guard or MathGuardConfig()
         self.edge_facts: List[EdgeFact] = []
         self.contradiction_flags: Dict[str, bool] = {}
+        # 近似重複インデックス（任意：add(item_id, text)で重複判定）
+        self.dedup_index = dedup_index
+        self.duplicate_flags: Dict[str, str] = {}
         
     def load_edge_data(self, backlog_file: str, triage_file: str) -> None:
         """Edgeデータの読み込み"""
@@ -146,6 +151,7 @@ class TurboScreenEngine:
     def filter_eligible_edge_facts(self) -> List[EdgeFact]:
         """受付閾値を満たすEdge事実をフィルタリング"""
         eligible = []
+        seen_ids = set()
         
         for fact in self.edge_facts:
             # P≥60チェック
@@ -166,10 +172,32 @@ class TurboScreenEngine:
                 if fact.ttl_days > 7:
                     continue
             
+            # 近似重複チェック（フィルタ通過事実のみ、同一主張の多重計上を防止）
+            fact_id = self._fact_id(fact)
+            if fact_id in seen_ids or self._check_duplicate(fact_id, fact):
+                continue
+            seen_ids.add(fact_id)
+            
             eligible.append(fact)
         
         return eligible
     
+    def _fact_id(self, fact: EdgeFact) -> str:
+        """内容由来の事実ID（リスト位置に依存しない）"""
+        content = f"{fact.kpi}|{fact.value}|{fact.unit}|{fact.asof}|{fact.url}|{fact.verbatim}"
+        return f"{fact.tag}:{fact.kpi}:{hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]}"
+    
+    def _check_duplicate(self, fact_id: str, fact: EdgeFact) -> bool:
+        """近似重複チェック"""
+        if self.dedup_index is None:
+            return False
+        
+        match = self.dedup_index.add(fact_id, f"{fact.kpi} {fact.verbatim}")
+        if match:
+            self.duplicate_flags[fact_id] = match.canonical_id
+            return True
+        return False
+    
     def apply_turbo_adjustments(self, base_scores: List[Dict], eligible_facts: List[EdgeFact]) -> List[Dict]:
         """Turbo Screen調整を適用"""
         adjusted_scores = []
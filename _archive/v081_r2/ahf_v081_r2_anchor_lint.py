@@ -33,8 +33,12 @@ class LintResult:
 class AHFv081R2AnchorLint:
     """AHF v0.8.1-r2 AnchorLint"""
     
-    def __init__(self):
+    def __init__(self, independence_graph=None, trading_calendar=None):
         self.lint_rules = self._load_lint_rules()
+        # ソース独立性グラフ（任意：sources明細から独立源数を算出）
+        self.independence_graph = independence_graph
+        # 取引所カレンダー（任意：asof_dates明細から同日整合を算出）
+        self.trading_calendar = trading_calendar
         
     def _load_lint_rules(self) -> Dict[str, Any]:
         """Lintルール読み込み"""
@@ -143,9 +147,16 @@ class AHFv081R2AnchorLint:
     
     def _check_t1star_independence(self, item: Dict[str, Any]) -> bool:
         """T1*独立性チェック"""
-        # 実際の実装では、複数ソースの独立性を詳細チェック
+        # sources明細があれば独立性グラフのクラスタ数で判定
+        if self.independence_graph is not None and item.get("sources"):
+            return self._count_independent_sources(item) >= self.lint_rules["t1star_independence"]["min_sources"]
+        
         return item.get("two_sources", False) and item.get("independent", False)
     
+    def _count_independent_sources(self, item: Dict[str, Any]) -> int:
+        """独立ソース数（独立性グラフのクラスタ数）"""
+        return self.independence_graph.count_item_sources(item)
+    
     def lint_t1star_batch(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """T1*バッチLint実行"""
         results = []
@@ -180,13 +191,20 @@ class AHFv081R2AnchorLint:
         """T1*アイテムLint実行"""
         issues = []
         
-        # 二重ソースチェック
-        if not item.get("two_sources", False):
-            issues.append("T1*は二重ソース必須")
-        
-        # 独立性チェック
-        if not item.get("independent", False):
-            issues.append("T1*は独立性必須")
+        if self.independence_graph is not None and item.get("sources"):
+            # 独立源数チェック（独立性グラフ）
+            min_sources = self.lint_rules["t1star_independence"]["min_sources"]
+            independent_count = self._count_independent_sources(item)
+            if independent_count < min_sources:
+                issues.append(f"T1*は独立{min_sources}源以上必須: {independent_count}源")
+        else:
+            # 二重ソースチェック
+            if not item.get("two_sources", False):
+                issues.append("T1*は二重ソース必須")
+            
+            # 独立性チェック
+            if not item.get("independent", False):
+                issues.append("T1*は独立性必須")
         
         # 逐語長チェック
         quote_len = item.get("quote_len", 0)
@@ -252,8 +270,8 @@ class AHFv081R2AnchorLint:
         if item.get("ps_used", False):
             issues.append("P/S使用禁止")
         
-        # 同日チェック
-        if not item.get("same_day", False):
+        # 同日チェック（asof_dates明細があれば営業日解決で判定）
+        if not self._check_same_day(item):
             issues.append("同日データ必須")
         
         # 同ソースチェック
@@ -273,6 +291,17 @@ class AHFv081R2AnchorLint:
                 details={}
             )
     
+    def _check_same_day(self, item: Dict[str, Any]) -> bool:
+        """同日チェック（issuer/peerが同一営業日終値か）"""
+        if self.trading_calendar is not None and item.get("asof_dates"):
+            try:
+                return self.trading_calendar.same_day_aligned(item["asof_dates"])
+            except ValueError:
+                # カレンダー範囲外・解釈不能な日付は同日確認不可
+                return False
+        
+        return item.get("same_day", False)
+    
     def validate_anchor_format(self, anchor: str) -> bool:
         """アンカーフォーマット検証"""
         return anchor.startswith("#:~:text=")
@@ -293,7 +322,7 @@ class AHFv081R2AnchorLint:
         """価格Lint検証"""
         return (item.get("ev_used", False) and 
                 not item.get("ps_used", False) and 
-                item.get("same_day", False) and 
+                self._check_same_day(item) and 
                 item.get("same_source", False))
     
     def get_lint_rules(self) -> Dict[str, Any]:
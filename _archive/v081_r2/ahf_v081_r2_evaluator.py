@@ -42,9 +42,31 @@ class ForwardValuationData:
 class AHFv081R2Evaluator:
     """AHF v0.8.1-r2 4軸評価器"""
     
-    def __init__(self, ticker: str):
+    def __init__(self, ticker: str, contradiction_index=None, price_snapshot=None,
+                 peer_set: Optional[List[str]] = None, peer_engine=None, direction_model=None,
+                 threshold_registry=None):
         self.ticker = ticker
         self.evidence_items: List[Dict[str, Any]] = []
+        # 矛盾検出インデックス（任意：insert(evidence)でリコールイベントを返す）
+        self.contradiction_index = contradiction_index
+        # 価格スナップショット（任意：valuation_fields(ticker, peer_set)で③入力を返す）
+        self.price_snapshot = price_snapshot
+        self.peer_set = peer_set or []
+        # ピア中央値エンジン（任意：median_for(ticker)で共有グループ中央値を返す）
+        self.peer_engine = peer_engine
+        # 方向確率モデル（任意：direction_prob(ticker, axis, direction)で確率を返す）
+        self.direction_model = direction_model
+        # 閾値レジストリ（任意：get(section, key)で thresholds.yaml の値を返す）
+        self.threshold_registry = threshold_registry
+        
+    def add_evidence(self, item: Dict[str, Any]) -> List[Any]:
+        """証拠追加（矛盾検出インデックスがあれば挿入時に照合）"""
+        item.setdefault("ticker", self.ticker)
+        self.evidence_items.append(item)
+        
+        if self.contradiction_index is None:
+            return []
+        return self.contradiction_index.insert(item)
         
     def evaluate_4_axes(self) -> Dict[str, Any]:
         """4軸評価実行"""
@@ -312,6 +334,11 @@ class AHFv081R2Evaluator:
     
     def _get_valuation_data(self) -> Optional[ValuationData]:
         """バリュエーションデータ取得"""
+        if self.price_snapshot is not None:
+            fields = self.price_snapshot.valuation_fields(self.ticker, self.peer_set,
+                                                          peer_engine=self.peer_engine)
+            return ValuationData(**fields) if fields else None
+        
         # 実際の実装では、価格データソースから取得
         # ここではサンプルデータを返す
         return ValuationData(
@@ -376,6 +403,10 @@ class AHFv081R2Evaluator:
         if self._has_t1_evidence(axis):
             base_confidence += 0.25
         
+        # 上限のみクリップ（下限は従来どおり適用しない）
+        if self.threshold_registry is not None:
+            return min(base_confidence, self.threshold_registry.get("confidence", "clip_max", 95) / 100)
+        
         return min(base_confidence, 0.95)
     
     def _has_t1_evidence(self, axis: str) -> bool:
@@ -399,6 +430,11 @@ class AHFv081R2Evaluator:
     
     def _calculate_direction_prob(self, axis: str, direction: str) -> float:
         """方向確率計算"""
+        if self.direction_model is not None:
+            prob = self.direction_model.direction_prob(self.ticker, axis, direction)
+            if prob is not None:
+                return prob
+        
         # 実際の実装では、過去データから計算
         if direction == "up":
             return 0.6  # サンプル
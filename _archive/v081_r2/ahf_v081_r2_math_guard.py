@@ -37,12 +37,19 @@ class GuardResult:
 class AHFv081R2MathGuard:
     """AHF v0.8.1-r2 数理ガード"""
     
-    def __init__(self, guard_type: GuardType):
+    def __init__(self, guard_type: GuardType, panel=None, threshold_registry=None):
         self.guard_type = guard_type
+        # 閾値レジストリ（任意：math_guard_thresholds(guard_type)で thresholds.yaml 由来の閾値を返す）
+        self.threshold_registry = threshold_registry
         self.thresholds = self._load_thresholds()
+        # パネル一括判定（任意：check_rows(rows) で CORE/SCREEN のマスクと不合格行メッセージを返す）
+        self.panel = panel
         
     def _load_thresholds(self) -> Dict[str, Any]:
         """閾値読み込み"""
+        if self.threshold_registry is not None:
+            return self.threshold_registry.math_guard_thresholds(self.guard_type.value)
+        
         if self.guard_type == GuardType.CORE:
             return {
                 "gm_deviation_limit": 0.002,  # 0.2pp
@@ -64,6 +71,9 @@ class AHFv081R2MathGuard:
     
     def check_batch(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """バッチガードチェック"""
+        if self.panel is not None:
+            return self._check_batch_panel(data)
+        
         results = []
         summary = {
             "total_items": len(data),
@@ -93,6 +103,36 @@ class AHFv081R2MathGuard:
             "timestamp": datetime.now().isoformat()
         }
     
+    def _check_batch_panel(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """パネルモードのバッチガードチェック（メッセージは不合格行のみ）"""
+        # 現在の閾値（update_thresholds・レジストリ反映後）で判定
+        panel = self.panel.check_rows(data, {self.guard_type.value: self.thresholds})
+        failures = {f["index"]: f["issues"] for f in panel["failures"][self.guard_type.value]}
+        
+        results = []
+        for i in range(len(data)):
+            if i in failures:
+                results.append(GuardResult(
+                    status=GuardStatus.FAIL,
+                    message="; ".join(failures[i]),
+                    details={"issues": failures[i]}
+                ))
+            else:
+                results.append(GuardResult(
+                    status=GuardStatus.PASS,
+                    message="数理ガード通過",
+                    details={}
+                ))
+        
+        summary = panel["summary"][self.guard_type.value]
+        return {
+            "results": results,
+            "summary": {key: summary[key] for key in
+                        ("total_items", "pass_count", "fail_count", "warning_count", "pass_rate")},
+            "guard_type": self.guard_type.value,
+            "timestamp": datetime.now().isoformat()
+        }
+    
     def _check_item(self, item: Dict[str, Any]) -> GuardResult:
         """アイテムガードチェック"""
         issues = []
@@ -33,8 +33,10 @@ class S3LintResult:
 class AHFv081R2S3Lint:
     """AHF v0.8.1-r2 S3-Lint"""
     
-    def __init__(self):
+    def __init__(self, test_runner=None):
         self.lint_rules = self._load_lint_rules()
+        # S3テスト実行（任意：compile / is_valid / run_batch を持つオブジェクト）
+        self.test_runner = test_runner
         
     def _load_lint_rules(self) -> Dict[str, Any]:
         """Lintルール読み込み"""
@@ -78,8 +80,13 @@ class AHFv081R2S3Lint:
             "pass_rate": 0.0
         }
         
-        for item in data:
+        # テスト式の一括実行（合否・値は各アイテムへ書き戻し）
+        tests = self.test_runner.run_batch(data) if self.test_runner is not None else [None] * len(data)
+        
+        for item, test in zip(data, tests):
             result = self._lint_item(item)
+            if test is not None:
+                result.details["test"] = test
             results.append(result)
             
             if result.status == S3LintStatus.PASS:
@@ -152,6 +159,10 @@ class AHFv081R2S3Lint:
         if not formula:
             return False
         
+        # 実行可能性チェック（テスト実行が注入されていれば構文解析で判定）
+        if self.test_runner is not None:
+            return self.test_runner.is_valid(formula)
+        
         # 演算子チェック
         for op in allowed_operators:
             if op in formula:
@@ -42,10 +42,20 @@ class TurboScreenCard:
 class AHFv081R2TurboScreen:
     """AHF v0.8.1-r2 Turbo Screen"""
     
-    def __init__(self, ticker: str):
+    def __init__(self, ticker: str, dedup_index=None, threshold_registry=None):
         self.ticker = ticker
         self.cards: List[TurboScreenCard] = []
         self.status = TurboScreenStatus.PENDING
+        # 近似重複インデックス（任意：add(item_id, text)で重複判定）
+        self.dedup_index = dedup_index
+        # 閾値レジストリ（任意：get(section, key)で thresholds.yaml の値を返す）
+        self.threshold_registry = threshold_registry
+    
+    def _threshold(self, section: str, key: str, default: float) -> float:
+        """閾値取得（レジストリ未設定時は従来値）"""
+        if self.threshold_registry is None:
+            return default
+        return self.threshold_registry.get(section, key, default)
         
     def run_turbo_screen(self) -> Dict[str, Any]:
         """Turbo Screen実行"""
@@ -57,6 +67,8 @@ class AHFv081R2TurboScreen:
             "cards_approved": 0,
             "cards_rejected": 0,
             "cards_expired": 0,
+            "cards_duplicate": 0,
+            "duplicates": {},
             "total_adjustments": {},
             "data_gap": {},
             "gap_reason": {}
@@ -85,6 +97,13 @@ class AHFv081R2TurboScreen:
                     result["cards_rejected"] += 1
                     continue
                 
+                # 近似重複チェック（フィルタ通過カードのみ、同一主張の多重加点を防止）
+                canonical_id = self._check_duplicate(card)
+                if canonical_id:
+                    result["cards_duplicate"] += 1
+                    result["duplicates"][card.id] = canonical_id
+                    continue
+                
                 # カード承認
                 result["cards_approved"] += 1
                 
@@ -136,20 +155,28 @@ class AHFv081R2TurboScreen:
             )
         ]
     
+    def _check_duplicate(self, card: TurboScreenCard) -> Optional[str]:
+        """近似重複チェック（重複ならcanonical IDを返す）"""
+        if self.dedup_index is None:
+            return None
+        
+        match = self.dedup_index.add(f"{self.ticker}:{card.id}", f"{card.hypothesis} {card.verbatim}")
+        return match.canonical_id if match else None
+    
     def _check_acceptance_threshold(self, card: TurboScreenCard) -> bool:
         """受付閾値チェック"""
         # Edge採用 P≥60（CoreはP≥70）
         if card.evidence_level == "T1*":
-            threshold = 0.60
+            threshold = self._threshold("admission", "edge_p_min", 60) / 100
         else:
-            threshold = 0.70
+            threshold = self._threshold("admission", "core_p_min", 70) / 100
         
         return card.screen_score >= threshold
     
     def _check_ttl_expired(self, card: TurboScreenCard) -> bool:
         """TTL期限チェック"""
         # TTL≤14日
-        return card.ttl_days > 14
+        return card.ttl_days > self._threshold("admission", "ttl_days_max", 14)
     
     def _calculate_adjustments(self, card: TurboScreenCard) -> Dict[str, Any]:
         """調整計算"""
@@ -170,9 +197,9 @@ class AHFv081R2TurboScreen:
         
         # 確信度ブースト±10ppを1回（Coreは±5pp）
         if card.evidence_level == "T1*":
-            max_confidence_boost = 0.10
+            max_confidence_boost = self._threshold("confidence", "boost_pp_max", 10) / 100
         else:
-            max_confidence_boost = 0.05
+            max_confidence_boost = self._threshold("confidence", "core_boost_pp_max", 5) / 100
         
         adjustments["confidence_boost"] = min(card.confidence_boost, max_confidence_boost)
         
@@ -184,6 +211,16 @@ class AHFv081R2TurboScreen:
     def _check_math_guard_relaxed(self, card: TurboScreenCard) -> Dict[str, Any]:
         """数理ガード（緩和）チェック"""
         # GM乖離≤0.5pp、残差GP≤$12M、α5格子≤−$2.5M
+        if self.threshold_registry is not None:
+            guards = self.threshold_registry.math_guard_thresholds("screen")
+            return {
+                "gm_deviation_limit": guards["gm_deviation_limit"],
+                "residual_gp_limit": guards["residual_gp_limit"],
+                "alpha5_grid_limit": self.threshold_registry.get("guards", "alpha5_grid_min"),
+                "relaxed": True,
+                "threshold_version": self.threshold_registry.section_versions["guards"]
+            }
+        
         return {
             "gm_deviation_limit": 0.005,  # 0.5pp
             "residual_gp_limit": 12000000,  # $12M
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+AHF 4軸の式と星/色/DI帯（v0.8.1-r2評価器準拠）
+①LEC・②NES・③Disc%→色/Vmult・④FD%・DIを純関数として提供し、
+帯（カットオフ）をBandConfigで差し替え可能にする
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+VMULT = {"Green": 1.05, "Amber": 0.90, "Red": 0.75}
+
+# 軸ごとの入力キー（原因帰属用、NESは評価器出力の margin_term/health_term も含む）
+AXIS_INPUTS = {
+    "lec": ("g_fwd", "delta_opm_fwd", "dilution", "capex_intensity"),
+    "nes": ("next_q_qoq_pct", "guidance_revision_pct", "backlog_growth_pct",
+            "gm_actual", "gm_expected", "growth_pct", "gaap_opm", "margin_term", "health_term"),
+    "current_valuation": ("evs_actual_ttm", "evs_peer_median_ttm"),
+    "future_valuation": ("g_fwd", "opm_fwd", "evs_actual_today")
+}
+AXIS_INPUTS["decision"] = AXIS_INPUTS["lec"] + AXIS_INPUTS["nes"] + AXIS_INPUTS["current_valuation"]
+
+@dataclass(frozen=True)
+class BandConfig:
+    """星/色/DI帯（昇順カットオフ：★2〜★5の下限）"""
+    lec_cutoffs: Tuple[float, ...] = (0.03, 0.08, 0.15, 0.20)   # LEC ≥20pp→★5
+    nes_cutoffs: Tuple[float, ...] = (0.0, 2.0, 5.0, 8.0)       # NES ≥8→★5
+    fd_cutoffs: Tuple[float, ...] = (-0.15, -0.05, 0.05, 0.15)  # FD% ≥+15%→★5
+    disc_green_min: float = -0.10   # Disc% ≥ −10% → Green
+    disc_amber_min: float = -0.25   # Disc% > −25% → Amber
+    di_go: float = 0.55
+    di_watch: float = 0.32
+
+DEFAULT_BANDS = BandConfig()
+
+def star_from_cutoffs(value: float, cutoffs: Tuple[float, ...]) -> int:
+    """昇順カットオフから星（1〜len+1）"""
+    return 1 + bisect_right(cutoffs, value)
+
+def lec_score(g_fwd: float, delta_opm_fwd: float, dilution: float, capex_intensity: float) -> float:
+    """①LEC ≈ g_fwd + ΔOPM_fwd − Dilution − Capex_intensity"""
+    return g_fwd + delta_opm_fwd - dilution - capex_intensity
+
+def margin_term(gm_actual: float, gm_expected: float) -> float:
+    """Margin_term：GM+50bps=+1／±50bps=0／−50bps=−1"""
+    gm_diff = gm_actual - gm_expected
+    if gm_diff >= 0.005:
+        return 1.0
+    elif gm_diff >= -0.005:
+        return 0.0
+    return -1.0
+
+def health_term(growth_pct: float, gaap_opm: float) -> float:
+    """Health_term：Ro40≥40=+1／30–40=0／<30=−1"""
+    ro40 = growth_pct + gaap_opm
+    if ro40 >= 0.40:
+        return 1.0
+    elif ro40 >= 0.30:
+        return 0.0
+    return -1.0
+
+def nes_score(next_q_qoq: float, guidance_revision: float, backlog_growth: float,
+              margin: float, health: float) -> float:
+    """②NES = 0.5·q/q + 0.3·改定% + 0.2·受注% + Margin_term + Health_term"""
+    return 0.5 * next_q_qoq + 0.3 * guidance_revision + 0.2 * backlog_growth + margin + health
+
+def disc_pct(evs_actual_ttm: float, evs_peer_median_ttm: float) -> Optional[float]:
+    """③Disc% = (peer_median − actual) / peer_median"""
+    if not evs_peer_median_ttm:
+        return None
+    return (evs_peer_median_ttm - evs_actual_ttm) / evs_peer_median_ttm
+
+def valuation_color(disc: Optional[float], bands: BandConfig = DEFAULT_BANDS) -> Tuple[str, float]:
+    """③色/Vmult（データ不足はN/A・1.0）"""
+    if disc is None:
+        return "N/A", 1.0
+    if disc >= bands.disc_green_min:
+        color = "Green"
+    elif disc > bands.disc_amber_min:
+        color = "Amber"
+    else:
+        color = "Red"
+    return color, VMULT[color]
+
+def evs_fair_12m(g_fwd: float, opm_fwd: float) -> float:
+    """④EVS_fair_12m（rDCF帯10/8/6×の重み付き）"""
+    evs_fair = 15.0 + g_fwd * 2.0 + opm_fwd * 1.5
+    return evs_fair * 0.4 + evs_fair * 0.4 + evs_fair * 0.2
+
+def fd_pct(evs_fair: float, evs_actual_today: float) -> float:
+    """④FD% = (EVS_fair_12m − EVS_actual_today) / EVS_fair_12m"""
+    return (evs_fair - evs_actual_today) / evs_fair
+
+def di_score(lec_stars: int, nes_stars: int, vmult: float) -> float:
+    """DI = (0.6·s2 + 0.4·s1) · Vmult(③)"""
+    return (0.6 * nes_stars / 5 + 0.4 * lec_stars / 5) * vmult
+
+def decision_from_di(di: float, bands: BandConfig = DEFAULT_BANDS) -> str:
+    """DI→GO/WATCH/NO-GO"""
+    if di >= bands.di_go:
+        return "GO"
+    elif di >= bands.di_watch:
+        return "WATCH"
+    return "NO-GO"
+
+def evaluate_axes(inputs: Dict[str, float], bands: BandConfig = DEFAULT_BANDS) -> Dict[str, Dict[str, object]]:
+    """入力辞書から4軸＋DIを一括評価（_get_t1_valueキー準拠）"""
+    get = lambda key: inputs.get(key) or 0.0
+
+    lec = lec_score(get("g_fwd"), get("delta_opm_fwd"), get("dilution"), get("capex_intensity"))
+    nes = nes_score(get("next_q_qoq_pct"), get("guidance_revision_pct"), get("backlog_growth_pct"),
+                    margin_term(get("gm_actual"), get("gm_expected")),
+                    health_term(get("growth_pct"), get("gaap_opm")))
+    color, vmult = valuation_color(disc_pct(get("evs_actual_ttm"), get("evs_peer_median_ttm")), bands)
+
+    if get("g_fwd") and get("opm_fwd") and get("evs_actual_today"):
+        fd = fd_pct(evs_fair_12m(get("g_fwd"), get("opm_fwd")), get("evs_actual_today"))
+        future_stars = star_from_cutoffs(fd, bands.fd_cutoffs)
+    else:
+        fd, future_stars = None, 0
+
+    lec_stars = star_from_cutoffs(lec, bands.lec_cutoffs)
+    nes_stars = star_from_cutoffs(nes, bands.nes_cutoffs)
+    di = di_score(lec_stars, nes_stars, vmult)
+
+    return {
+        "lec": {"stars": lec_stars},
+        "nes": {"stars": nes_stars},
+        "current_valuation": {"color": color, "vmult": vmult},
+        "future_valuation": {"stars": future_stars, "fd_pct": fd},
+        "decision": {"di": di, "action": decision_from_di(di, bands)}
+    }
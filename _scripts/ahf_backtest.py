@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+AHF 帯・DIカットオフのバックテスト
+保存済みの評価入力と実現フォワードリターンから LEC/NES/Disc%/FD% の生値を一度だけ前計算し、
+BandConfig のグリッド各点では帯判定のみを行って ヒット率・ΔIRR(bp) を比較する
+"""
+
+import os
+import csv
+import sys
+import json
+import itertools
+from dataclasses import replace
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+from ahf_axis_bands import (BandConfig, DEFAULT_BANDS, lec_score, nes_score, margin_term, health_term, disc_pct,
+                            valuation_color, evs_fair_12m, fd_pct, star_from_cutoffs, di_score, decision_from_di)
+
+DEFAULT_HORIZON_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "_catalog",
+                                          "horizon_index.csv")
+
+# horizon_index.csv の decision 表記 → DI判定
+HORIZON_DECISIONS = {"Go": "GO", "保留": "WATCH", "No-Go": "NO-GO"}
+
+def annualize(total_return: float, years: float) -> float:
+    """期間リターン → 年率（IRR）"""
+    if years <= 0 or total_return <= -1:
+        return total_return
+    return (1 + total_return) ** (1 / years) - 1
+
+def outcome_source(row: Dict[str, Any]) -> Optional[str]:
+    """超過IRRの出所（realized＝実現リターン優先／estimate＝delta_irr_bp／None＝なし）"""
+    if row.get("forward_return") not in (None, ""):
+        return "realized"
+    if row.get("delta_irr_bp") not in (None, ""):
+        return "estimate"
+    return None
+
+def excess_irr(row: Dict[str, Any]) -> Optional[float]:
+    """超過IRR（forward_return − benchmark_return の年率化を優先、なければ delta_irr_bp）"""
+    source = outcome_source(row)
+    if source == "realized":
+        years = float(row.get("horizon_years") or 1.0)
+        return (annualize(float(row["forward_return"]), years) -
+                annualize(float(row.get("benchmark_return") or 0.0), years))
+    if source == "estimate":
+        return float(row["delta_irr_bp"]) / 10000
+    return None
+
+def load_horizon_index(path: str = DEFAULT_HORIZON_INDEX_PATH) -> List[Dict[str, Any]]:
+    """horizon_index.csv（ticker, asof, decision, delta_irr_bp）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [dict(row, decision=HORIZON_DECISIONS.get(row["decision"], row["decision"]))
+                for row in csv.DictReader(f)]
+
+def join_outcomes(rows: List[Dict[str, Any]], outcomes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """評価入力へΔIRR（ticker, asof 一致）を結合（horizon_index.csv はカタログの事前推定値で実現値ではない）"""
+    realized = {(o["ticker"], o["asof"]): o.get("delta_irr_bp") for o in outcomes}
+    return [dict(row, delta_irr_bp=realized[(row.get("ticker"), row.get("asof"))])
+            if (row.get("ticker"), row.get("asof")) in realized else row for row in rows]
+
+class BacktestDataset:
+    """前計算済みの生値配列（帯に依存しない部分）"""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        rows = [row for row in rows if excess_irr(row) is not None]
+        self.sources = [outcome_source(row) for row in rows]
+        self.tickers = [row.get("ticker") for row in rows]
+        self.asof = [row.get("asof") for row in rows]
+        self.excess = [excess_irr(row) for row in rows]
+        self.lec: List[float] = []
+        self.nes: List[float] = []
+        self.disc: List[Optional[float]] = []
+        self.fd: List[Optional[float]] = []
+        for row in rows:
+            # evaluate_axes と同じ欠測の扱い（0.0）
+            get = lambda key: row.get(key) or 0.0
+            self.lec.append(lec_score(get("g_fwd"), get("delta_opm_fwd"), get("dilution"), get("capex_intensity")))
+            self.nes.append(nes_score(get("next_q_qoq_pct"), get("guidance_revision_pct"), get("backlog_growth_pct"),
+                                      margin_term(get("gm_actual"), get("gm_expected")),
+                                      health_term(get("growth_pct"), get("gaap_opm"))))
+            self.disc.append(disc_pct(get("evs_actual_ttm"), get("evs_peer_median_ttm")))
+            if get("g_fwd") and get("opm_fwd") and get("evs_actual_today"):
+                self.fd.append(fd_pct(evs_fair_12m(get("g_fwd"), get("opm_fwd")), get("evs_actual_today")))
+            else:
+                self.fd.append(None)
+        self._stars: Dict[Tuple[str, Tuple[float, ...]], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.excess)
+
+    def stars(self, axis: str, cutoffs: Tuple[float, ...]) -> List[int]:
+        """軸の星（同一カットオフはグリッド間で再利用）"""
+        key = (axis, cutoffs)
+        if key not in self._stars:
+            values = getattr(self, axis)
+            self._stars[key] = [0 if v is None else star_from_cutoffs(v, cutoffs) for v in values]
+        return self._stars[key]
+
+class BacktestEngine:
+    """帯・DIカットオフのグリッドサーチ"""
+
+    def __init__(self, dataset: BacktestDataset):
+        self.dataset = dataset
+
+    def decisions(self, bands: BandConfig = DEFAULT_BANDS) -> Tuple[List[str], List[int]]:
+        """帯設定での判定と④★（evaluate_axes 準拠）"""
+        d = self.dataset
+        lec_stars = d.stars("lec", bands.lec_cutoffs)
+        nes_stars = d.stars("nes", bands.nes_cutoffs)
+        vmult = [valuation_color(disc, bands)[1] for disc in d.disc]
+        actions = [decision_from_di(di_score(l, n, v), bands) for l, n, v in zip(lec_stars, nes_stars, vmult)]
+        return actions, d.stars("fd", bands.fd_cutoffs)
+
+    def evaluate(self, bands: BandConfig = DEFAULT_BANDS) -> Dict[str, Any]:
+        """1設定の成績：ヒット率（GO→超過>0, NO-GO→超過≤0）と GO群のΔIRR(bp)"""
+        actions, future_stars = self.decisions(bands)
+        excess = self.dataset.excess
+        go = [e for a, e in zip(actions, excess) if a == "GO"]
+        nogo = [e for a, e in zip(actions, excess) if a == "NO-GO"]
+        fd_top = [e for s, e in zip(future_stars, excess) if s == 5]
+        hits = sum(1 for e in go if e > 0) + sum(1 for e in nogo if e <= 0)
+        called = len(go) + len(nogo)
+
+        return {
+            "go": len(go),
+            "watch": len(actions) - called,
+            "no_go": len(nogo),
+            "hit_rate": hits / called if called else None,
+            "delta_irr_bp": _mean_bp(go),
+            "no_go_delta_irr_bp": _mean_bp(nogo),
+            "universe_delta_irr_bp": _mean_bp(excess),
+            "fd_star5_delta_irr_bp": _mean_bp(fd_top)
+        }
+
+    def grid_search(self, grid: Dict[str, Sequence[Any]], base: BandConfig = DEFAULT_BANDS,
+                    rank_by: str = "delta_irr_bp", min_go: int = 1) -> List[Dict[str, Any]]:
+        """BandConfig フィールドの直積を評価 → rank_by 降順（GO数が min_go 未満は末尾）"""
+        names = list(grid)
+        results = []
+        for values in itertools.product(*(grid[name] for name in names)):
+            params = {name: tuple(v) if isinstance(v, list) else v for name, v in zip(names, values)}
+            bands = replace(base, **params)
+            if bands.di_watch > bands.di_go:
+                continue
+            results.append(dict(self.evaluate(bands), params=params))
+
+        def rank(result: Dict[str, Any]) -> Tuple[bool, float]:
+            value = result.get(rank_by)
+            return result["go"] >= min_go and value is not None, value if value is not None else float("-inf")
+
+        return sorted(results, key=rank, reverse=True)
+
+def _mean_bp(values: List[float]) -> Optional[float]:
+    """平均（bp）"""
+    return sum(values) / len(values) * 10000 if values else None
+
+def main():
+    """メイン実行"""
+    # --horizon-index: カタログの事前推定ΔIRRを結合（判定自体から作られた値なので検証用ではない）
+    use_horizon_index = "--horizon-index" in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != "--horizon-index"]
+    if len(args) < 1:
+        print("Usage: python ahf_backtest.py <history_json> [grid_json] [--horizon-index]")
+        sys.exit(1)
+
+    with open(args[0], 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+    if use_horizon_index:
+        rows = join_outcomes(rows, load_horizon_index())
+    grid = {"di_go": [0.50, 0.55, 0.60], "di_watch": [0.28, 0.32, 0.36]}
+    if len(args) > 1:
+        with open(args[1], 'r', encoding='utf-8') as f:
+            grid = json.load(f)
+
+    engine = BacktestEngine(BacktestDataset(rows))
+    results = engine.grid_search(grid)
+    sources = engine.dataset.sources
+
+    print(json.dumps({
+        "rows": len(engine.dataset),
+        "outcomes": {
+            "realized": sources.count("realized"),
+            "estimate": sources.count("estimate"),
+            "estimate_source": "horizon_index.csv（カタログ事前推定ΔIRR・実現値ではない）" if use_horizon_index else None
+        },
+        "baseline": engine.evaluate(),
+        "top": results[:10]
+    }, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
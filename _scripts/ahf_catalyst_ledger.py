@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+AHF カタリスト台帳（S4｜D）
+銘柄ごとの D(+) 台帳を catalyst id で保持し、追加・削除・ソース差し替え時に U / Umax を差分更新する
+A/I/H は (source, impact, horizon) 単位でキャッシュし、夜間のホライズン繰上げは H帯が変わった行のみ更新
+"""
+
+import sys
+import json
+import heapq
+import hashlib
+from dataclasses import dataclass, asdict
+from datetime import date, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+
+from ahf_v085_sb_processor import AHFv085Processor
+
+# ホライズン帯（残存月数の上限, ラベル）
+HORIZON_BUCKETS = [(6, "0-6M"), (12, "6-12M"), (24, "12-24M")]
+
+@dataclass
+class CatalystEntry:
+    """台帳1行（k:(A 認知, P 成立確率, I 影響, H 時点重み)）"""
+    catalyst_id: str
+    key: str
+    source: str
+    impact: str
+    probability: float
+    horizon: str
+    expected_date: Optional[str]
+    quote: str
+    A: float
+    I: float
+    H: float
+
+    @property
+    def weight(self) -> float:
+        """H·I·P（Umax項）"""
+        return self.H * self.I * self.probability
+
+    @property
+    def unrecognized(self) -> float:
+        """H·I·P·(1−A)（U項）"""
+        return self.weight * (1 - self.A)
+
+    def to_ledger_row(self) -> Dict[str, Any]:
+        """process_s4_d_only の d_ledger 形式"""
+        return {"k": self.key, "A": self.A, "P": self.probability, "I": self.I, "H": self.H, "quote": self.quote}
+
+def add_months(d: date, months: int) -> date:
+    """月加算（月末は丸め）"""
+    month_index = d.year * 12 + d.month - 1 + months
+    year, month = divmod(month_index, 12)
+    for day in (d.day, 30, 29, 28):
+        try:
+            return date(year, month + 1, day)
+        except ValueError:
+            continue
+    raise ValueError(f"日付計算不可: {d} + {months}M")
+
+def catalyst_id_for(catalyst: Dict[str, Any]) -> str:
+    """台帳キー（id → key → 同一性項目のハッシュ。ソース差し替え・H繰上げでは変わらない）"""
+    if catalyst.get("id") or catalyst.get("key"):
+        return catalyst.get("id") or catalyst["key"]
+    content = json.dumps({field: catalyst.get(field) for field in ("key", "impact", "expected_date", "quote")},
+                         sort_keys=True, ensure_ascii=False)
+    return "auto:" + hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+
+def horizon_for(expected: date, asof: date) -> str:
+    """残存期間 → ホライズン帯"""
+    for months, label in HORIZON_BUCKETS:
+        if expected <= add_months(asof, months):
+            return label
+    return HORIZON_BUCKETS[-1][1]
+
+def next_transition(expected: date, asof: date) -> Optional[date]:
+    """次にH帯が変わる日（これ以上繰り上がらなければNone）"""
+    boundaries = []
+    for months, _ in HORIZON_BUCKETS[:-1]:
+        # expected ≤ asof+months となる最初の日（月末丸めの前後を日単位で確定）
+        day = add_months(expected, -months) - timedelta(days=3)
+        while expected > add_months(day, months):
+            day += timedelta(days=1)
+        if day > asof:
+            boundaries.append(day)
+    return min(boundaries) if boundaries else None
+
+class CatalystLedger:
+    """銘柄別カタリスト台帳（U / Umax 差分更新）"""
+
+    def __init__(self, ticker: str, asof: Optional[str] = None, scorer=None):
+        self.ticker = ticker
+        self.asof = date.fromisoformat(asof) if asof else date.today()
+        # スコアラー（get_cognition_score / get_impact_score / get_time_weight）
+        self.scorer = scorer or AHFv085Processor()
+        self.entries: Dict[str, CatalystEntry] = {}
+        self.U = 0.0
+        self.Umax = 0.0
+        self._score_cache: Dict[Tuple[str, str, str], Tuple[float, float, float]] = {}
+        self._transitions: List[Tuple[int, str, int]] = []
+        self._versions: Dict[str, int] = {}
+        self.stats = {"score_hits": 0, "score_misses": 0, "rolled": 0}
+
+    def _scores(self, source: str, impact: str, horizon: str) -> Tuple[float, float, float]:
+        """A/I/H（キャッシュ）"""
+        key = (source, impact, horizon)
+        cached = self._score_cache.get(key)
+        if cached is not None:
+            self.stats["score_hits"] += 1
+            return cached
+        self.stats["score_misses"] += 1
+        scores = (self.scorer.get_cognition_score(source), self.scorer.get_impact_score(impact),
+                  self.scorer.get_time_weight(horizon))
+        self._score_cache[key] = scores
+        return scores
+
+    def upsert(self, catalyst: Dict[str, Any]) -> CatalystEntry:
+        """追加・更新（ソース差し替え含む）"""
+        catalyst_id = catalyst_id_for(catalyst)
+        previous = self.entries.get(catalyst_id)
+        expected = catalyst.get("expected_date", previous.expected_date if previous else None)
+        horizon = (horizon_for(date.fromisoformat(expected), self.asof) if expected
+                   else catalyst.get("horizon", previous.horizon if previous else "6-12M"))
+        source = catalyst.get("source", previous.source if previous else "")
+        impact = catalyst.get("impact", previous.impact if previous else "Mid")
+        A, I, H = self._scores(source, impact, horizon)
+
+        entry = CatalystEntry(
+            catalyst_id=catalyst_id,
+            key=catalyst.get("key", previous.key if previous else catalyst.get("id", "")),
+            source=source,
+            impact=impact,
+            probability=catalyst.get("probability", previous.probability if previous else 0.5),
+            horizon=horizon,
+            expected_date=expected,
+            quote=catalyst.get("quote", previous.quote if previous else "")[:25],  # 25語以内
+            A=A, I=I, H=H
+        )
+        self._replace(catalyst_id, entry)
+        return entry
+
+    def remove(self, catalyst_id: str) -> bool:
+        """削除"""
+        if catalyst_id not in self.entries:
+            return False
+        self._replace(catalyst_id, None)
+        return True
+
+    def _replace(self, catalyst_id: str, entry: Optional[CatalystEntry]):
+        """U / Umax の差分更新と繰上げ予定の登録"""
+        previous = self.entries.pop(catalyst_id, None)
+        if previous is not None:
+            self.U -= previous.unrecognized
+            self.Umax -= previous.weight
+        self._versions[catalyst_id] = self._versions.get(catalyst_id, 0) + 1
+
+        if entry is None:
+            return
+        self.entries[catalyst_id] = entry
+        self.U += entry.unrecognized
+        self.Umax += entry.weight
+        if entry.expected_date:
+            transition = next_transition(date.fromisoformat(entry.expected_date), self.asof)
+            if transition is not None:
+                heapq.heappush(self._transitions,
+                               (transition.toordinal(), catalyst_id, self._versions[catalyst_id]))
+        self._compact_transitions()
+
+    def _compact_transitions(self):
+        """旧版の繰上げ予定が有効件数の2倍を超えたら除去（ヒープの肥大化防止）"""
+        if len(self._transitions) <= 2 * len(self.entries) + 16:
+            return
+        self._transitions = [t for t in self._transitions
+                             if t[1] in self.entries and self._versions.get(t[1]) == t[2]]
+        heapq.heapify(self._transitions)
+
+    def roll_forward(self, asof: str) -> List[str]:
+        """夜間繰上げ：H帯が変わった行のみ更新 → 更新id"""
+        self.asof = date.fromisoformat(asof)
+        rolled = []
+        while self._transitions and self._transitions[0][0] <= self.asof.toordinal():
+            _, catalyst_id, version = heapq.heappop(self._transitions)
+            entry = self.entries.get(catalyst_id)
+            if entry is None or self._versions.get(catalyst_id) != version:
+                continue
+            if horizon_for(date.fromisoformat(entry.expected_date), self.asof) != entry.horizon:
+                rolled.append(catalyst_id)
+            self.upsert({"id": catalyst_id})
+        self.stats["rolled"] += len(rolled)
+        return rolled
+
+    def d_calculation(self) -> Dict[str, float]:
+        """d = U / Umax（0〜1）"""
+        U, Umax = max(self.U, 0.0), max(self.Umax, 0.0)
+        return {"U": U, "Umax": Umax, "d": max(0, min(1, U / Umax if Umax > 0 else 0))}
+
+    def d_ledger(self) -> List[Dict[str, Any]]:
+        """d_ledger（process_s4_d_only 形式）"""
+        return [entry.to_ledger_row() for entry in self.entries.values()]
+
+    def recompute(self) -> Dict[str, float]:
+        """全件再計算（差分更新の丸め誤差リセット）"""
+        self.U = sum(entry.unrecognized for entry in self.entries.values())
+        self.Umax = sum(entry.weight for entry in self.entries.values())
+        return self.d_calculation()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """保存形式"""
+        return {"ticker": self.ticker, "asof": self.asof.isoformat(),
+                "entries": [asdict(entry) for entry in self.entries.values()]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], scorer=None) -> "CatalystLedger":
+        """保存形式から復元（A/I/Hは再採点）"""
+        ledger = cls(data["ticker"], data.get("asof"), scorer)
+        for entry in data.get("entries", []):
+            catalyst = {k: v for k, v in entry.items() if k not in ("catalyst_id", "A", "I", "H")}
+            if catalyst.get("expected_date") is None:
+                catalyst.pop("expected_date")
+            ledger.upsert(dict(catalyst, id=entry["catalyst_id"]))
+        return ledger
+
+def load_ledger(path: str, ticker: str, asof: Optional[str] = None) -> CatalystLedger:
+    """台帳読み込み（なければ新規）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return CatalystLedger.from_dict(json.load(f))
+    except FileNotFoundError:
+        return CatalystLedger(ticker, asof)
+
+def save_ledger(path: str, ledger: CatalystLedger):
+    """台帳保存"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(ledger.to_dict(), f, indent=2, ensure_ascii=False)
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 4:
+        print("Usage: python ahf_catalyst_ledger.py <ledger_json> <ticker> <asof> [catalysts_json]")
+        sys.exit(1)
+
+    ledger = load_ledger(sys.argv[1], sys.argv[2], sys.argv[3])
+    rolled = ledger.roll_forward(sys.argv[3])
+    if len(sys.argv) > 4:
+        with open(sys.argv[4], 'r', encoding='utf-8') as f:
+            for catalyst in json.load(f):
+                ledger.upsert(catalyst)
+    save_ledger(sys.argv[1], ledger)
+
+    print(json.dumps({"rolled": rolled, "d_calculation": ledger.d_calculation(), "d_ledger": ledger.d_ledger()},
+                     indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+AHF 矛盾検出エンジン
+数値証拠を (ticker, kpi, period, unit) で索引し、挿入時に同一バケット内のみ照合して
+T1/T1*/T2間の矛盾を検出、リコール/降格イベントを発行する（contradictions_policy準拠）
+"""
+
+import re
+import sys
+import json
+from dataclasses import dataclass, asdict
+from enum import Enum
+from typing import Dict, List, Optional, Tuple, Any
+
+# 証拠階層の強さ（大きいほど強い）
+LEVEL_RANK = {"T1": 3, "T1*": 2, "T2": 1}
+TAG_KEYS = ["evidence_tag", "level", "tag"]
+
+class RecallAction(Enum):
+    """矛盾時のアクション"""
+    REJECT = "reject"        # 新規レコードは採用不可
+    RECALL = "recall"        # 既採用分を即リコール→UNCERTAIN
+    DOWNGRADE = "downgrade"  # T1*→T2降格（再計）
+
+@dataclass
+class RecallEvent:
+    """リコールイベント"""
+    action: RecallAction
+    target_id: str
+    conflicting_id: str
+    ticker: str
+    kpi: str
+    period: str
+    unit: str
+    old_tag: str
+    new_tag: str
+    reason: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書化"""
+        result = asdict(self)
+        result["action"] = self.action.value
+        return result
+
+class ContradictionIndex:
+    """(ticker, kpi, period, unit) 索引の矛盾検出器"""
+
+    def __init__(self, tolerance_rel: float = 0.01, tolerance_abs: float = 0.0):
+        self.tolerance_rel = tolerance_rel
+        self.tolerance_abs = tolerance_abs
+        self.buckets: Dict[Tuple[str, str, str, str], List[Dict[str, Any]]] = {}
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.events: List[RecallEvent] = []
+
+    def insert(self, evidence: Dict[str, Any]) -> List[RecallEvent]:
+        """証拠挿入（同一バケットのみ照合）"""
+        interval = parse_value(evidence.get("value"))
+        level = evidence_level(evidence)
+        if interval is None or level is None:
+            return []
+
+        key = bucket_key(evidence)
+        evidence_id = evidence.setdefault("id", f"{':'.join(key)}#{len(self.items)}")
+        self.items[evidence_id] = evidence
+        bucket = self.buckets.setdefault(key, [])
+
+        conflicting = [existing for existing in bucket
+                       if self._conflicts(interval, parse_value(existing.get("value")))]
+        if not conflicting:
+            bucket.append(evidence)
+            return []
+
+        # 同格以上の既存と矛盾した新規は採用不可（同格は双方とも採用不可）
+        blocking = [existing for existing in conflicting
+                    if LEVEL_RANK[evidence_level(existing)] >= LEVEL_RANK[level]]
+        events = [self._event(RecallAction.REJECT, evidence, existing, key, level, level)
+                  for existing in blocking]
+
+        for existing in conflicting:
+            existing_level = evidence_level(existing)
+            if existing_level == "T1*":
+                # T1*は矛盾検出で即T2降格（バケット上も同じレコードを降格後の階層で保持）
+                events.append(self._event(RecallAction.DOWNGRADE, existing, evidence, key, "T1*", "T2"))
+                set_level(existing, "T2")
+                existing["contradiction_flag"] = True
+            elif LEVEL_RANK[existing_level] <= LEVEL_RANK[level]:
+                # 同格または弱い既採用分は即リコール
+                events.append(self._event(RecallAction.RECALL, existing, evidence, key,
+                                          existing_level, existing_level))
+                existing["contradiction_flag"] = True
+                bucket.remove(existing)
+
+        if level == "T1*":
+            events.append(self._event(RecallAction.DOWNGRADE, evidence, conflicting[0], key, "T1*", "T2"))
+            set_level(evidence, "T2")
+        if blocking or level == "T1*":
+            evidence["contradiction_flag"] = True
+        if not blocking:
+            bucket.append(evidence)
+
+        self.events.extend(events)
+        return events
+
+    def insert_batch(self, evidence_items: List[Dict[str, Any]]) -> List[RecallEvent]:
+        """一括挿入"""
+        events = []
+        for evidence in evidence_items:
+            events.extend(self.insert(evidence))
+        return events
+
+    def _conflicts(self, a: Optional[Tuple[float, float]], b: Optional[Tuple[float, float]]) -> bool:
+        """許容幅を超えて区間が離れているか"""
+        if a is None or b is None:
+            return False
+        tolerance = self.tolerance_abs + self.tolerance_rel * max(abs(a[0]), abs(a[1]), abs(b[0]), abs(b[1]))
+        return a[0] > b[1] + tolerance or b[0] > a[1] + tolerance
+
+    def _event(self, action: RecallAction, target: Dict[str, Any], other: Dict[str, Any],
+               key: Tuple[str, str, str, str], old_tag: str, new_tag: str) -> RecallEvent:
+        """イベント生成"""
+        ticker, kpi, period, unit = key
+        return RecallEvent(
+            action=action,
+            target_id=target["id"],
+            conflicting_id=other["id"],
+            ticker=ticker,
+            kpi=kpi,
+            period=period,
+            unit=unit,
+            old_tag=old_tag,
+            new_tag=new_tag,
+            reason=f"{kpi}: {target.get('value')} vs {other.get('value')}"
+        )
+
+    def get_summary(self) -> Dict[str, Any]:
+        """サマリー取得"""
+        counts = {action.value: 0 for action in RecallAction}
+        for event in self.events:
+            counts[event.action.value] += 1
+        return {
+            "total_items": len(self.items),
+            "buckets": len(self.buckets),
+            "events": counts
+        }
+
+def bucket_key(evidence: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    """索引キー"""
+    return (
+        str(evidence.get("ticker", "")),
+        str(evidence.get("kpi", "")),
+        str(evidence.get("period") or evidence.get("asof", "")),
+        str(evidence.get("unit", ""))
+    )
+
+def evidence_level(evidence: Dict[str, Any]) -> Optional[str]:
+    """証拠階層（T1-core/T1-F等もT1扱い）"""
+    for tag_key in TAG_KEYS:
+        tag = evidence.get(tag_key)
+        if not tag:
+            continue
+        tag = str(tag)
+        if tag.startswith("T1*"):
+            return "T1*"
+        if tag.startswith("T1"):
+            return "T1"
+        if tag.startswith("T2"):
+            return "T2"
+    return None
+
+def set_level(evidence: Dict[str, Any], level: str):
+    """証拠階層の書き換え（元のキーを維持）"""
+    for tag_key in TAG_KEYS:
+        if evidence.get(tag_key):
+            evidence[tag_key] = level
+            return
+    evidence["evidence_tag"] = level
+
+def parse_value(value: Any) -> Optional[Tuple[float, float]]:
+    """数値/レンジ（"115-127"）を区間化"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (float(value), float(value))
+    if not isinstance(value, str):
+        return None
+
+    match = re.fullmatch(r'\s*(-?[\d.,]+)\s*(?:[-–~〜]\s*(-?[\d.,]+))?\s*', value)
+    if not match:
+        return None
+    try:
+        low = float(match.group(1).replace(',', ''))
+        high = float(match.group(2).replace(',', '')) if match.group(2) else low
+    except ValueError:
+        return None
+    return (min(low, high), max(low, high))
+
+def recall_to_uncertain(triage: Dict[str, Any], events: List[RecallEvent]) -> int:
+    """RECALL対象をCONFIRMED→UNCERTAINへ移動"""
+    recalled = {e.target_id for e in events if e.action == RecallAction.RECALL}
+    moved = [item for item in triage.get("CONFIRMED", []) if item.get("id") in recalled]
+
+    triage["CONFIRMED"] = [item for item in triage.get("CONFIRMED", []) if item.get("id") not in recalled]
+    for item in moved:
+        item["status"] = "contradiction"
+        triage.setdefault("UNCERTAIN", []).append(item)
+
+    return len(moved)
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 3:
+        print("Usage: python ahf_contradiction.py <TICKER> <triage_json> [new_evidence_json]")
+        sys.exit(1)
+
+    ticker = sys.argv[1]
+    with open(sys.argv[2], 'r', encoding='utf-8') as f:
+        triage = json.load(f)
+
+    index = ContradictionIndex()
+    confirmed = [dict(item, ticker=ticker) for item in triage.get("CONFIRMED", [])]
+    events = index.insert_batch(confirmed)
+
+    if len(sys.argv) > 3:
+        with open(sys.argv[3], 'r', encoding='utf-8') as f:
+            events.extend(index.insert_batch(json.load(f)))
+
+    print(json.dumps({
+        "events": [e.to_dict() for e in events],
+        "summary": index.get_summary()
+    }, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
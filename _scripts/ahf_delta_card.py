@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+AHF Deltaカード
+旧→新：★ / 色(Vmult) / FD% を docs/templates/delta_card_template.md 書式で出力
+前回スナップショットとの差分（銘柄ハッシュ一致はスキップ）から変化軸のみカード化
+"""
+
+import sys
+import json
+import hashlib
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Tuple
+
+from ahf_axis_bands import AXIS_INPUTS, di_score, decision_from_di
+
+AXIS_LABELS = {
+    "lec": "①長期EV確度",
+    "nes": "②長期EV勾配",
+    "current_valuation": "③現バリュエーション",
+    "future_valuation": "④将来EVバリュ",
+    "decision": "DI"
+}
+
+@dataclass
+class DeltaCard:
+    """Deltaカード"""
+    ticker: str
+    axis: str
+    old: Dict[str, Any]
+    new: Dict[str, Any]
+    cause: str
+    response: str = ""
+    memo: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書化"""
+        return asdict(self)
+
+    def render(self) -> str:
+        """テンプレート書式で出力"""
+        return (
+            f"対象: {self.ticker} / {AXIS_LABELS.get(self.axis, self.axis)}  \n"
+            f"旧 → 新：{format_axis_state(self.old)} → {format_axis_state(self.new)}  \n"
+            f"原因：{self.cause}  \n"
+            f"対応：{self.response}  \n"
+            f"メモ：{self.memo}"
+        )
+
+def format_axis_state(state: Dict[str, Any]) -> str:
+    """軸状態の表示（★ / 色(Vmult) / FD% / DI）"""
+    parts = []
+    if "stars" in state:
+        parts.append(f"★{state['stars']}")
+    if "color" in state:
+        parts.append(f"{state['color']}({state.get('vmult', 1.0):.2f})")
+    if "fd_pct" in state:
+        parts.append("FD% n/a" if state["fd_pct"] is None else f"FD% {state['fd_pct']:+.1%}")
+    if "di" in state:
+        parts.append(f"DI {state['di']:.2f} {state.get('action', '')}".rstrip())
+    return " / ".join(parts) if parts else "n/a"
+
+def default_response(axis: str, old: Dict[str, Any], new: Dict[str, Any]) -> str:
+    """対応の既定文言"""
+    if axis in ("lec", "nes"):
+        return f"★{new.get('stars', 0) - old.get('stars', 0):+d}"
+    if axis == "current_valuation":
+        return "③色更新"
+    if axis == "future_valuation":
+        return "④FD%再計"
+    return "DI再計"
+
+def build_delta_cards(ticker: str, old_axes: Dict[str, Dict[str, Any]], new_axes: Dict[str, Dict[str, Any]],
+                      cause: str, memo: str = "") -> List[DeltaCard]:
+    """変化した軸のみDeltaカード化"""
+    cards = []
+    for axis in AXIS_LABELS:
+        old = old_axes.get(axis, {})
+        new = new_axes.get(axis, {})
+        if old == new:
+            continue
+        cards.append(DeltaCard(
+            ticker=ticker,
+            axis=axis,
+            old=old,
+            new=new,
+            cause=cause,
+            response=default_response(axis, old, new),
+            memo=memo
+        ))
+    return cards
+
+def attribute_cause(axis: str, old_inputs: Dict[str, Any], new_inputs: Dict[str, Any]) -> str:
+    """変化した入力から原因を帰属"""
+    changed = [f"{key} {old_inputs.get(key)}→{new_inputs.get(key)}"
+               for key in AXIS_INPUTS.get(axis, ())
+               if old_inputs.get(key) != new_inputs.get(key)]
+    if not changed:
+        return "帯/ロジック変更"
+    return "入力変更: " + ", ".join(changed)
+
+def entry_hash(entry: Dict[str, Any]) -> str:
+    """銘柄エントリのハッシュ（入力＋軸出力）"""
+    payload = json.dumps({"inputs": entry.get("inputs", {}), "axes": entry.get("axes", {})},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def axis_states_from_evaluation(evaluation: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """evaluate_4_axesの出力 → (入力, 軸状態)"""
+    lec = evaluation.get("lec", {})
+    nes = evaluation.get("nes", {})
+    current = evaluation.get("current_valuation", {})
+    future = evaluation.get("future_valuation", {})
+
+    inputs = {}
+    for axis in (lec, nes, future):
+        inputs.update({k: v for k, v in axis.get("inputs", {}).items() if not isinstance(v, dict)})
+    inputs["evs_actual_ttm"] = current.get("evs_actual_ttm")
+    inputs["evs_peer_median_ttm"] = current.get("evs_peer_median_ttm")
+
+    di = di_score(lec.get("star_score", 0), nes.get("star_score", 0), current.get("vmult", 1.0))
+    axes = {
+        "lec": {"stars": lec.get("star_score", 0)},
+        "nes": {"stars": nes.get("star_score", 0)},
+        "current_valuation": {"color": current.get("color", "N/A"), "vmult": current.get("vmult", 1.0)},
+        "future_valuation": {"stars": future.get("star_score", 0), "fd_pct": future.get("fd_pct")},
+        "decision": {"di": di, "action": decision_from_di(di)}
+    }
+    return inputs, axes
+
+def build_snapshot(asof: str, entries: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """スナップショット生成（entries: ticker → {inputs, axes}）"""
+    return {
+        "asof": asof,
+        "tickers": {ticker: dict(entry, hash=entry_hash(entry)) for ticker, entry in entries.items()}
+    }
+
+class SnapshotDiffEngine:
+    """評価スナップショット差分エンジン"""
+
+    def __init__(self):
+        self.stats = {"total": 0, "unchanged": 0, "changed": 0, "added": 0, "removed": 0, "cards": 0}
+
+    def diff(self, previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> List[DeltaCard]:
+        """前回→今回の差分カード（ハッシュ一致銘柄は比較しない）"""
+        prev_tickers = (previous or {}).get("tickers", {})
+        curr_tickers = current.get("tickers", {})
+        self.stats = {"total": len(curr_tickers), "unchanged": 0, "changed": 0,
+                      "added": 0, "removed": len(set(prev_tickers) - set(curr_tickers)), "cards": 0}
+
+        cards = []
+        for ticker, entry in curr_tickers.items():
+            old_entry = prev_tickers.get(ticker)
+            if old_entry is None:
+                self.stats["added"] += 1
+                continue
+            if (old_entry.get("hash") or entry_hash(old_entry)) == (entry.get("hash") or entry_hash(entry)):
+                self.stats["unchanged"] += 1
+                continue
+
+            ticker_cards = self._diff_entry(ticker, old_entry, entry, previous.get("asof", ""))
+            if ticker_cards:
+                self.stats["changed"] += 1
+                cards.extend(ticker_cards)
+            else:
+                self.stats["unchanged"] += 1
+
+        self.stats["cards"] = len(cards)
+        return cards
+
+    def _diff_entry(self, ticker: str, old_entry: Dict[str, Any], new_entry: Dict[str, Any],
+                    prev_asof: str) -> List[DeltaCard]:
+        """銘柄単位の軸差分"""
+        cards = build_delta_cards(ticker, old_entry.get("axes", {}), new_entry.get("axes", {}),
+                                  cause="", memo=f"前回 {prev_asof}" if prev_asof else "")
+        for card in cards:
+            card.cause = attribute_cause(card.axis, old_entry.get("inputs", {}), new_entry.get("inputs", {}))
+        return cards
+
+def load_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    """スナップショット読み込み（なければNone）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_snapshot(path: str, snapshot: Dict[str, Any]):
+    """スナップショット保存"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, indent=2, ensure_ascii=False)
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 3:
+        print("Usage: python ahf_delta_card.py <previous_snapshot> <current_snapshot>")
+        sys.exit(1)
+
+    previous = load_snapshot(sys.argv[1])
+    current = load_snapshot(sys.argv[2])
+    if current is None:
+        print(f"Error: File '{sys.argv[2]}' not found")
+        sys.exit(1)
+
+    engine = SnapshotDiffEngine()
+    cards = engine.diff(previous, current)
+
+    print("# Deltaカード\n")
+    for card in cards:
+        print(card.render())
+        print()
+    print(json.dumps(engine.stats, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
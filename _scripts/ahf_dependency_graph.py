@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+AHF 依存追跡型の再計算
+証拠→入力キー（_get_t1_valueキー）→①LEC/②NES/③/④→DI→判定 の依存グラフを保持し、
+降格/リコール時は影響ノードのみ再計算してDeltaカードを発行する
+"""
+
+import heapq
+from typing import Dict, List, Optional, Tuple, Any, Callable
+
+from ahf_axis_bands import (
+    BandConfig, DEFAULT_BANDS, star_from_cutoffs, lec_score, margin_term, health_term,
+    nes_score, disc_pct, valuation_color, evs_fair_12m, fd_pct, di_score, decision_from_di
+)
+from ahf_delta_card import DeltaCard, build_delta_cards
+
+INPUT_KEYS = [
+    "g_fwd", "delta_opm_fwd", "dilution", "capex_intensity",
+    "next_q_qoq_pct", "guidance_revision_pct", "backlog_growth_pct",
+    "gm_actual", "gm_expected", "growth_pct", "gaap_opm",
+    "opm_fwd", "evs_actual_today", "evs_actual_ttm", "evs_peer_median_ttm"
+]
+
+# ★/DIに反映可能な証拠階層（強い順）
+ELIGIBLE_LEVELS = {"T1": 2, "T1*": 1}
+
+class DependencyGraph:
+    """汎用依存グラフ（追加順＝トポロジカル順、変化なしで伝播停止）"""
+
+    def __init__(self):
+        self.deps: Dict[str, Tuple[str, ...]] = {}
+        self.fns: Dict[str, Optional[Callable]] = {}
+        self.order: Dict[str, int] = {}
+        self.dependents: Dict[str, List[str]] = {}
+        self.values: Dict[str, Any] = {}
+        self.recompute_count = 0
+
+    def add_input(self, name: str, value: Any):
+        """入力ノード追加"""
+        self._register(name, (), None)
+        self.values[name] = value
+
+    def add_node(self, name: str, deps: Tuple[str, ...], fn: Callable):
+        """計算ノード追加（依存ノードは登録済みであること）"""
+        missing = [d for d in deps if d not in self.order]
+        if missing:
+            raise ValueError(f"未登録の依存ノード: {missing}")
+        self._register(name, deps, fn)
+        self.values[name] = self._compute(name)
+
+    def _register(self, name: str, deps: Tuple[str, ...], fn: Optional[Callable]):
+        """ノード登録"""
+        if name in self.order:
+            raise ValueError(f"ノード重複: {name}")
+        self.deps[name] = deps
+        self.fns[name] = fn
+        self.order[name] = len(self.order)
+        self.dependents[name] = []
+        for dep in deps:
+            self.dependents[dep].append(name)
+
+    def _compute(self, name: str) -> Any:
+        """ノード計算"""
+        self.recompute_count += 1
+        return self.fns[name](*(self.values[d] for d in self.deps[name]))
+
+    def set_inputs(self, updates: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+        """入力更新（影響ノードのみ再計算）→ 変化ノード: (旧, 新)"""
+        changed: Dict[str, Tuple[Any, Any]] = {}
+        queue: List[Tuple[int, str]] = []
+
+        for name, value in updates.items():
+            old = self.values[name]
+            if old == value:
+                continue
+            self.values[name] = value
+            changed[name] = (old, value)
+            for dependent in self.dependents[name]:
+                heapq.heappush(queue, (self.order[dependent], dependent))
+
+        visited = set()
+        while queue:
+            _, name = heapq.heappop(queue)
+            if name in visited:
+                continue
+            visited.add(name)
+
+            old = self.values[name]
+            new = self._compute(name)
+            if new == old:
+                continue
+            self.values[name] = new
+            changed[name] = (old, new)
+            for dependent in self.dependents[name]:
+                heapq.heappush(queue, (self.order[dependent], dependent))
+
+        return changed
+
+def axis_node_specs(bands: BandConfig = DEFAULT_BANDS) -> List[Tuple[str, Tuple[str, ...], Callable]]:
+    """4軸＋DIの計算ノード定義（ahf_axis_bands.evaluate_axesと同一の式）"""
+    def future_fd(g_fwd, opm_fwd, evs_actual_today):
+        if not g_fwd or not opm_fwd or not evs_actual_today:
+            return None
+        return fd_pct(evs_fair_12m(g_fwd, opm_fwd), evs_actual_today)
+
+    return [
+        ("lec_score", ("g_fwd", "delta_opm_fwd", "dilution", "capex_intensity"), lec_score),
+        ("lec_stars", ("lec_score",), lambda v: star_from_cutoffs(v, bands.lec_cutoffs)),
+        ("margin_term", ("gm_actual", "gm_expected"), margin_term),
+        ("health_term", ("growth_pct", "gaap_opm"), health_term),
+        ("nes_score", ("next_q_qoq_pct", "guidance_revision_pct", "backlog_growth_pct",
+                       "margin_term", "health_term"), nes_score),
+        ("nes_stars", ("nes_score",), lambda v: star_from_cutoffs(v, bands.nes_cutoffs)),
+        ("disc_pct", ("evs_actual_ttm", "evs_peer_median_ttm"), disc_pct),
+        ("color_vmult", ("disc_pct",), lambda d: valuation_color(d, bands)),
+        ("fd_pct", ("g_fwd", "opm_fwd", "evs_actual_today"), future_fd),
+        ("future_stars", ("fd_pct",), lambda fd: 0 if fd is None else star_from_cutoffs(fd, bands.fd_cutoffs)),
+        ("di", ("lec_stars", "nes_stars", "color_vmult"), lambda s1, s2, cv: di_score(s1, s2, cv[1])),
+        ("action", ("di",), lambda di: decision_from_di(di, bands))
+    ]
+
+class AxisDependencyGraph:
+    """ユニバース横断の4軸依存グラフ（銘柄ごとに独立した部分グラフ）"""
+
+    def __init__(self, bands: BandConfig = DEFAULT_BANDS):
+        self.bands = bands
+        self.graph = DependencyGraph()
+        self.evidence: Dict[str, Dict[str, Any]] = {}
+        self.key_evidence: Dict[Tuple[str, str], List[str]] = {}
+        self.delta_cards: List[DeltaCard] = []
+
+    def add_ticker(self, ticker: str, inputs: Optional[Dict[str, float]] = None):
+        """銘柄追加"""
+        inputs = inputs or {}
+        for key in INPUT_KEYS:
+            self.graph.add_input(self._node(ticker, key), inputs.get(key) or 0.0)
+        for name, deps, fn in axis_node_specs(self.bands):
+            self.graph.add_node(self._node(ticker, name), tuple(self._node(ticker, d) for d in deps), fn)
+
+    def register_evidence(self, evidence_id: str, ticker: str, key: str, value: float,
+                          level: str = "T1", cause: str = "新規T1") -> List[DeltaCard]:
+        """証拠→入力キーの紐付け"""
+        if key not in INPUT_KEYS:
+            raise ValueError(f"未知の入力キー: {key}")
+        if self._node(ticker, key) not in self.graph.order:
+            self.add_ticker(ticker)
+
+        self.evidence[evidence_id] = {"ticker": ticker, "key": key, "value": value,
+                                      "level": level, "recalled": False}
+        self.key_evidence.setdefault((ticker, key), []).append(evidence_id)
+        return self._refresh(ticker, [key], cause, evidence_id)
+
+    def downgrade(self, evidence_id: str, new_level: str = "T2", cause: str = "T1矛盾") -> List[DeltaCard]:
+        """降格（T1*→T2）"""
+        evidence = self.evidence[evidence_id]
+        evidence["level"] = new_level
+        return self._refresh(evidence["ticker"], [evidence["key"]], cause, evidence_id)
+
+    def recall(self, evidence_id: str, cause: str = "T1矛盾") -> List[DeltaCard]:
+        """リコール（UNCERTAINへ）"""
+        evidence = self.evidence[evidence_id]
+        evidence["recalled"] = True
+        return self._refresh(evidence["ticker"], [evidence["key"]], cause, evidence_id)
+
+    def apply_recall_events(self, events: List[Any]) -> List[DeltaCard]:
+        """矛盾検出エンジンのRecallEventを反映（REJECTは未採用のため対象外）"""
+        cards = []
+        for event in events:
+            if event.target_id not in self.evidence:
+                continue
+            action = getattr(event.action, "value", event.action)
+            if action == "downgrade":
+                cards.extend(self.downgrade(event.target_id, event.new_tag, "T1矛盾"))
+            elif action == "recall":
+                cards.extend(self.recall(event.target_id, "T1矛盾"))
+        return cards
+
+    def axis_states(self, ticker: str) -> Dict[str, Dict[str, Any]]:
+        """軸状態（Deltaカード比較用）"""
+        value = lambda name: self.graph.values[self._node(ticker, name)]
+        color, vmult = value("color_vmult")
+        return {
+            "lec": {"stars": value("lec_stars")},
+            "nes": {"stars": value("nes_stars")},
+            "current_valuation": {"color": color, "vmult": vmult},
+            "future_valuation": {"stars": value("future_stars"), "fd_pct": value("fd_pct")},
+            "decision": {"di": value("di"), "action": value("action")}
+        }
+
+    def _refresh(self, ticker: str, keys: List[str], cause: str, evidence_id: str) -> List[DeltaCard]:
+        """入力キーの再解決と影響ノードの再計算"""
+        before = self.axis_states(ticker)
+        self.graph.set_inputs({self._node(ticker, key): self._resolve(ticker, key) for key in keys})
+        after = self.axis_states(ticker)
+
+        cards = build_delta_cards(ticker, before, after, cause, memo=f"{evidence_id}: {', '.join(keys)}")
+        self.delta_cards.extend(cards)
+        return cards
+
+    def _resolve(self, ticker: str, key: str) -> float:
+        """採用可能な最強・最新の証拠値（なければ0.0=n/a）"""
+        best = None
+        for evidence_id in self.key_evidence.get((ticker, key), []):
+            evidence = self.evidence[evidence_id]
+            rank = ELIGIBLE_LEVELS.get(evidence["level"])
+            if rank is None or evidence["recalled"]:
+                continue
+            if best is None or rank >= best[0]:
+                best = (rank, evidence["value"])
+        return best[1] if best else 0.0
+
+    @staticmethod
+    def _node(ticker: str, name: str) -> str:
+        """ノード名"""
+        return f"{ticker}:{name}"
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+AHF 為替レイヤ（Price-Mode：同一通貨に正規化）
+ローカルの日次レート表を 日付×通貨 の行列ファイルとしてメモリマップし、as-of参照で
+EV構成要素・売上を共通通貨へ一括換算する（通貨は _catalog/tickers.csv の currency 列）
+"""
+
+import os
+import sys
+import csv
+import json
+import mmap
+import math
+from array import array
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, List, Optional, Any, Sequence
+
+DEFAULT_TICKERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "_catalog", "tickers.csv")
+MATRIX_FILE = "rates.f64"
+INDEX_FILE = "index.json"
+NAN = float("nan")
+
+# 換算対象列（PriceSnapshotStore / TTMSeriesStore の行形式）
+AMOUNT_COLUMNS = ["market_cap", "total_debt", "preferred", "minority", "cash", "ttm_sales", "reported_ev",
+                  "reported_ttm_sales"]
+LIST_COLUMNS = ["revenue_last4q"]
+
+# as-of参照で遡る最大日数（週末・祝日）
+MAX_STALE_DAYS = 7
+
+def load_ticker_currencies(path: str = DEFAULT_TICKERS_PATH) -> Dict[str, str]:
+    """tickers.csv → ticker: 通貨"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return {row["ticker"]: row["currency"].strip().upper() for row in csv.DictReader(f)}
+
+class FXMatrix:
+    """日付×通貨のレート行列（基準通貨建て：1通貨単位あたりの基準通貨額）"""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, INDEX_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("byteorder", sys.byteorder) != sys.byteorder:
+            raise ValueError(f"バイトオーダー不一致: {meta.get('byteorder')}")
+
+        self.base = meta["base"]
+        self.dates: List[str] = meta["dates"]
+        self.ordinals = [date.fromisoformat(d).toordinal() for d in self.dates]
+        self.currencies: List[str] = meta["currencies"]
+        self.column: Dict[str, int] = {c: i for i, c in enumerate(self.currencies)}
+        self._handle = None
+        self.rates = self._map(os.path.join(path, MATRIX_FILE))
+
+    def _map(self, file_path: str):
+        """行列ファイルをメモリマップ（空は空配列）"""
+        fh = open(file_path, 'rb')
+        if os.fstat(fh.fileno()).st_size == 0:
+            fh.close()
+            return array('d')
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        raw = memoryview(mm)
+        view = raw.cast('d')
+        self._handle = (fh, mm, raw, view)
+        return view
+
+    def rate(self, currency: str, asof: str) -> float:
+        """as-of レート（asof以前の直近有効値、MAX_STALE_DAYS超はNaN）"""
+        currency = (currency or "").upper()
+        if currency == self.base:
+            return 1.0
+        if currency not in self.column:
+            return NAN
+
+        target = date.fromisoformat(str(asof)[:10]).toordinal()
+        width, col = len(self.currencies), self.column[currency]
+        row = bisect_right(self.ordinals, target) - 1
+        while row >= 0 and target - self.ordinals[row] <= MAX_STALE_DAYS:
+            value = self.rates[row * width + col]
+            if not math.isnan(value):
+                return value
+            row -= 1
+        return NAN
+
+    def factor(self, source: str, target: str, asof: str) -> float:
+        """source → target の換算係数"""
+        return self.rate(source, asof) / self.rate(target, asof)
+
+    def convert(self, values: Sequence[float], currencies: Sequence[str], asof: str,
+                target: Optional[str] = None) -> List[float]:
+        """金額列の一括換算（係数は通貨ごとに1回だけ解決）"""
+        target = target or self.base
+        factors: Dict[str, float] = {}
+        result = []
+        for value, currency in zip(values, currencies):
+            if currency not in factors:
+                factors[currency] = self.factor(currency, target, asof)
+            result.append(_to_float(value) * factors[currency])
+        return result
+
+    def normalize_rows(self, rows: List[Dict[str, Any]], asof: str, ticker_currencies: Dict[str, str],
+                       target: Optional[str] = None) -> List[Dict[str, Any]]:
+        """スナップショット行を共通通貨へ換算（行のcurrency／market_cap_currencyがあれば優先）"""
+        target = target or self.base
+        # 通貨不明（行にもtickers.csvにもない）銘柄は恒等換算せず金額NaN＋data_gaps
+        currencies = [row.get("currency") or ticker_currencies.get(row["ticker"], "") for row in rows]
+        normalized = [dict(row, currency=target) for row in rows]
+        for row, currency in zip(normalized, currencies):
+            if not currency:
+                row["data_gaps"] = list(row.get("data_gaps", [])) + ["currency"]
+
+        for column in AMOUNT_COLUMNS:
+            present = [i for i, row in enumerate(rows) if column in row]
+            if not present:
+                continue
+            column_currencies = [rows[i].get(f"{column}_currency") or currencies[i] for i in present]
+            converted = self.convert([rows[i][column] for i in present], column_currencies, asof, target)
+            for i, value in zip(present, converted):
+                normalized[i][column] = value
+                normalized[i].pop(f"{column}_currency", None)
+
+        for column in LIST_COLUMNS:
+            for i, row in enumerate(rows):
+                if row.get(column) is not None:
+                    f = self.factor(currencies[i], target, asof)
+                    normalized[i][column] = [_to_float(v) * f for v in row[column]]
+        return normalized
+
+    def close(self):
+        """メモリマップ解放"""
+        if self._handle is not None:
+            fh, mm, raw, view = self._handle
+            view.release()
+            raw.release()
+            mm.close()
+            fh.close()
+            self._handle = None
+        self.rates = array('d')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class FXRateStore:
+    """日次レート表ストア（<root>/rates.f64 + index.json）"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def write_rates(self, rates: Dict[str, Dict[str, float]], base: str = "USD") -> str:
+        """date → {通貨: 基準通貨建てレート} を行列化して書き込み（欠測はNaN）"""
+        os.makedirs(self.root, exist_ok=True)
+        table = {d: {c.upper(): v for c, v in day.items()} for d, day in rates.items()}
+        dates = sorted(table)
+        currencies = sorted({c for day in table.values() for c in day} - {base})
+
+        matrix = array('d', (_to_float(table[d].get(c)) for d in dates for c in currencies))
+        with open(os.path.join(self.root, MATRIX_FILE), 'wb') as f:
+            matrix.tofile(f)
+        with open(os.path.join(self.root, INDEX_FILE), 'w', encoding='utf-8') as f:
+            json.dump({
+                "base": base,
+                "dates": dates,
+                "currencies": currencies,
+                "byteorder": sys.byteorder
+            }, f, ensure_ascii=False)
+        return self.root
+
+    def import_csv(self, path: str, base: str = "USD") -> str:
+        """date,currency,rate 形式のCSVから書き込み"""
+        rates: Dict[str, Dict[str, float]] = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                rates.setdefault(row["date"][:10], {})[row["currency"].strip().upper()] = row["rate"]
+        return self.write_rates(rates, base)
+
+    def open_matrix(self) -> FXMatrix:
+        """レート行列を開く"""
+        return FXMatrix(self.root)
+
+def _to_float(value: Any) -> float:
+    """数値化（欠測はNaN）"""
+    if value is None or value == "":
+        return NAN
+    return float(value)
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 4:
+        print("Usage: python ahf_fx.py <store_root> <currency> <asof> [rates_csv]")
+        sys.exit(1)
+
+    store = FXRateStore(sys.argv[1])
+    if len(sys.argv) > 4:
+        store.import_csv(sys.argv[4])
+
+    with store.open_matrix() as matrix:
+        rate = matrix.rate(sys.argv[2], sys.argv[3])
+        print(json.dumps({"base": matrix.base, "currency": sys.argv[2].upper(), "asof": sys.argv[3],
+                          "rate": None if math.isnan(rate) else rate}, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+AHF インパクトカード評価エンジン
+impact_cards.json の expr を制限付きASTへ一度だけコンパイルし（eval不使用）、
+同一カードを持つ全銘柄を列で一括評価して gates の up/down トリガーを返す
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import operator
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+
+from ahf_safe_expr import CompiledExpression, ExpressionError, compile_expression
+
+DEFAULT_TICKERS_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tickers")
+
+GATE_PATTERN = re.compile(r'^\s*(>=|<=|==|>|<)\s*(-?\d+(?:\.\d+)?)\s*$')
+GATE_OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    ">": operator.gt,
+    "<": operator.lt
+}
+
+Gate = Tuple[str, float]
+
+def parse_gate(text: Optional[str]) -> Optional[Gate]:
+    """ゲート文字列（例: ">=0.20"）→ (演算子, 閾値)"""
+    if not text:
+        return None
+    match = GATE_PATTERN.match(str(text))
+    if not match:
+        raise ExpressionError(f"ゲート形式不正: {text}")
+    return match.group(1), float(match.group(2))
+
+def gate_hit(gate: Optional[Gate], value: float) -> bool:
+    """ゲート判定（NaNは不成立）"""
+    if gate is None or math.isnan(value):
+        return False
+    return GATE_OPERATORS[gate[0]](value, gate[1])
+
+@dataclass(frozen=True)
+class CompiledCard:
+    """コンパイル済みカード"""
+    card_id: str
+    expression: CompiledExpression
+    up: Optional[Gate]
+    down: Optional[Gate]
+
+    def trigger(self, value: float) -> Optional[str]:
+        """up / down / None（両方成立時はup優先）"""
+        if gate_hit(self.up, value):
+            return "up"
+        if gate_hit(self.down, value):
+            return "down"
+        return None
+
+def load_cards(path: str) -> List[Dict[str, Any]]:
+    """impact_cards.json（{"cards": [...]} またはリスト）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get("cards", []) if isinstance(data, dict) else data
+
+def load_universe(tickers_root: str = DEFAULT_TICKERS_ROOT) -> Dict[str, List[Dict[str, Any]]]:
+    """tickers/<T>/current/impact_cards.json → ticker: カード一覧"""
+    universe = {}
+    for ticker in sorted(os.listdir(tickers_root)):
+        path = os.path.join(tickers_root, ticker, "current", "impact_cards.json")
+        if os.path.exists(path):
+            universe[ticker] = load_cards(path)
+    return universe
+
+class ImpactCardEngine:
+    """インパクトカードの一括評価"""
+
+    def __init__(self):
+        self._cards: Dict[Tuple[str, str, str, str], CompiledCard] = {}
+
+    def compile_card(self, card: Dict[str, Any]) -> CompiledCard:
+        """カードのコンパイル（id・式・ゲートが同じなら再利用）"""
+        gates = card.get("gates", {})
+        key = (card.get("id", ""), card["expr"], str(gates.get("up", "")), str(gates.get("down", "")))
+        compiled = self._cards.get(key)
+        if compiled is None:
+            compiled = CompiledCard(
+                card_id=key[0],
+                expression=compile_expression(card["expr"]),
+                up=parse_gate(gates.get("up")),
+                down=parse_gate(gates.get("down"))
+            )
+            self._cards[key] = compiled
+        return compiled
+
+    def evaluate(self, cards_by_ticker: Dict[str, List[Dict[str, Any]]],
+                 values_by_ticker: Dict[str, Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """全銘柄評価：同一カードの銘柄を束ねて列評価 → ticker: カード結果"""
+        groups: Dict[CompiledCard, List[str]] = {}
+        results: Dict[str, List[Dict[str, Any]]] = {ticker: [] for ticker in cards_by_ticker}
+        for ticker, cards in cards_by_ticker.items():
+            for card in cards:
+                try:
+                    groups.setdefault(self.compile_card(card), []).append(ticker)
+                except (ExpressionError, KeyError) as e:
+                    results[ticker].append({"id": card.get("id", ""), "value": None, "trigger": None,
+                                            "data_gap": True, "error": str(e)})
+
+        for compiled, tickers in groups.items():
+            names = compiled.expression.names
+            env = {name: [values_by_ticker.get(t, {}).get(name) for t in tickers] for name in names}
+            try:
+                values = compiled.expression.evaluate(env, len(tickers))
+                if len(values) != len(tickers):
+                    raise ExpressionError(f"評価結果の行数不一致: {compiled.card_id}")
+            except (ExpressionError, ArithmeticError, TypeError, ValueError) as e:
+                # 評価失敗のカードは該当銘柄ごとに data_gap 行（ユニバース全体は止めない）
+                for ticker in tickers:
+                    results[ticker].append({"id": compiled.card_id, "value": None, "trigger": None,
+                                            "data_gap": True, "error": str(e)})
+                continue
+            for ticker, value in zip(tickers, values):
+                missing = compiled.expression.missing(values_by_ticker.get(ticker, {}))
+                results[ticker].append({
+                    "id": compiled.card_id,
+                    "value": None if math.isnan(value) else value,
+                    "trigger": compiled.trigger(value),
+                    "data_gap": math.isnan(value),
+                    "missing": missing
+                })
+        return results
+
+    def triggers(self, results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Tuple[str, str]]]:
+        """トリガー成立分のみ → ticker: [(id, up/down)]"""
+        return {ticker: [(r["id"], r["trigger"]) for r in rows if r["trigger"]]
+                for ticker, rows in results.items() if any(r["trigger"] for r in rows)}
+
+    def get_summary(self, results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """サマリー"""
+        rows = [r for ticker_rows in results.values() for r in ticker_rows]
+        return {
+            "tickers": len(results),
+            "cards": len(rows),
+            "compiled": len(self._cards),
+            "up": sum(1 for r in rows if r["trigger"] == "up"),
+            "down": sum(1 for r in rows if r["trigger"] == "down"),
+            "data_gaps": sum(1 for r in rows if r["data_gap"])
+        }
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahf_impact_cards.py <values_json> [tickers_root]")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        values_by_ticker = json.load(f)
+    universe = load_universe(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_TICKERS_ROOT)
+
+    engine = ImpactCardEngine()
+    results = engine.evaluate(universe, values_by_ticker)
+
+    print(json.dumps({"results": results, "summary": engine.get_summary(results)}, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+AHF T1*独立性グラフ（Union-Find）
+同一ドメイン・同一配信元・同一著者・同一逐語のソースを非独立として連結し、
+「独立2源以上」をクラスタ数で判定する（ユニバース横断で逐次更新）
+"""
+
+import sys
+import json
+from urllib.parse import urlparse
+from typing import Dict, List, Optional, Any
+
+from ahf_near_dup import normalize_text
+
+# 2段の公開サフィックス（明示列挙、sap.de 等の通常ドメインは含めない）
+MULTI_LABEL_SUFFIXES = frozenset({
+    "co.jp", "ne.jp", "or.jp", "ac.jp", "go.jp",
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "ltd.uk", "plc.uk",
+    "com.au", "net.au", "org.au", "gov.au", "edu.au",
+    "co.kr", "or.kr", "com.cn", "net.cn", "org.cn", "gov.cn",
+    "com.tw", "org.tw", "com.hk", "org.hk", "com.sg", "com.my",
+    "co.in", "net.in", "org.in", "co.nz", "org.nz", "co.za", "com.br", "com.mx", "co.il"
+})
+
+class UnionFind:
+    """素集合（経路圧縮＋サイズ併合）"""
+
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+        self.size: Dict[str, int] = {}
+
+    def add(self, x: str):
+        """要素追加"""
+        if x not in self.parent:
+            self.parent[x] = x
+            self.size[x] = 1
+
+    def find(self, x: str) -> str:
+        """代表元取得"""
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: str, b: str) -> str:
+        """併合"""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return ra
+
+    def __contains__(self, x: str) -> bool:
+        return x in self.parent
+
+class SourceIndependenceGraph:
+    """ソース独立性グラフ"""
+
+    def __init__(self):
+        self._uf = UnionFind()
+        self._key_owner: Dict[str, str] = {}
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self.source_keys: Dict[str, List[str]] = {}
+
+    def add_source(self, source: Dict[str, Any], source_id: Optional[str] = None) -> Optional[str]:
+        """ソース追加（非独立キーを共有する既存ソースとのみ併合）"""
+        source_id = source_id or source.get("id") or source.get("url")
+        if not source_id:
+            return None
+        if source_id in self.sources:
+            return source_id
+
+        self._uf.add(source_id)
+        self.sources[source_id] = source
+        keys = dependency_keys(source)
+        self.source_keys[source_id] = keys
+
+        for key in keys:
+            owner = self._key_owner.get(key)
+            if owner is None:
+                self._key_owner[key] = source_id
+            else:
+                self._uf.union(source_id, owner)
+
+        return source_id
+
+    def count_independent(self, source_ids: List[str]) -> int:
+        """独立クラスタ数"""
+        return len({self._uf.find(s) for s in source_ids if s in self._uf})
+
+    def is_independent(self, source_ids: List[str], min_sources: int = 2) -> bool:
+        """独立N源以上か"""
+        return self.count_independent(source_ids) >= min_sources
+
+    def count_item_sources(self, item: Dict[str, Any]) -> int:
+        """アイテムのsourcesを登録して独立クラスタ数を返す"""
+        source_ids = [self.add_source(s, item_source_id(item, s)) for s in item.get("sources", [])]
+        return self.count_independent([s for s in source_ids if s])
+
+    def shared_keys(self, a: str, b: str) -> List[str]:
+        """2ソース間で直接共有する非独立キー"""
+        return sorted(set(self.source_keys.get(a, [])) & set(self.source_keys.get(b, [])))
+
+    def get_summary(self) -> Dict[str, Any]:
+        """サマリー取得"""
+        return {
+            "total_sources": len(self.sources),
+            "clusters": self.count_independent(list(self.sources)),
+            "dependency_keys": len(self._key_owner)
+        }
+
+def item_source_id(item: Dict[str, Any], source: Dict[str, Any]) -> Optional[str]:
+    """ユニバース共有グラフ上のノードID（URL、URLなしはアイテムIDで名前空間化したローカルid）"""
+    if source.get("url"):
+        return source["url"]
+    if source.get("id"):
+        return f"{item.get('id', '')}/{source['id']}"
+    return None
+
+def registrable_domain(url: str) -> str:
+    """登録ドメイン（investor.x.com / news.x.com → x.com、ir.x.co.jp → x.co.jp）"""
+    host = urlparse(url if "//" in url else f"//{url}").hostname or ""
+    labels = [l for l in host.lower().split(".") if l]
+    if len(labels) <= 2:
+        return ".".join(labels)
+    if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+def dependency_keys(source: Dict[str, Any]) -> List[str]:
+    """非独立キー（ドメイン・配信元・著者・逐語）"""
+    keys = []
+
+    domain = registrable_domain(source.get("url", ""))
+    if domain:
+        keys.append(f"domain:{domain}")
+
+    origin = source.get("syndication_origin") or source.get("origin")
+    if origin:
+        keys.append(f"origin:{normalize_text(origin)}")
+
+    author = source.get("author")
+    if author:
+        keys.append(f"author:{normalize_text(author)}")
+
+    verbatim = normalize_text(source.get("verbatim", ""))
+    if verbatim:
+        keys.append(f"verbatim:{verbatim}")
+
+    return keys
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahf_independence.py <t1star_items_json>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        items = json.load(f)
+
+    graph = SourceIndependenceGraph()
+    results = {item.get("id", str(i)): graph.count_item_sources(item) for i, item in enumerate(items)}
+
+    print(json.dumps({
+        "independent_sources": results,
+        "summary": graph.get_summary()
+    }, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+AHF 数理ガード パネルモード
+銘柄×四半期の列入力に対し、GM乖離・残差GP・GP/OpEx比・OT範囲・クロスチェック（GP=Rev−COGS, OpEx=ERC+D&A）を
+CORE/SCREEN 両閾値セットのマスクとして一括計算し、メッセージは不合格行のみ生成する
+"""
+
+import sys
+import json
+from typing import Dict, List, Any, Optional, Sequence
+
+# AHFv081R2MathGuard._load_thresholds 準拠
+GUARD_THRESHOLDS = {
+    "core": {
+        "gm_deviation_limit": 0.002,  # 0.2pp
+        "residual_gp_limit": 8000000,  # $8M
+        "gp_opex_ratio_min": 0.5,
+        "gp_opex_ratio_max": 2.0,
+        "ot_min": 46.8,
+        "ot_max": 61.0
+    },
+    "screen": {
+        "gm_deviation_limit": 0.005,  # 0.5pp (緩和)
+        "residual_gp_limit": 12000000,  # $12M (緩和)
+        "gp_opex_ratio_min": 0.3,
+        "gp_opex_ratio_max": 3.0,
+        "ot_min": 40.0,
+        "ot_max": 70.0
+    }
+}
+
+# クロスチェック許容差（$1k）
+CROSS_CHECK_TOLERANCE = 1000
+
+NUMERIC_COLUMNS = ["gm_actual", "gm_expected", "gp", "opex", "ot", "revenue", "cogs", "erc", "da"]
+# 閾値依存のチェック（メッセージ順は _check_item 準拠）
+THRESHOLD_CHECKS = ["gm_deviation", "residual_gp", "gp_opex_low", "gp_opex_high", "ot_range"]
+CROSS_CHECKS = ["gp_cross", "opex_cross"]
+
+def rows_to_columns(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """行形式 → 列形式"""
+    return {column: [row.get(column) for row in rows] for column in ["ticker", "quarter"] + NUMERIC_COLUMNS}
+
+def _column(columns: Dict[str, Sequence[Any]], name: str, n: int) -> List[float]:
+    """数値列（欠測は0、check_batch の既定値と同じ）"""
+    values = columns.get(name)
+    if values is None:
+        return [0] * n
+    return [0 if v is None else v for v in values]
+
+class MathGuardPanel:
+    """数理ガードのパネル一括判定"""
+
+    def __init__(self, thresholds: Optional[Dict[str, Dict[str, float]]] = None, threshold_registry=None):
+        # 閾値レジストリ（任意：math_guard_sets()で CORE/SCREEN の閾値を返す）
+        if thresholds is None and threshold_registry is not None:
+            thresholds = threshold_registry.math_guard_sets()
+        self.thresholds = thresholds or GUARD_THRESHOLDS
+
+    def compute_masks(self, columns: Dict[str, Sequence[Any]],
+                      thresholds: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, Dict[str, List[bool]]]:
+        """閾値セット別のチェックマスク（True＝不合格、thresholds 指定時はその閾値セットのみ）"""
+        n = len(columns.get("ticker") or next(iter(columns.values()), []))
+        c = {name: _column(columns, name, n) for name in NUMERIC_COLUMNS}
+        gm_deviation = [abs(a - e) for a, e in zip(c["gm_actual"], c["gm_expected"])]
+        ratio = [gp / opex if opex > 0 else None for gp, opex in zip(c["gp"], c["opex"])]
+
+        # クロスチェックは閾値セットに依存しない
+        cross = {
+            "gp_cross": [rev > 0 and cogs > 0 and abs(gp - (rev - cogs)) > CROSS_CHECK_TOLERANCE
+                         for gp, rev, cogs in zip(c["gp"], c["revenue"], c["cogs"])],
+            "opex_cross": [opex > 0 and erc > 0 and da > 0 and abs(opex - (erc + da)) > CROSS_CHECK_TOLERANCE
+                           for opex, erc, da in zip(c["opex"], c["erc"], c["da"])]
+        }
+
+        masks = {}
+        for guard_type, t in (thresholds or self.thresholds).items():
+            masks[guard_type] = dict({
+                "gm_deviation": [d > t["gm_deviation_limit"] for d in gm_deviation],
+                "residual_gp": [gp > t["residual_gp_limit"] for gp in c["gp"]],
+                "gp_opex_low": [r is not None and r < t["gp_opex_ratio_min"] for r in ratio],
+                "gp_opex_high": [r is not None and r >= t["gp_opex_ratio_min"] and r > t["gp_opex_ratio_max"]
+                                 for r in ratio],
+                "ot_range": [ot < t["ot_min"] or ot > t["ot_max"] for ot in c["ot"]]
+            }, **cross)
+        return masks
+
+    def check_panel(self, columns: Dict[str, Sequence[Any]],
+                    thresholds: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, Any]:
+        """パネル判定 → 閾値セット別の不合格マスク・不合格行メッセージ・サマリー"""
+        thresholds = thresholds or self.thresholds
+        masks = self.compute_masks(columns, thresholds)
+        tickers = list(columns.get("ticker") or [])
+        quarters = list(columns.get("quarter") or [])
+        checks = THRESHOLD_CHECKS + CROSS_CHECKS
+
+        result = {"masks": masks, "fail": {}, "failures": {}, "summary": {}}
+        for guard_type, guard_masks in masks.items():
+            fail = [any(row) for row in zip(*(guard_masks[check] for check in checks))]
+            failures = []
+            for i, failed in enumerate(fail):
+                if failed:
+                    issues = [self.message(check, columns, i, thresholds[guard_type])
+                              for check in checks if guard_masks[check][i]]
+                    failures.append({
+                        "index": i,
+                        "ticker": tickers[i] if i < len(tickers) else None,
+                        "quarter": quarters[i] if i < len(quarters) else None,
+                        "issues": issues
+                    })
+            total = len(fail)
+            fail_count = len(failures)
+            result["fail"][guard_type] = fail
+            result["failures"][guard_type] = failures
+            result["summary"][guard_type] = {
+                "total_items": total,
+                "pass_count": total - fail_count,
+                "fail_count": fail_count,
+                "warning_count": 0,
+                "pass_rate": (total - fail_count) / total if total > 0 else 0.0,
+                "check_fail_counts": {check: sum(guard_masks[check]) for check in checks}
+            }
+        return result
+
+    def check_rows(self, rows: List[Dict[str, Any]],
+                   thresholds: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, Any]:
+        """行形式入力のパネル判定（check_batch 互換の入力）"""
+        return self.check_panel(rows_to_columns(rows), thresholds)
+
+    def message(self, check: str, columns: Dict[str, Sequence[Any]], i: int, t: Dict[str, float]) -> str:
+        """不合格メッセージ（AHFv081R2MathGuard と同文言、t は該当閾値セット）"""
+        v = {name: (columns.get(name) or [0] * (i + 1))[i] or 0 for name in NUMERIC_COLUMNS}
+        if check == "gm_deviation":
+            deviation = abs(v["gm_actual"] - v["gm_expected"])
+            return f"GM乖離が閾値を超過: {deviation:.3f} > {t['gm_deviation_limit']:.3f}"
+        if check == "residual_gp":
+            return f"残差GPが閾値を超過: ${v['gp']:,} > ${t['residual_gp_limit']:,}"
+        if check == "gp_opex_low":
+            return f"GP/OpEx比率が下限を下回る: {v['gp'] / v['opex']:.2f} < {t['gp_opex_ratio_min']:.2f}"
+        if check == "gp_opex_high":
+            return f"GP/OpEx比率が上限を上回る: {v['gp'] / v['opex']:.2f} > {t['gp_opex_ratio_max']:.2f}"
+        if check == "ot_range":
+            return f"OTが範囲外: {v['ot']:.1f} (範囲: {t['ot_min']:.1f}-{t['ot_max']:.1f})"
+        if check == "gp_cross":
+            return f"GP計算不一致: 実際={v['gp']:,}, 計算={v['revenue'] - v['cogs']:,}"
+        return f"OpEx計算不一致: 実際={v['opex']:,}, 計算={v['erc'] + v['da']:,}"
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahf_math_guard_panel.py <input_file>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    # 行形式（リスト）・列形式（辞書）の両方を受け付ける
+    columns = rows_to_columns(data) if isinstance(data, list) else data
+    result = MathGuardPanel().check_panel(columns)
+
+    print(json.dumps({"failures": result["failures"], "summary": result["summary"]}, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+AHF モンテカルロ不確実性伝播（①LEC・②NES・DI）
+ガイダンスレンジ（"115-127"）・GM・成長率などをKPI別分布からサンプルし、
+サンプル列を式へ一括投入して★分布と direction_prob_up/down を算出する
+"""
+
+import re
+import sys
+import json
+import random
+from collections import Counter
+from typing import Dict, List, Any, Optional, Callable
+
+from ahf_axis_bands import (BandConfig, DEFAULT_BANDS, lec_score, nes_score, margin_term, health_term,
+                            disc_pct, valuation_color, star_from_cutoffs, di_score, decision_from_di)
+from ahf_contradiction import parse_value
+
+DEFAULT_SAMPLES = 10000
+
+# triage.json のKPI名 → 入力キー（正規表現, キー, 換算）
+TRIAGE_KPI_INPUTS = [
+    (r'Q\d_revenue_guidance$', "next_q_guidance", 1.0),
+    (r'Q\d_revenue_actual$', "last_q_revenue", 1.0),
+    (r'Q\d_gross_margin$', "gm_actual", 0.01)
+]
+
+Sampler = Callable[[random.Random, int], List[float]]
+
+def make_sampler(spec: Any) -> Sampler:
+    """分布指定 → サンプラー（数値=定数／"低-高"=一様／dict=uniform・triangular・normal）"""
+    if isinstance(spec, dict):
+        dist = spec.get("dist", "uniform")
+        if dist == "uniform":
+            low, high = float(spec["low"]), float(spec["high"])
+            return lambda rng, n: [rng.uniform(low, high) for _ in range(n)]
+        if dist == "triangular":
+            low, high = float(spec["low"]), float(spec["high"])
+            mode = float(spec.get("mode", (low + high) / 2))
+            return lambda rng, n: [rng.triangular(low, high, mode) for _ in range(n)]
+        if dist == "normal":
+            mean, sd = float(spec["mean"]), float(spec["sd"])
+            return lambda rng, n: [rng.gauss(mean, sd) for _ in range(n)]
+        raise ValueError(f"未知の分布: {dist}")
+
+    interval = parse_value(spec)
+    if interval is None:
+        raise ValueError(f"分布化できない値: {spec}")
+    low, high = interval
+    if low == high:
+        return lambda rng, n: [low] * n
+    return lambda rng, n: [rng.uniform(low, high) for _ in range(n)]
+
+def point_estimate(spec: Any) -> float:
+    """点推定（レンジ中点・分布の中心）"""
+    if isinstance(spec, dict):
+        if "mean" in spec:
+            return float(spec["mean"])
+        return float(spec.get("mode", (float(spec["low"]) + float(spec["high"])) / 2))
+    low, high = parse_value(spec)
+    return (low + high) / 2
+
+def inputs_from_triage(triage: Dict[str, Any]) -> Dict[str, Any]:
+    """triage.json（CONFIRMED）→ 分布入力"""
+    inputs = {}
+    for item in triage.get("CONFIRMED", []):
+        for pattern, key, scale in TRIAGE_KPI_INPUTS:
+            if re.search(pattern, item.get("kpi", "")) and parse_value(item.get("value")) is not None:
+                low, high = parse_value(item["value"])
+                inputs[key] = {"dist": "uniform", "low": low * scale, "high": high * scale}
+    return inputs
+
+def distribution(values: List[int]) -> Dict[int, float]:
+    """★分布（1〜5）"""
+    counts = Counter(values)
+    return {star: counts.get(star, 0) / len(values) for star in range(1, 6)}
+
+def direction_split(samples: List[float], base: float) -> Dict[str, float]:
+    """点推定に対する上振れ/下振れ確率（同値は折半）"""
+    above = sum(1 for v in samples if v > base)
+    equal = sum(1 for v in samples if v == base)
+    up = (above + 0.5 * equal) / len(samples)
+    return {"up": up, "down": 1.0 - up}
+
+class MonteCarloEngine:
+    """①②DIのモンテカルロ評価"""
+
+    def __init__(self, samples: int = DEFAULT_SAMPLES, seed: int = 1, bands: BandConfig = DEFAULT_BANDS):
+        self.samples = samples
+        self.seed = seed
+        self.bands = bands
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def _columns(self, inputs: Dict[str, Any], rng: random.Random, n: int) -> Dict[str, List[float]]:
+        """入力ごとのサンプル列（ガイダンスレンジは次Q q/q% に換算）"""
+        columns = {key: make_sampler(spec)(rng, n) for key, spec in inputs.items()}
+        if "next_q_guidance" in columns and "last_q_revenue" in columns and "next_q_qoq_pct" not in inputs:
+            columns["next_q_qoq_pct"] = [(g / last - 1) * 100 if last else 0.0 for g, last in
+                                         zip(columns["next_q_guidance"], columns["last_q_revenue"])]
+        return columns
+
+    def _evaluate(self, columns: Dict[str, List[float]], n: int) -> Dict[str, List[float]]:
+        """サンプル列 → LEC/NES/DI 列"""
+        col = lambda key: columns.get(key, [0.0] * n)
+
+        lec = [lec_score(*args) for args in zip(col("g_fwd"), col("delta_opm_fwd"),
+                                                 col("dilution"), col("capex_intensity"))]
+        margin = [margin_term(a, e) for a, e in zip(col("gm_actual"), col("gm_expected"))]
+        health = [health_term(g, o) for g, o in zip(col("growth_pct"), col("gaap_opm"))]
+        nes = [nes_score(q, r, b, m, h) for q, r, b, m, h in
+               zip(col("next_q_qoq_pct"), col("guidance_revision_pct"), col("backlog_growth_pct"), margin, health)]
+
+        if "evs_actual_ttm" in columns and "evs_peer_median_ttm" in columns:
+            vmult = [valuation_color(disc_pct(a, p), self.bands)[1] for a, p in
+                     zip(columns["evs_actual_ttm"], columns["evs_peer_median_ttm"])]
+        else:
+            vmult = columns.get("vmult", [1.0] * n)
+
+        lec_stars = [star_from_cutoffs(v, self.bands.lec_cutoffs) for v in lec]
+        nes_stars = [star_from_cutoffs(v, self.bands.nes_cutoffs) for v in nes]
+        di = [di_score(l, s, v) for l, s, v in zip(lec_stars, nes_stars, vmult)]
+        return {"lec": lec, "nes": nes, "lec_stars": lec_stars, "nes_stars": nes_stars, "di": di}
+
+    def simulate(self, ticker: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """1銘柄のシミュレーション"""
+        n = self.samples
+        rng = random.Random(f"{self.seed}:{ticker}")
+        sampled = self._evaluate(self._columns(inputs, rng, n), n)
+
+        point_inputs = {key: point_estimate(spec) for key, spec in inputs.items()}
+        base = self._evaluate(self._columns(point_inputs, rng, 1), 1)
+
+        actions = Counter(decision_from_di(v, self.bands) for v in sampled["di"])
+        result = {
+            "ticker": ticker,
+            "samples": n,
+            "lec": {
+                "base_score": base["lec"][0],
+                "star_distribution": distribution(sampled["lec_stars"]),
+                "direction_prob": direction_split(sampled["lec"], base["lec"][0])
+            },
+            "nes": {
+                "base_score": base["nes"][0],
+                "star_distribution": distribution(sampled["nes_stars"]),
+                "direction_prob": direction_split(sampled["nes"], base["nes"][0])
+            },
+            "di": {
+                "base": base["di"][0],
+                "mean": sum(sampled["di"]) / n,
+                "action_prob": {action: actions.get(action, 0) / n for action in ("GO", "WATCH", "NO-GO")}
+            }
+        }
+        self.results[ticker] = result
+        return result
+
+    def run(self, universe: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """ユニバース一括"""
+        return {ticker: self.simulate(ticker, inputs) for ticker, inputs in universe.items()}
+
+    def direction_prob(self, ticker: str, axis: str, direction: str) -> Optional[float]:
+        """_calculate_direction_prob 用（未シミュレーションはNone）"""
+        result = self.results.get(ticker)
+        if result is None or axis not in ("lec", "nes"):
+            return None
+        return result[axis]["direction_prob"][direction]
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 3:
+        print("Usage: python ahf_monte_carlo.py <ticker> <triage_json> [samples]")
+        sys.exit(1)
+
+    with open(sys.argv[2], 'r', encoding='utf-8') as f:
+        triage = json.load(f)
+
+    samples = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_SAMPLES
+    engine = MonteCarloEngine(samples)
+    result = engine.simulate(sys.argv[1], inputs_from_triage(triage))
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
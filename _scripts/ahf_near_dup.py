@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+AHF 近似重複検出（MinHash/LSH）
+backlog.md・triage UNCERTAIN・Turboカードに言い回し/URL違いで重複登録された主張を、
+全件ペア比較なしで逐次検出する
+"""
+
+import re
+import sys
+import json
+import random
+import hashlib
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Any
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 主張テキストとして連結するフィールド（存在するもののみ）
+TEXT_FIELDS = ['kpi', 'claim', 'hypothesis', 'verbatim']
+
+@dataclass
+class DuplicateMatch:
+    """重複判定結果"""
+    item_id: str
+    canonical_id: str
+    similarity: float
+
+class NearDuplicateIndex:
+    """MinHash署名＋LSHバンディングによる逐次重複インデックス"""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.7,
+                 shingle_size: int = 4, seed: int = 1):
+        if num_perm % bands != 0:
+            raise ValueError(f"num_perm({num_perm})はbands({bands})で割り切れる必要があります")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        rng = random.Random(seed)
+        self._perms = [(rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+                       for _ in range(num_perm)]
+
+        self.signatures: Dict[str, Tuple[int, ...]] = {}
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = {}
+        self.matches: Dict[str, DuplicateMatch] = {}
+
+    def add(self, item_id: str, text: str) -> Optional[DuplicateMatch]:
+        """アイテム追加（重複ならcanonicalへの対応を返す）"""
+        # 登録済みIDは再判定しない（同じ結果を返す）
+        if item_id in self.signatures:
+            return self.matches.get(item_id)
+
+        signature = self.signature(text)
+        if signature is None:
+            return None
+
+        # 同一バンドのバケットに入った候補のみ署名比較
+        best: Optional[Tuple[str, float]] = None
+        checked = set()
+        for band_key in self._band_keys(signature):
+            for candidate in self.buckets.get(band_key, []):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                similarity = self._estimate_similarity(signature, self.signatures[candidate])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (candidate, similarity)
+
+        self.signatures[item_id] = signature
+        for band_key in self._band_keys(signature):
+            self.buckets.setdefault(band_key, []).append(item_id)
+
+        if best is None:
+            return None
+
+        # 重複の重複は最初の登録アイテムへ寄せる
+        candidate, similarity = best
+        canonical_id = self.matches[candidate].canonical_id if candidate in self.matches else candidate
+        match = DuplicateMatch(item_id=item_id, canonical_id=canonical_id, similarity=similarity)
+        self.matches[item_id] = match
+        return match
+
+    def is_duplicate(self, item_id: str) -> bool:
+        """重複判定済みか"""
+        return item_id in self.matches
+
+    def signature(self, text: str) -> Optional[Tuple[int, ...]]:
+        """MinHash署名計算"""
+        shingles = self._shingles(text)
+        if not shingles:
+            return None
+
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little')
+                  for s in shingles]
+
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        )
+
+    def _shingles(self, text: str) -> set:
+        """文字k-gram（和文・英文共通）"""
+        normalized = normalize_text(text)
+        k = self.shingle_size
+        if len(normalized) <= k:
+            return {normalized} if normalized else set()
+        return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        """LSHバンドキー"""
+        return [(b, signature[b * self.rows:(b + 1) * self.rows]) for b in range(self.bands)]
+
+    def _estimate_similarity(self, sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """署名一致率（Jaccard推定）"""
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / self.num_perm
+
+    def get_summary(self) -> Dict[str, Any]:
+        """サマリー取得"""
+        return {
+            "indexed_items": len(self.signatures),
+            "duplicate_items": len(self.matches),
+            "bucket_count": len(self.buckets),
+            "threshold": self.threshold
+        }
+
+def normalize_text(text: str) -> str:
+    """正規化（NFKC・小文字・記号除去・空白圧縮）"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    text = re.sub(r'[^\w\s$%.]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def item_text(item: Dict[str, Any]) -> str:
+    """主張テキスト抽出"""
+    return ' '.join(str(item[f]) for f in TEXT_FIELDS if item.get(f))
+
+def dedupe_items(items: List[Dict[str, Any]], index: Optional[NearDuplicateIndex] = None,
+                 id_key: str = 'id') -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """重複除去（残すアイテム, 重複ID→canonical ID）"""
+    index = index or NearDuplicateIndex()
+    kept = []
+    duplicates = {}
+
+    for i, item in enumerate(items):
+        item_id = str(item.get(id_key) or f"item-{i}")
+        match = index.add(item_id, item_text(item))
+        if match:
+            duplicates[item_id] = match.canonical_id
+        else:
+            kept.append(item)
+
+    return kept, duplicates
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahf_near_dup.py <items_json> [threshold]")
+        sys.exit(1)
+
+    input_file = sys.argv[1]
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else 0.7
+
+    with open(input_file, 'r', encoding='utf-8') as f:
+        items = json.load(f)
+
+    index = NearDuplicateIndex(threshold=threshold)
+    kept, duplicates = dedupe_items(items, index)
+
+    print(json.dumps({
+        "kept": len(kept),
+        "duplicates": duplicates,
+        "summary": index.get_summary()
+    }, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
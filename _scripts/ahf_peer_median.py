@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+AHF ピア中央値エンジン（③ evs_peer_median_ttm / S5 Prem_med）
+同一peer_setを共有グループに集約し、グループ中央値をスナップショットごとに1回だけ計算、
+ピア1銘柄の価格更新は二分ヒープの挿入/削除で依存グループへ反映する（再ソートなし）
+"""
+
+import sys
+import json
+import math
+import heapq
+from collections import Counter
+from typing import Dict, List, Optional, Set, Any, FrozenSet
+
+class RunningMedian:
+    """二分ヒープ（遅延削除）による逐次中央値（偶数は中央2値の平均、upper=Trueで上側中央値）"""
+
+    def __init__(self):
+        self._low: List[float] = []    # 下半分（符号反転の最大ヒープ）
+        self._high: List[float] = []   # 上半分（最小ヒープ）
+        self._delayed: Counter = Counter()
+        self._low_size = 0
+        self._high_size = 0
+
+    def __len__(self) -> int:
+        return self._low_size + self._high_size
+
+    def add(self, value: float):
+        """値追加"""
+        if not self._low or value <= -self._low[0]:
+            heapq.heappush(self._low, -value)
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, value)
+            self._high_size += 1
+        self._rebalance()
+
+    def remove(self, value: float):
+        """値削除（存在する値のみ）"""
+        self._delayed[value] += 1
+        if self._low and value <= -self._low[0]:
+            self._low_size -= 1
+            if value == -self._low[0]:
+                self._prune(self._low, -1)
+        else:
+            self._high_size -= 1
+            if self._high and value == self._high[0]:
+                self._prune(self._high, 1)
+        self._rebalance()
+
+    def median(self, upper: bool = False) -> Optional[float]:
+        """中央値（upper: sorted(values)[n // 2]）"""
+        if len(self) == 0:
+            return None
+        if self._low_size > self._high_size:
+            return -self._low[0]
+        if upper:
+            return self._high[0]
+        return (-self._low[0] + self._high[0]) / 2
+
+    def _prune(self, heap: List[float], sign: int):
+        """削除予約済みの先頭を除去"""
+        while heap:
+            value = sign * heap[0]
+            if not self._delayed[value]:
+                break
+            self._delayed[value] -= 1
+            heapq.heappop(heap)
+
+    def _rebalance(self):
+        """下半分＝上半分 or +1 に調整"""
+        if self._low_size > self._high_size + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune(self._low, -1)
+        elif self._low_size < self._high_size:
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+            self._high_size -= 1
+            self._low_size += 1
+            self._prune(self._high, 1)
+
+class PeerGroup:
+    """共有ピアグループ"""
+
+    def __init__(self, members: FrozenSet[str]):
+        self.members = members
+        self.values: Dict[str, float] = {}
+        self.running = RunningMedian()
+        self.dependents: Set[str] = set()
+
+    def set_value(self, peer: str, value: Optional[float]):
+        """ピア値の更新（None/NaNは欠測として除外）"""
+        old = self.values.pop(peer, None)
+        if old is not None:
+            self.running.remove(old)
+        if value is not None and not math.isnan(value):
+            self.values[peer] = value
+            self.running.add(value)
+
+    def median(self, min_peers: int = 2, upper: bool = False) -> Optional[float]:
+        """グループ中央値（有効ピア不足は未判定）"""
+        if len(self.values) < min_peers:
+            return None
+        return self.running.median(upper)
+
+class PeerGroupEngine:
+    """peer_set重複排除＋逐次中央値"""
+
+    def __init__(self, min_peers: int = 2):
+        self.min_peers = min_peers
+        self.groups: Dict[FrozenSet[str], PeerGroup] = {}
+        self.ticker_group: Dict[str, FrozenSet[str]] = {}
+        self.peer_groups: Dict[str, Set[FrozenSet[str]]] = {}
+        self.update_count = 0
+
+    def register(self, ticker: str, peer_set: List[str]) -> FrozenSet[str]:
+        """銘柄のpeer_set登録（同一集合は同一グループ）"""
+        key = frozenset(p for p in peer_set if p != ticker)
+        previous = self.ticker_group.get(ticker)
+        if previous is not None and previous != key:
+            self.groups[previous].dependents.discard(ticker)
+
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = PeerGroup(key)
+            for peer in key:
+                self.peer_groups.setdefault(peer, set()).add(key)
+
+        group.dependents.add(ticker)
+        self.ticker_group[ticker] = key
+        return key
+
+    def load_snapshot(self, values: Dict[str, float]):
+        """スナップショット全体の読み込み（グループごとに1回構築）"""
+        for key, group in self.groups.items():
+            group.values = {}
+            group.running = RunningMedian()
+            for peer in key:
+                group.set_value(peer, values.get(peer))
+
+    def update(self, peer: str, value: Optional[float]) -> Set[str]:
+        """ピア1銘柄の値更新 → 影響を受けた銘柄"""
+        affected = set()
+        for key in self.peer_groups.get(peer, ()):
+            group = self.groups[key]
+            group.set_value(peer, value)
+            self.update_count += 1
+            affected |= group.dependents
+        return affected
+
+    def group_for(self, ticker: str) -> Optional[FrozenSet[str]]:
+        """銘柄の登録グループ（未登録はNone）"""
+        return self.ticker_group.get(ticker)
+
+    def median_for(self, ticker: str, upper: bool = False) -> Optional[float]:
+        """銘柄のピア中央値（③は statistics.median 準拠、S5 Prem_med は upper=True の上側中央値）"""
+        key = self.ticker_group.get(ticker)
+        if key is None:
+            return None
+        return self.groups[key].median(self.min_peers, upper)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """サマリー取得"""
+        return {
+            "tickers": len(self.ticker_group),
+            "groups": len(self.groups),
+            "peers": len(self.peer_groups)
+        }
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 3:
+        print("Usage: python ahf_peer_median.py <peer_sets_json> <evs_json>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        peer_sets = json.load(f)
+    with open(sys.argv[2], 'r', encoding='utf-8') as f:
+        evs = json.load(f)
+
+    engine = PeerGroupEngine()
+    for ticker, peer_set in peer_sets.items():
+        engine.register(ticker, peer_set)
+    engine.load_snapshot(evs)
+
+    print(json.dumps({
+        "medians": {ticker: engine.median_for(ticker) for ticker in peer_sets},
+        "summary": engine.get_summary()
+    }, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+AHF DI一括計算＋ポジションサイジング
+DI = (0.6·s2 + 0.4·s1)·Vmult を全銘柄で列計算し、GO/WATCH/NO-GO帯・Red時DI上限0.55を適用、
+Size ≈ 1.2%×DI を 最大銘柄数 → セクター上限 → グロス上限 の順に比例縮小で配分する
+"""
+
+import os
+import sys
+import csv
+import json
+import heapq
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+from ahf_axis_bands import BandConfig, DEFAULT_BANDS, VMULT, di_score, decision_from_di
+
+DEFAULT_TICKERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "_catalog", "tickers.csv")
+
+# Red時DI上限
+RED_DI_CAP = 0.55
+# Size% ≈ 1.2% × DI
+SIZE_PER_DI = 1.2
+
+@dataclass(frozen=True)
+class SizingConstraints:
+    """ポートフォリオ制約（%はNAV比）"""
+    gross_max_pct: float = 100.0
+    sector_max_pct: float = 30.0
+    max_names: int = 40
+    sized_actions: Tuple[str, ...] = ("GO",)
+
+def load_sectors(path: str = DEFAULT_TICKERS_PATH) -> Dict[str, str]:
+    """tickers.csv → ticker: セクター"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return {row["ticker"]: row["sector"].strip() for row in csv.DictReader(f)}
+
+def batch_di(lec_stars: Sequence[int], nes_stars: Sequence[int], vmult: Sequence[float],
+             bands: BandConfig = DEFAULT_BANDS) -> Tuple[List[float], List[str]]:
+    """DIと判定の列計算（AHFv085Processor.calculate_di 準拠：Red時はDI上限0.55、未満はWATCH）"""
+    di = [di_score(l, n, v) for l, n, v in zip(lec_stars, nes_stars, vmult)]
+    decisions = [decision_from_di(d, bands) for d in di]
+    red = [v == VMULT["Red"] for v in vmult]
+    di = [min(d, RED_DI_CAP) if r else d for d, r in zip(di, red)]
+    decisions = [("WATCH" if d < RED_DI_CAP else a) if r else a for d, a, r in zip(di, decisions, red)]
+    return di, decisions
+
+class PositionSizingEngine:
+    """ブック全体のサイジング"""
+
+    def __init__(self, constraints: SizingConstraints = SizingConstraints(),
+                 sectors: Optional[Dict[str, str]] = None, bands: BandConfig = DEFAULT_BANDS):
+        self.constraints = constraints
+        self.sectors = sectors if sectors is not None else load_sectors()
+        self.bands = bands
+
+    def size_book(self, columns: Dict[str, Sequence[Any]]) -> Dict[str, Any]:
+        """列入力（ticker, lec_stars, nes_stars, vmult）→ 銘柄別サイズとサマリー"""
+        tickers = list(columns["ticker"])
+        di, decisions = batch_di(columns["lec_stars"], columns["nes_stars"], columns["vmult"], self.bands)
+        raw = [SIZE_PER_DI * d if a in self.constraints.sized_actions else 0.0 for d, a in zip(di, decisions)]
+        binding = []
+
+        # 最大銘柄数：DI上位のみ
+        candidates = [i for i, size in enumerate(raw) if size > 0]
+        if len(candidates) > self.constraints.max_names:
+            keep = set(heapq.nlargest(self.constraints.max_names, candidates, key=lambda i: (di[i], -i)))
+            raw = [size if i in keep else 0.0 for i, size in enumerate(raw)]
+            binding.append("max_names")
+
+        # セクター上限：超過セクターのみ比例縮小
+        # tickers.csv 未収録は銘柄単独のバケット（無関係銘柄を "Unknown" に束ねない）、data_gap として報告
+        sector_of = [self.sectors.get(t) or f"Unknown:{t}" for t in tickers]
+        unknown = [t for t in tickers if not self.sectors.get(t)]
+        exposure: Dict[str, float] = {}
+        for sector, size in zip(sector_of, raw):
+            exposure[sector] = exposure.get(sector, 0.0) + size
+        scale = {s: min(1.0, self.constraints.sector_max_pct / e) if e > 0 else 1.0 for s, e in exposure.items()}
+        if any(v < 1.0 for v in scale.values()):
+            binding.append("sector_max")
+        sized = [size * scale[s] for size, s in zip(raw, sector_of)]
+
+        # グロス上限：全体を比例縮小（セクター上限は維持される）
+        gross = sum(sized)
+        if gross > self.constraints.gross_max_pct:
+            factor = self.constraints.gross_max_pct / gross
+            sized = [size * factor for size in sized]
+            gross = self.constraints.gross_max_pct
+            binding.append("gross_max")
+
+        sector_exposure: Dict[str, float] = {}
+        for t, sector, size in zip(tickers, sector_of, sized):
+            if self.sectors.get(t):
+                sector_exposure[sector] = sector_exposure.get(sector, 0.0) + size
+
+        return {
+            "positions": [
+                {"ticker": t, "di": d, "action": a, "sector": self.sectors.get(t), "raw_size_pct": r, "size_pct": z,
+                 "size_category": size_category(r)}
+                for t, d, a, r, z in zip(tickers, di, decisions, raw, sized)
+            ],
+            "summary": {
+                "names": sum(1 for z in sized if z > 0),
+                "gross_pct": gross,
+                "sector_exposure_pct": sector_exposure,
+                "binding_constraints": binding,
+                "data_gaps": {"sector_unknown": unknown}
+            }
+        }
+
+def size_category(size_percentage: float) -> str:
+    """サイズ区分（AHFv081R2Workflow._calculate_size 準拠）"""
+    if size_percentage >= 2.0:
+        return "High"
+    elif size_percentage >= 1.0:
+        return "Med"
+    return "Low"
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahf_position_sizing.py <book_json>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+
+    columns = {key: [row[key] for row in rows] for key in ("ticker", "lec_stars", "nes_stars", "vmult")}
+    result = PositionSizingEngine().size_book(columns)
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
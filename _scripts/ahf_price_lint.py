@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+AHF 列指向 Price-Lint
+1日分のバリュエーション表（ticker, peer, vendor, asof, metric）を列単位で検査し、
+違反マスクと違反レポートを返す（EV使用必須／P/S使用禁止／同日データ必須／同ソースデータ必須）
+"""
+
+import sys
+import json
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+# EV系指標（正規化後）
+EV_METRICS = {"EV/S", "EV/SALES", "EV/S(TTM)", "EV/SALES(TTM)", "EV/REVENUE"}
+PS_METRICS = {"P/S", "PS", "P/SALES", "PRICE/SALES", "P/S(TTM)"}
+
+# マスク名 → 違反メッセージ（AHFv081R2AnchorLint._lint_price_item と同文言）
+VIOLATION_MESSAGES = {
+    "ev_used": "EV使用必須",
+    "ps_used": "P/S使用禁止",
+    "same_day": "同日データ必須",
+    "same_source": "同ソースデータ必須"
+}
+REQUIRED_COLUMNS = ["ticker", "peer", "vendor", "asof", "metric"]
+
+def normalize_metric(metric: Any) -> str:
+    """指標名正規化（空白除去・大文字化）"""
+    return "".join(str(metric or "").split()).upper()
+
+def factorize(values: Sequence[Any]) -> Tuple[List[int], List[Any]]:
+    """値 → (コード列, 一意値)"""
+    uniques: Dict[Any, int] = {}
+    codes = [uniques.setdefault(v, len(uniques)) for v in values]
+    return codes, list(uniques)
+
+def rows_to_columns(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """行形式 → 列形式"""
+    return {column: [row.get(column) for row in rows] for column in REQUIRED_COLUMNS}
+
+class PriceLintTable:
+    """列指向 Price-Lint（issuer行＝peerがtickerと同一の行を基準に比較）"""
+
+    def __init__(self, trading_calendar=None):
+        # 取引所カレンダー（任意：last_trading_day(date)で同日判定を営業日解決）
+        self.trading_calendar = trading_calendar
+
+    def compute_masks(self, columns: Dict[str, Sequence[Any]]) -> Dict[str, List[bool]]:
+        """行ごとの違反マスク（True＝違反）"""
+        missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+        if missing:
+            raise ValueError(f"列不足: {missing}")
+
+        tickers, peers = columns["ticker"], columns["peer"]
+        group_codes, groups = factorize(tickers)
+
+        # 指標は一意値ごとに1回だけ分類
+        metric_codes, metrics = factorize(columns["metric"])
+        normalized = [normalize_metric(m) for m in metrics]
+        is_ev = [m in EV_METRICS for m in normalized]
+        is_ps = [m in PS_METRICS for m in normalized]
+
+        # as-ofは一意値ごとに1回だけ営業日解決
+        date_codes, dates = factorize(columns["asof"])
+        resolved = [self._resolve(d) for d in dates]
+        resolved_codes, _ = factorize(resolved)
+        day = [resolved_codes[c] if resolved[c] is not None else -1 for c in date_codes]
+        vendor_codes, _ = factorize(columns["vendor"])
+
+        # グループ基準行（issuer行、なければ先頭行）
+        reference = [-1] * len(groups)
+        for i, (g, ticker, peer) in enumerate(zip(group_codes, tickers, peers)):
+            if reference[g] < 0 or (peer == ticker and peers[reference[g]] != tickers[reference[g]]):
+                reference[g] = i
+        ref_day = [day[i] for i in reference]
+        ref_vendor = [vendor_codes[i] for i in reference]
+
+        return {
+            "ev_used": [not is_ev[c] for c in metric_codes],
+            "ps_used": [is_ps[c] for c in metric_codes],
+            "same_day": [d != ref_day[g] or d < 0 for d, g in zip(day, group_codes)],
+            "same_source": [v != ref_vendor[g] for v, g in zip(vendor_codes, group_codes)]
+        }
+
+    def lint(self, columns: Dict[str, Sequence[Any]]) -> Dict[str, Any]:
+        """違反マスク＋違反レポート"""
+        masks = self.compute_masks(columns)
+        tickers, peers = columns["ticker"], columns["peer"]
+        group_codes, groups = factorize(tickers)
+
+        any_violation = [any(flags) for flags in zip(*masks.values())]
+        violations: Dict[int, Dict[str, Any]] = {}
+        for i in (i for i, bad in enumerate(any_violation) if bad):
+            entry = violations.setdefault(group_codes[i], {"ticker": tickers[i], "issues": [], "rows": []})
+            entry["rows"].append(peers[i])
+            for name, mask in masks.items():
+                if mask[i] and VIOLATION_MESSAGES[name] not in entry["issues"]:
+                    entry["issues"].append(VIOLATION_MESSAGES[name])
+
+        report = [violations[g] for g in sorted(violations)]
+        return {
+            "masks": masks,
+            "violations": report,
+            "summary": {
+                "total_rows": len(tickers),
+                "total_tickers": len(groups),
+                "pass_count": len(groups) - len(report),
+                "fail_count": len(report),
+                "pass_rate": (len(groups) - len(report)) / len(groups) if groups else 0.0,
+                "violation_rows": {name: sum(mask) for name, mask in masks.items()}
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def _resolve(self, asof: Any) -> Optional[Any]:
+        """as-of解決（欠測・範囲外はNone）"""
+        if asof in (None, ""):
+            return None
+        if self.trading_calendar is None:
+            return str(asof)[:10]
+        try:
+            return self.trading_calendar.last_trading_day(asof)
+        except ValueError:
+            return None
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahf_price_lint.py <valuation_table_json>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    columns = rows_to_columns(data) if isinstance(data, list) else data
+    result = PriceLintTable().lint(columns)
+    result.pop("masks")
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
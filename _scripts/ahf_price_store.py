@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+AHF Price-Mode スナップショットストア（列指向・メモリマップ）
+(date, vendor) ごとに MC/Debt/Pref/Minority/Cash/TTM Sales を列ファイルで保持し、
+ユニバース全体の EV/S(TTM) を銘柄ごとのファイル読込なしで一括計算する
+"""
+
+import os
+import sys
+import json
+import mmap
+import math
+import statistics
+from array import array
+from typing import Dict, List, Optional, Any
+
+COLUMNS = ["market_cap", "total_debt", "preferred", "minority", "cash", "ttm_sales"]
+# 欠測は0とみなすEV項（優先株・少数株主持分がない発行体が大半、必須は MC・Cash・売上）
+ZERO_IF_MISSING = ("total_debt", "preferred", "minority")
+INDEX_FILE = "index.json"
+NAN = float("nan")
+
+class PriceSnapshot:
+    """1スナップショット（date × vendor）の読み取りビュー"""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, INDEX_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("byteorder", sys.byteorder) != sys.byteorder:
+            raise ValueError(f"バイトオーダー不一致: {meta.get('byteorder')}")
+
+        self.path = path
+        self.date = meta["date"]
+        self.vendor = meta["vendor"]
+        self.tickers: List[str] = meta["tickers"]
+        self.index: Dict[str, int] = {t: i for i, t in enumerate(self.tickers)}
+        self.columns: Dict[str, Any] = {}
+        self._handles = []
+
+        for column in meta.get("columns", COLUMNS):
+            self.columns[column] = self._map_column(os.path.join(path, f"{column}.f64"))
+
+    def _map_column(self, file_path: str):
+        """列ファイルをメモリマップ（0行は空配列）"""
+        fh = open(file_path, 'rb')
+        if os.fstat(fh.fileno()).st_size == 0:
+            fh.close()
+            return array('d')
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        raw = memoryview(mm)
+        view = raw.cast('d')
+        self._handles.append((fh, mm, raw, view))
+        return view
+
+    def ev(self) -> List[float]:
+        """EV = MC + Debt + Pref + Minority − Cash（全銘柄、Debt/Pref/Minorityの欠測は0）"""
+        c = self.columns
+        debt, pref, minority = ([0.0 if math.isnan(v) else v for v in c[name]] for name in ZERO_IF_MISSING)
+        return [mc + d + p + m - cash for mc, d, p, m, cash in
+                zip(c["market_cap"], debt, pref, minority, c["cash"])]
+
+    def evs_ttm(self, ev: Optional[List[float]] = None) -> List[float]:
+        """EV/S(TTM)（全銘柄、売上≤0/欠測はNaN）"""
+        ev = ev if ev is not None else self.ev()
+        return [e / s if s > 0 else NAN for e, s in zip(ev, self.columns["ttm_sales"])]
+
+    def evs_of(self, tickers: List[str], evs: Optional[List[float]] = None) -> List[float]:
+        """指定銘柄のEV/S（未収録はNaN）"""
+        evs = evs if evs is not None else self.evs_ttm()
+        return [evs[self.index[t]] if t in self.index else NAN for t in tickers]
+
+    def values(self, evs: Optional[List[float]] = None) -> Dict[str, float]:
+        """ticker: EV/S（ピア中央値エンジンの読み込み用）"""
+        evs = evs if evs is not None else self.evs_ttm()
+        return dict(zip(self.tickers, evs))
+
+    def valuation_fields(self, ticker: str, peer_set: List[str], evs: Optional[List[float]] = None,
+                         peer_engine=None) -> Optional[Dict[str, Any]]:
+        """ValuationData相当の辞書（ピア有効2銘柄未満・自社欠測はNone＝未判定）"""
+        evs = evs if evs is not None else self.evs_ttm()
+        actual = self.evs_of([ticker], evs)[0]
+        peers = [v for v in self.evs_of(peer_set, evs) if not math.isnan(v)]
+        if math.isnan(actual) or len(peers) < 2:
+            return None
+
+        # エンジンの中央値は登録グループが peer_set と一致する場合のみ採用（未登録・未読込・ピア不足は直接計算）
+        peer_median = None
+        if peer_engine is not None and peer_engine.group_for(ticker) == frozenset(p for p in peer_set if p != ticker):
+            peer_median = peer_engine.median_for(ticker)
+        if peer_median is None:
+            peer_median = statistics.median(peers)
+        return {
+            "evs_actual_ttm": actual,
+            "evs_peer_median_ttm": peer_median,
+            "date": self.date,
+            "source": self.vendor,
+            "peer_set": list(peer_set)
+        }
+
+    def close(self):
+        """メモリマップ解放"""
+        for fh, mm, raw, view in self._handles:
+            view.release()
+            raw.release()
+            mm.close()
+            fh.close()
+        self._handles = []
+        self.columns = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class PriceSnapshotStore:
+    """列指向スナップショットストア（<root>/<date>/<vendor>/<column>.f64）"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def snapshot_path(self, date: str, vendor: str) -> str:
+        """スナップショットのパス"""
+        return os.path.join(self.root, date, vendor)
+
+    def write_snapshot(self, date: str, vendor: str, rows: List[Dict[str, Any]]) -> str:
+        """スナップショット書き込み（欠測はNaN）"""
+        path = self.snapshot_path(date, vendor)
+        os.makedirs(path, exist_ok=True)
+
+        tickers = [row["ticker"] for row in rows]
+        if len(set(tickers)) != len(tickers):
+            raise ValueError(f"ティッカー重複: {date}/{vendor}")
+
+        for column in COLUMNS:
+            values = array('d', (_to_float(row.get(column)) for row in rows))
+            with open(os.path.join(path, f"{column}.f64"), 'wb') as f:
+                values.tofile(f)
+
+        with open(os.path.join(path, INDEX_FILE), 'w', encoding='utf-8') as f:
+            json.dump({
+                "date": date,
+                "vendor": vendor,
+                "tickers": tickers,
+                "columns": COLUMNS,
+                "byteorder": sys.byteorder
+            }, f, ensure_ascii=False)
+
+        return path
+
+    def open_snapshot(self, date: str, vendor: str) -> PriceSnapshot:
+        """スナップショットを開く"""
+        return PriceSnapshot(self.snapshot_path(date, vendor))
+
+    def available_dates(self, vendor: str) -> List[str]:
+        """ベンダの収録日（昇順）"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root)
+                      if os.path.isfile(os.path.join(self.root, d, vendor, INDEX_FILE)))
+
+def _to_float(value: Any) -> float:
+    """数値化（欠測はNaN）"""
+    if value is None or value == "":
+        return NAN
+    return float(value)
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 4:
+        print("Usage: python ahf_price_store.py <store_root> <date> <vendor> [rows_json]")
+        sys.exit(1)
+
+    store = PriceSnapshotStore(sys.argv[1])
+    date, vendor = sys.argv[2], sys.argv[3]
+
+    if len(sys.argv) > 4:
+        with open(sys.argv[4], 'r', encoding='utf-8') as f:
+            store.write_snapshot(date, vendor, json.load(f))
+
+    with store.open_snapshot(date, vendor) as snapshot:
+        evs = snapshot.evs_ttm()
+        print(json.dumps({t: (None if math.isnan(v) else round(v, 4)) for t, v in zip(snapshot.tickers, evs)},
+                         indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
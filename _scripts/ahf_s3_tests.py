@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+AHF S3テスト実行（四則1行のテスト式）
+各カードの test_formula を安全な式としてコンパイルし（式テキストでキャッシュ）、銘柄のエビデンス値に束縛して
+同一式のカードを列で一括評価、合否・値・閾値をS3結果へ書き戻す
+"""
+
+import re
+import sys
+import json
+import math
+from typing import Dict, List, Any, Optional
+
+from ahf_safe_expr import CompiledExpression, ExpressionError, compile_expression
+
+# 単独の "=" は比較とみなす（v0.8.0 の四則1行判定と同じ演算子集合）
+SINGLE_EQUALS_PATTERN = re.compile(r'(?<![<>=!])=(?!=)')
+
+def normalize_formula(formula: str) -> str:
+    """テスト式の正規化（1行・"="→"=="）"""
+    return SINGLE_EQUALS_PATTERN.sub('==', formula.strip())
+
+class S3TestRunner:
+    """S3テストの一括実行"""
+
+    def __init__(self, evidence_by_ticker: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.evidence_by_ticker = evidence_by_ticker or {}
+
+    def compile(self, formula: str) -> CompiledExpression:
+        """テスト式コンパイル（1行・単一比較のみ）"""
+        if not formula or '\n' in formula.strip():
+            raise ExpressionError(f"四則1行でないテスト式: {formula!r}")
+        compiled = compile_expression(normalize_formula(formula), allow_compare=True)
+        if compiled.comparison is None:
+            raise ExpressionError(f"比較のないテスト式: {formula}")
+        return compiled
+
+    def is_valid(self, formula: str) -> bool:
+        """テスト式として実行可能か"""
+        try:
+            self.compile(formula)
+            return True
+        except ExpressionError:
+            return False
+
+    def evidence_for(self, card: Dict[str, Any]) -> Dict[str, Any]:
+        """カードのエビデンス値（銘柄値 ← カード固有値で上書き）"""
+        return dict(self.evidence_by_ticker.get(card.get("ticker", ""), {}), **card.get("evidence", {}))
+
+    def run_batch(self, cards: List[Dict[str, Any]],
+                  evidence_by_ticker: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """全カード実行：同一式のカードを束ねて列評価し、結果をカードへ書き戻す"""
+        if evidence_by_ticker is not None:
+            self.evidence_by_ticker = evidence_by_ticker
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(cards)
+        groups: Dict[CompiledExpression, List[int]] = {}
+        for i, card in enumerate(cards):
+            try:
+                groups.setdefault(self.compile(card.get("test_formula", "")), []).append(i)
+            except ExpressionError as e:
+                results[i] = self._record(card, "REWRITE", None, None, None, [], str(e))
+
+        for compiled, indices in groups.items():
+            evidence = [self.evidence_for(cards[i]) for i in indices]
+            env = {name: [values.get(name) for values in evidence] for name in compiled.names}
+            passed = compiled.evaluate(env, len(indices))
+            values, thresholds = compiled.evaluate_sides(env, len(indices))
+            for i, values_i, ok, value, threshold in zip(indices, evidence, passed, values, thresholds):
+                missing = compiled.missing(values_i)
+                if math.isnan(ok):
+                    results[i] = self._record(cards[i], "DEFER", None, value, threshold, missing)
+                else:
+                    results[i] = self._record(cards[i], "PASS" if ok else "FAIL", bool(ok), value, threshold,
+                                              missing)
+        return results
+
+    def _record(self, card: Dict[str, Any], status: str, result: Optional[bool], value: Optional[float],
+                threshold: Optional[float], missing: List[str], error: Optional[str] = None) -> Dict[str, Any]:
+        """カードへの書き戻しと結果行（_run_s3_tests 形式）"""
+        value = None if value is None or math.isnan(value) else value
+        threshold = None if threshold is None or math.isnan(threshold) else threshold
+        card.update({"test_result": status, "test_value": value, "test_threshold": threshold})
+        record = {
+            "id": card.get("id", ""),
+            "ticker": card.get("ticker", ""),
+            "status": status,
+            "result": result,
+            "value": value,
+            "threshold": threshold,
+            "missing": missing
+        }
+        if error:
+            record["error"] = error
+        return record
+
+    def get_summary(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """サマリー"""
+        counts = {status: 0 for status in ("PASS", "FAIL", "DEFER", "REWRITE")}
+        for record in results:
+            counts[record["status"]] += 1
+        return dict(counts, total=len(results))
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahf_s3_tests.py <cards_json> [evidence_json]")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        cards = json.load(f)
+    evidence = {}
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], 'r', encoding='utf-8') as f:
+            evidence = json.load(f)
+
+    runner = S3TestRunner(evidence)
+    results = runner.run_batch(cards)
+
+    print(json.dumps({"results": results, "summary": runner.get_summary(results)}, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
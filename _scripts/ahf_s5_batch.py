@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+AHF S5 バッチエンジン（E：ピア相対・逆DCF-light）
+ユニバース全体の EVS_fair = OPM_fwd×(1−税率)/(WACC−g_fwd)、Prem、Prem_med、e∈{0,0.25,0.5} を列単位で計算
+g_fwd≥WACC（特異点）・入力欠測・ピア不足は data_gap としてマスクする
+"""
+
+import os
+import sys
+import csv
+import json
+import math
+from typing import Dict, List, Optional, Any, Sequence
+
+DEFAULT_TICKERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "_catalog", "tickers.csv")
+DEFAULT_WACC = 0.10
+DEFAULT_TAX_RATE = 0.25
+NAN = float("nan")
+
+# |Prem−Prem_med| の帯（以上→e）
+E_SCORE_BANDS = [(0.10, 0.0), (0.05, 0.25)]
+E_SCORE_MAX = 0.50
+
+def load_default_wacc(path: str = DEFAULT_TICKERS_PATH) -> Dict[str, float]:
+    """tickers.csv → ticker: default_wacc"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return {row["ticker"]: float(row["default_wacc"]) for row in csv.DictReader(f)
+                if row.get("default_wacc")}
+
+def e_score_from_diff(diff: float) -> float:
+    """|Prem−Prem_med| → e"""
+    for threshold, score in E_SCORE_BANDS:
+        if diff >= threshold:
+            return score
+    return E_SCORE_MAX
+
+def peer_median(values: Sequence[float]) -> float:
+    """ピア中央値（process_s5_e_only と同じ上側中央値、NaN除外）"""
+    valid = sorted(v for v in values if not math.isnan(v))
+    return valid[len(valid) // 2] if valid else NAN
+
+class S5BatchEngine:
+    """S5 一括計算"""
+
+    def __init__(self, default_wacc: Optional[Dict[str, float]] = None, tax_rate: float = DEFAULT_TAX_RATE):
+        self.default_wacc = default_wacc if default_wacc is not None else load_default_wacc()
+        self.tax_rate = tax_rate
+
+    def compute(self, columns: Dict[str, Sequence[Any]]) -> Dict[str, List[Any]]:
+        """列入力（ticker, opm_fwd, g_fwd, current_evs, peer_evs[, wacc, tax_rate]）→ 列出力"""
+        tickers = list(columns["ticker"])
+        n = len(tickers)
+        opm = _floats(columns["opm_fwd"])
+        g = _floats(columns["g_fwd"])
+        current = _floats(columns.get("current_evs", [None] * n))
+        tax = _floats(columns.get("tax_rate", [self.tax_rate] * n), self.tax_rate)
+        wacc = [w if not math.isnan(w) else self.default_wacc.get(t, DEFAULT_WACC)
+                for t, w in zip(tickers, _floats(columns.get("wacc", [None] * n)))]
+        peer_evs = columns.get("peer_evs", [[]] * n)
+
+        # 特異点・欠測マスク
+        spread = [w - gf for w, gf in zip(wacc, g)]
+        gap_reason = [
+            "入力欠測" if math.isnan(o) or math.isnan(gf) else
+            "g_fwd≥WACC" if not s > 0 else None
+            for o, gf, s in zip(opm, g, spread)
+        ]
+        evs_fair = [o * (1 - tx) / s if r is None else NAN
+                    for o, tx, s, r in zip(opm, tax, spread, gap_reason)]
+        gap_reason = [r or ("EVS_fair≤0" if not f > 0 else None) for r, f in zip(gap_reason, evs_fair)]
+
+        # Prem は EV/S の単調変換 → Prem_med = (ピアEV/S中央値 − EVS_fair) / EVS_fair
+        med = [peer_median(_floats(p or [])) for p in peer_evs]
+        gap_reason = [r or ("ピア不足" if math.isnan(m) else "現EV/S欠測" if math.isnan(c) else None)
+                      for r, m, c in zip(gap_reason, med, current)]
+        valid = [r is None for r in gap_reason]
+
+        premium = [(c - f) / f if ok else NAN for c, f, ok in zip(current, evs_fair, valid)]
+        prem_med = [(m - f) / f if ok else NAN for m, f, ok in zip(med, evs_fair, valid)]
+        e_score = [e_score_from_diff(abs(p - pm)) if ok else None
+                   for p, pm, ok in zip(premium, prem_med, valid)]
+
+        return {
+            "ticker": tickers,
+            "wacc": wacc,
+            "evs_fair": evs_fair,
+            "premium": premium,
+            "prem_med": prem_med,
+            "e_score": e_score,
+            "data_gap": [not ok for ok in valid],
+            "gap_reason": gap_reason
+        }
+
+    def compute_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """行形式の入出力"""
+        keys = ["ticker", "opm_fwd", "g_fwd", "current_evs", "peer_evs", "wacc", "tax_rate"]
+        columns = {key: [row.get(key) for row in rows] for key in keys}
+        result = self.compute(columns)
+        return [dict(zip(result, values)) for values in zip(*result.values())]
+
+def _floats(values: Sequence[Any], default: float = NAN) -> List[float]:
+    """数値列化（欠測はdefault）"""
+    return [default if v is None or v == "" else float(v) for v in values]
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahf_s5_batch.py <s5_rows_json>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+
+    results = S5BatchEngine().compute_rows(rows)
+    for row in results:
+        for key, value in row.items():
+            if isinstance(value, float) and math.isnan(value):
+                row[key] = None
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
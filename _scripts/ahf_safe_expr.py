@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+AHF 安全な式コンパイラ（eval不使用）
+式を ast で構文解析し、許可ノード（四則・単項±・既知関数・比較/AND/OR）のみを
+列演算のクロージャへ一度だけコンパイルする（1式 × 全銘柄の列を一括評価）
+"""
+
+import re
+import ast
+import sys
+import json
+import math
+import operator
+from functools import lru_cache
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple
+
+NAN = float("nan")
+Column = List[float]
+Env = Dict[str, Sequence[Any]]
+
+# 達成とみなす文字列（achievement_count）
+ACHIEVED_TOKENS = {"achieved", "yes", "true", "達成"}
+
+class ExpressionError(ValueError):
+    """式エラー"""
+
+def _div(a: float, b: float) -> float:
+    """除算（0除算はNaN）"""
+    return a / b if b else NAN
+
+def _avg(*args: float) -> float:
+    """平均"""
+    return sum(args) / len(args) if args else NAN
+
+def _achieved(value: Any) -> bool:
+    """達成判定（真/正の数/達成トークン）"""
+    if isinstance(value, str):
+        return value.strip().lower() in ACHIEVED_TOKENS
+    if isinstance(value, float) and math.isnan(value):
+        return False
+    return bool(value) and value > 0
+
+def _achievement_count(*args: Any) -> float:
+    """達成数"""
+    return float(sum(1 for v in args if _achieved(v)))
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: _div
+}
+UNARY_OPERATORS = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos
+}
+COMPARE_OPERATORS = {
+    ast.GtE: operator.ge,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.Lt: operator.lt,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne
+}
+COMPARE_SYMBOLS = {
+    ast.GtE: ">=",
+    ast.LtE: "<=",
+    ast.Gt: ">",
+    ast.Lt: "<",
+    ast.Eq: "==",
+    ast.NotEq: "!="
+}
+FUNCTIONS: Dict[str, Callable[..., float]] = {
+    "avg": _avg,
+    "min": min,
+    "max": max,
+    "abs": abs,
+    "achievement_count": _achievement_count
+}
+# 引数の個数（最小, 最大／Noneは上限なし）
+FUNCTION_ARITY = {
+    "avg": (1, None),
+    "min": (2, None),
+    "max": (2, None),
+    "abs": (1, 1),
+    "achievement_count": (1, None)
+}
+# 数値以外を受け取る関数（引数をNaN化しない）
+RAW_ARG_FUNCTIONS = {"achievement_count"}
+
+class CompiledExpression:
+    """コンパイル済み式"""
+
+    def __init__(self, text: str, allow_compare: bool = False):
+        self.text = text
+        self.allow_compare = allow_compare
+        self.names: List[str] = []
+        normalized = re.sub(r'\bAND\b', 'and', re.sub(r'\bOR\b', 'or', text))
+        try:
+            tree = ast.parse(normalized.strip(), mode='eval')
+        except SyntaxError as e:
+            raise ExpressionError(f"構文エラー: {text} ({e.msg})")
+        self._fn = self._compile(tree.body)
+        # 単一比較（左辺 op 右辺）は左辺=値・右辺=閾値として個別評価できる
+        self.comparison: Optional[str] = None
+        self._sides = None
+        if allow_compare and isinstance(tree.body, ast.Compare) and len(tree.body.ops) == 1:
+            self.comparison = COMPARE_SYMBOLS[type(tree.body.ops[0])]
+            self._sides = (self._numeric(tree.body.left), self._numeric(tree.body.comparators[0]))
+
+    def evaluate(self, env: Env, n: Optional[int] = None) -> Column:
+        """列評価（未定義の変数はNaN列）"""
+        if n is None:
+            n = max((len(v) for v in env.values()), default=1)
+        return self._fn(env, n)
+
+    def evaluate_sides(self, env: Env, n: Optional[int] = None) -> Optional[Tuple[Column, Column]]:
+        """単一比較の左辺・右辺の列評価（比較式でなければNone）"""
+        if self._sides is None:
+            return None
+        if n is None:
+            n = max((len(v) for v in env.values()), default=1)
+        return self._sides[0](env, n), self._sides[1](env, n)
+
+    def evaluate_one(self, values: Dict[str, Any]) -> float:
+        """1行評価"""
+        return self.evaluate({k: [v] for k, v in values.items()}, 1)[0]
+
+    def missing(self, values: Dict[str, Any]) -> List[str]:
+        """未定義・欠測の変数"""
+        return [name for name in self.names if values.get(name) is None]
+
+    def _compile(self, node: ast.AST) -> Callable[[Env, int], List[Any]]:
+        """ノード → 列関数"""
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            value = float(node.value)
+            return lambda env, n: [value] * n
+
+        if isinstance(node, ast.Name):
+            name = node.id
+            if name not in self.names:
+                self.names.append(name)
+            return lambda env, n: list(env[name]) if name in env else [None] * n
+
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+            op = BINARY_OPERATORS[type(node.op)]
+            left, right = self._numeric(node.left), self._numeric(node.right)
+            return lambda env, n: [op(a, b) for a, b in zip(left(env, n), right(env, n))]
+
+        if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+            op = UNARY_OPERATORS[type(node.op)]
+            operand = self._numeric(node.operand)
+            return lambda env, n: [op(a) for a in operand(env, n)]
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS \
+                and not node.keywords:
+            fn = FUNCTIONS[node.func.id]
+            low, high = FUNCTION_ARITY[node.func.id]
+            if len(node.args) < low or (high is not None and len(node.args) > high):
+                raise ExpressionError(f"引数の個数が不正: {node.func.id}()に{len(node.args)}個 in {self.text}")
+            compile_arg = self._compile if node.func.id in RAW_ARG_FUNCTIONS else self._numeric
+            args = [compile_arg(arg) for arg in node.args]
+            return lambda env, n: [_nan_safe(fn, row) for row in zip(*(a(env, n) for a in args))]
+
+        if self.allow_compare and isinstance(node, ast.Compare) and \
+                all(type(op) in COMPARE_OPERATORS for op in node.ops):
+            operands = [self._numeric(node.left)] + [self._numeric(c) for c in node.comparators]
+            ops = [COMPARE_OPERATORS[type(op)] for op in node.ops]
+            return lambda env, n: [_compare(ops, row) for row in zip(*(o(env, n) for o in operands))]
+
+        if self.allow_compare and isinstance(node, ast.BoolOp):
+            values = [self._compile(v) for v in node.values]
+            combine = all if isinstance(node.op, ast.And) else any
+            return lambda env, n: [_bool_combine(combine, row) for row in zip(*(v(env, n) for v in values))]
+
+        raise ExpressionError(f"許可されない構文: {type(node).__name__} in {self.text}")
+
+    def _numeric(self, node: ast.AST) -> Callable[[Env, int], Column]:
+        """数値列化（欠測・非数値はNaN）"""
+        fn = self._compile(node)
+        return lambda env, n: [_to_float(v) for v in fn(env, n)]
+
+def _to_float(value: Any) -> float:
+    """数値化（欠測・非数値はNaN）"""
+    if value is None or isinstance(value, str):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return NAN
+    return float(value)
+
+def _nan_safe(fn: Callable[..., float], row: Tuple[Any, ...]) -> float:
+    """関数適用（数値引数にNaNがあればNaN）"""
+    if any(isinstance(v, float) and math.isnan(v) for v in row) and fn is not _achievement_count:
+        return NAN
+    return float(fn(*row))
+
+def _compare(ops: List[Callable[[float, float], bool]], row: Tuple[float, ...]) -> float:
+    """連鎖比較（NaNはNaN）"""
+    if any(math.isnan(v) for v in row):
+        return NAN
+    return float(all(op(a, b) for op, a, b in zip(ops, row, row[1:])))
+
+def _bool_combine(combine: Callable, row: Tuple[Any, ...]) -> float:
+    """AND/OR（NaNを含めばNaN）"""
+    values = [_to_float(v) for v in row]
+    if any(math.isnan(v) for v in values):
+        return NAN
+    return float(combine(bool(v) for v in values))
+
+@lru_cache(maxsize=1024)
+def compile_expression(text: str, allow_compare: bool = False) -> CompiledExpression:
+    """式コンパイル（式テキストでキャッシュ）"""
+    return CompiledExpression(text, allow_compare)
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahf_safe_expr.py <expression> [values_json]")
+        sys.exit(1)
+
+    values = json.loads(sys.argv[2]) if len(sys.argv) > 2 else {}
+    expression = compile_expression(sys.argv[1], allow_compare=True)
+    value = expression.evaluate_one(values)
+
+    print(json.dumps({"names": expression.names, "missing": expression.missing(values),
+                      "value": None if math.isnan(value) else value}, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+AHF 感応度グリッド（WACC × g_fwd × OPM_fwd）
+S5 EVS_fair／e と ④FD%／★ を銘柄×グリッドセルへ展開して一括評価し、
+基準セルから e または ④★ が反転するセルを「脆い判定」として報告する
+"""
+
+import sys
+import json
+import math
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, List, Any, Optional, Tuple
+
+from ahf_axis_bands import BandConfig, DEFAULT_BANDS, evs_fair_12m, fd_pct, star_from_cutoffs
+from ahf_s5_batch import S5BatchEngine, DEFAULT_WACC
+
+@dataclass(frozen=True)
+class SensitivityGrid:
+    """基準値からの加算シフト"""
+    wacc_shifts: Tuple[float, ...] = (-0.02, -0.01, 0.0, 0.01, 0.02)
+    g_shifts: Tuple[float, ...] = (-0.02, -0.01, 0.0, 0.01, 0.02)
+    opm_shifts: Tuple[float, ...] = (-0.02, 0.0, 0.02)
+
+    def cells(self) -> List[Tuple[float, float, float]]:
+        """グリッドセル（先頭は基準セル）"""
+        base = (0.0, 0.0, 0.0)
+        return [base] + [c for c in product(self.wacc_shifts, self.g_shifts, self.opm_shifts) if c != base]
+
+class SensitivityEngine:
+    """感応度スキャン"""
+
+    def __init__(self, grid: SensitivityGrid = SensitivityGrid(), bands: BandConfig = DEFAULT_BANDS,
+                 s5_engine: Optional[S5BatchEngine] = None):
+        self.grid = grid
+        self.bands = bands
+        self.s5_engine = s5_engine or S5BatchEngine()
+
+    def scan(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """銘柄行（ticker, g_fwd, opm_fwd, current_evs, peer_evs, evs_actual_today[, wacc, tax_rate]）→ 銘柄別レポート"""
+        cells = self.grid.cells()
+        base_wacc = [row.get("wacc") if row.get("wacc") is not None
+                     else self.s5_engine.default_wacc.get(row["ticker"], DEFAULT_WACC) for row in rows]
+
+        # 銘柄×セルへ展開（S5は1回の列計算）
+        columns: Dict[str, List[Any]] = {key: [] for key in
+                                         ("ticker", "wacc", "g_fwd", "opm_fwd", "tax_rate", "current_evs", "peer_evs")}
+        for row, wacc in zip(rows, base_wacc):
+            for dw, dg, do in cells:
+                columns["ticker"].append(row["ticker"])
+                columns["wacc"].append(wacc + dw)
+                columns["g_fwd"].append(_shift(row.get("g_fwd"), dg))
+                columns["opm_fwd"].append(_shift(row.get("opm_fwd"), do))
+                columns["tax_rate"].append(row.get("tax_rate"))
+                columns["current_evs"].append(row.get("current_evs"))
+                columns["peer_evs"].append(row.get("peer_evs"))
+        s5 = self.s5_engine.compute(columns)
+
+        reports = []
+        for r, row in enumerate(rows):
+            # ④はWACC非依存 → (g, OPM) ごとに1回
+            future_cache: Dict[Tuple[float, float], Tuple[Optional[float], int]] = {}
+            evaluated = []
+            for c, (dw, dg, do) in enumerate(cells):
+                k = r * len(cells) + c
+                if (dg, do) not in future_cache:
+                    future_cache[(dg, do)] = self._future(columns["g_fwd"][k], columns["opm_fwd"][k],
+                                                          row.get("evs_actual_today"))
+                fd, future_stars = future_cache[(dg, do)]
+                evaluated.append({
+                    "wacc": columns["wacc"][k],
+                    "g_fwd": columns["g_fwd"][k],
+                    "opm_fwd": columns["opm_fwd"][k],
+                    "evs_fair": None if math.isnan(s5["evs_fair"][k]) else s5["evs_fair"][k],
+                    "e_score": s5["e_score"][k],
+                    "fd_pct": fd,
+                    "future_stars": future_stars
+                })
+
+            base = evaluated[0]
+            flips = []
+            for cell in evaluated[1:]:
+                flipped = [key for key in ("e_score", "future_stars") if cell[key] != base[key]]
+                if flipped:
+                    flips.append(dict(cell, flipped=flipped))
+
+            reports.append({
+                "ticker": row["ticker"],
+                "base": base,
+                "cells": len(evaluated),
+                "flips": flips,
+                "flip_ratio": len(flips) / (len(evaluated) - 1) if len(evaluated) > 1 else 0.0,
+                "fragile": bool(flips)
+            })
+        return reports
+
+    def _future(self, g_fwd: Optional[float], opm_fwd: Optional[float],
+                evs_actual_today: Optional[float]) -> Tuple[Optional[float], int]:
+        """④FD%と★（_evaluate_future_valuation準拠、データ不足は★0。シフト後の0.0は欠測扱いしない）"""
+        if g_fwd is None or opm_fwd is None or not evs_actual_today:
+            return None, 0
+        fd = fd_pct(evs_fair_12m(g_fwd, opm_fwd), evs_actual_today)
+        return fd, star_from_cutoffs(fd, self.bands.fd_cutoffs)
+
+def _shift(value: Optional[float], delta: float) -> Optional[float]:
+    """欠測はそのまま"""
+    return None if value is None else value + delta
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahf_sensitivity.py <rows_json>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+
+    reports = SensitivityEngine().scan(rows)
+    print(json.dumps([{"ticker": r["ticker"], "base": r["base"], "flip_ratio": r["flip_ratio"],
+                       "flips": r["flips"]} for r in reports if r["fragile"]],
+                     indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
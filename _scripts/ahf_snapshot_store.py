@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+AHF 時点スナップショットストア（内容アドレス）
+tickers/<T>/current の A/B/C.yaml・facts.md・triage.json・backlog.md・impact_cards.json を as-of 日付ごとに
+SHA-256 ブロブとして保存（日付・銘柄をまたいで重複排除）し、「D時点のチェックアウト」を日次スロットでO(1)に引く
+"""
+
+import os
+import sys
+import json
+import hashlib
+from array import array
+from bisect import bisect_left
+from datetime import date
+from typing import Dict, List, Any, Optional, Tuple
+
+DEFAULT_TICKERS_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tickers")
+SNAPSHOT_FILES = ["A.yaml", "B.yaml", "C.yaml", "facts.md", "triage.json", "backlog.md", "impact_cards.json"]
+
+def content_hash(data: bytes) -> str:
+    """内容ハッシュ（SHA-256）"""
+    return hashlib.sha256(data).hexdigest()
+
+def _write_atomic(path: str, data: bytes):
+    """一時ファイル経由で書き込み"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+class TickerHistory:
+    """銘柄の変更履歴（昇順日付 → マニフェスト）と日次スロット"""
+
+    def __init__(self, dates: Optional[List[str]] = None, manifests: Optional[List[str]] = None):
+        self.dates = list(dates or [])
+        self.manifests = list(manifests or [])
+        self._start = 0
+        self._slots = array('i')
+        self._rebuild()
+
+    def _rebuild(self):
+        """日次スロット（初回日〜最終日の各日 → 有効な変更のインデックス）"""
+        self._slots = array('i')
+        if not self.dates:
+            return
+        ordinals = [date.fromisoformat(d).toordinal() for d in self.dates]
+        self._start = ordinals[0]
+        for i, ordinal in enumerate(ordinals):
+            end = ordinals[i + 1] if i + 1 < len(ordinals) else ordinal + 1
+            self._slots.extend([i] * (end - ordinal))
+
+    def record(self, asof: str, manifest: str) -> bool:
+        """変更を記録（その時点の内容と同一なら記録しない）→ 記録したか"""
+        if self.lookup(asof) == manifest:
+            return False
+        position = bisect_left(self.dates, asof)
+        if position < len(self.dates) and self.dates[position] == asof:
+            self.manifests[position] = manifest
+        else:
+            self.dates.insert(position, asof)
+            self.manifests.insert(position, manifest)
+        # 直前・直後と同一内容になった変更は冗長なので除く
+        keep = [i for i in range(len(self.dates)) if i == 0 or self.manifests[i] != self.manifests[i - 1]]
+        self.dates = [self.dates[i] for i in keep]
+        self.manifests = [self.manifests[i] for i in keep]
+        self._rebuild()
+        return True
+
+    def lookup(self, asof: str) -> Optional[str]:
+        """as-of 時点のマニフェスト（初回より前はNone）"""
+        if not self.dates:
+            return None
+        offset = date.fromisoformat(asof).toordinal() - self._start
+        if offset < 0:
+            return None
+        if offset >= len(self._slots):
+            return self.manifests[-1]
+        return self.manifests[self._slots[offset]]
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """保存形式"""
+        return {"dates": self.dates, "manifests": self.manifests}
+
+class SnapshotView:
+    """チェックアウト結果（ファイルはコピーせずブロブを直接読む）"""
+
+    def __init__(self, store: "SnapshotStore", ticker: str, asof: str, manifest_id: str, files: Dict[str, str]):
+        self.store = store
+        self.ticker = ticker
+        self.asof = asof
+        self.manifest_id = manifest_id
+        self.files = files
+
+    def path(self, name: str) -> str:
+        """ブロブのパス（読み取り専用で利用）"""
+        return self.store.blob_path(self.files[name])
+
+    def read(self, name: str) -> bytes:
+        """ファイル内容"""
+        return self.store.read_blob(self.files[name])
+
+    def text(self, name: str) -> str:
+        """テキストとして読む"""
+        return self.read(name).decode("utf-8")
+
+    def json(self, name: str) -> Any:
+        """JSONとして読む"""
+        return json.loads(self.text(name))
+
+class SnapshotStore:
+    """内容アドレス型スナップショットストア（<root>/objects・manifests・refs）"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._histories: Dict[str, TickerHistory] = {}
+        self._manifests: Dict[str, Dict[str, str]] = {}
+        self.stats = {"blobs_written": 0, "blobs_reused": 0, "manifests_written": 0}
+
+    def blob_path(self, blob_id: str) -> str:
+        """ブロブのパス"""
+        return os.path.join(self.root, "objects", blob_id[:2], blob_id[2:])
+
+    def put_blob(self, data: bytes) -> str:
+        """ブロブ保存（既存なら再利用）"""
+        blob_id = content_hash(data)
+        path = self.blob_path(blob_id)
+        if os.path.exists(path):
+            self.stats["blobs_reused"] += 1
+        else:
+            _write_atomic(path, data)
+            self.stats["blobs_written"] += 1
+        return blob_id
+
+    def read_blob(self, blob_id: str) -> bytes:
+        """ブロブ読み込み"""
+        with open(self.blob_path(blob_id), 'rb') as f:
+            return f.read()
+
+    def put_manifest(self, files: Dict[str, str]) -> str:
+        """マニフェスト（ファイル名 → ブロブ）保存"""
+        data = json.dumps(files, sort_keys=True).encode("utf-8")
+        manifest_id = content_hash(data)
+        path = os.path.join(self.root, "manifests", manifest_id)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+            self.stats["manifests_written"] += 1
+        self._manifests[manifest_id] = dict(files)
+        return manifest_id
+
+    def manifest(self, manifest_id: str) -> Dict[str, str]:
+        """マニフェスト読み込み（キャッシュ）"""
+        if manifest_id not in self._manifests:
+            with open(os.path.join(self.root, "manifests", manifest_id), 'r', encoding='utf-8') as f:
+                self._manifests[manifest_id] = json.load(f)
+        return self._manifests[manifest_id]
+
+    def history(self, ticker: str) -> TickerHistory:
+        """銘柄の変更履歴（初回のみ読み込み）"""
+        if ticker not in self._histories:
+            path = os.path.join(self.root, "refs", f"{ticker}.json")
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._histories[ticker] = TickerHistory(data["dates"], data["manifests"])
+            else:
+                self._histories[ticker] = TickerHistory()
+        return self._histories[ticker]
+
+    def capture(self, ticker: str, asof: str, source_dir: Optional[str] = None) -> Tuple[str, bool]:
+        """銘柄のカレントを as-of 日付で保存 → (マニフェストID, 変更として記録したか)"""
+        source_dir = source_dir or os.path.join(DEFAULT_TICKERS_ROOT, ticker, "current")
+        files = {}
+        for name in SNAPSHOT_FILES:
+            path = os.path.join(source_dir, name)
+            if os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    files[name] = self.put_blob(f.read())
+        manifest_id = self.put_manifest(files)
+
+        history = self.history(ticker)
+        recorded = history.record(asof, manifest_id)
+        if recorded:
+            _write_atomic(os.path.join(self.root, "refs", f"{ticker}.json"),
+                          json.dumps(history.to_dict(), ensure_ascii=False).encode("utf-8"))
+        return manifest_id, recorded
+
+    def capture_universe(self, asof: str, tickers_root: str = DEFAULT_TICKERS_ROOT) -> Dict[str, str]:
+        """全銘柄の保存 → ticker: マニフェストID"""
+        return {ticker: self.capture(ticker, asof, os.path.join(tickers_root, ticker, "current"))[0]
+                for ticker in sorted(os.listdir(tickers_root))
+                if os.path.isdir(os.path.join(tickers_root, ticker, "current"))}
+
+    def checkout(self, ticker: str, asof: str) -> Optional[SnapshotView]:
+        """D時点の状態（初回保存より前はNone）"""
+        manifest_id = self.history(ticker).lookup(asof)
+        if manifest_id is None:
+            return None
+        return SnapshotView(self, ticker, asof, manifest_id, self.manifest(manifest_id))
+
+    def dates(self, ticker: str) -> List[str]:
+        """変更のあった日付（昇順）"""
+        return list(self.history(ticker).dates)
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 3:
+        print("Usage: python ahf_snapshot_store.py <store_root> <asof> [ticker]")
+        sys.exit(1)
+
+    store = SnapshotStore(sys.argv[1])
+    asof = sys.argv[2]
+
+    if len(sys.argv) > 3:
+        view = store.checkout(sys.argv[3], asof)
+        print(json.dumps(None if view is None else {"manifest": view.manifest_id, "files": view.files},
+                         indent=2, ensure_ascii=False))
+        return
+
+    manifests = store.capture_universe(asof)
+    print(json.dumps({"asof": asof, "manifests": manifests, "stats": store.stats}, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
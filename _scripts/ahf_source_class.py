@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+AHF ソース分類サービス
+8-K/10-Q/10-K・SEC EDGAR・IR PR・ガイダンス の正規表現を一度だけコンパイルし、
+ソース文字列を型付きの分類（SEC様式／IR PR／ガイダンス／その他）へ変換して有界LRUでメモ化する
+"""
+
+import re
+import sys
+import json
+from enum import Enum
+from functools import lru_cache
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional
+
+SEC_FORM_PATTERN = re.compile(r'8-K|10-Q|10-K', re.IGNORECASE)
+SEC_EDGAR_PATTERN = re.compile(r'SEC\s+EDGAR', re.IGNORECASE)
+SEC_ANCHOR_PATTERN = re.compile(r'8-K|10-Q|10-K|SEC', re.IGNORECASE)
+IR_PR_PATTERN = re.compile(r'IR\s+PR|Investor\s+Relations', re.IGNORECASE)
+GUIDANCE_PATTERN = re.compile(r'ガイダンス|guidance', re.IGNORECASE)
+
+DEFAULT_CACHE_SIZE = 4096
+
+class SourceClass(Enum):
+    """ソース分類"""
+    SEC_FORM = "SEC_FORM"    # 8-K/10-Q/10-K
+    SEC_OTHER = "SEC_OTHER"  # SEC EDGAR等（様式番号なし）
+    IR_PR = "IR_PR"
+    GUIDANCE = "GUIDANCE"
+    OTHER = "OTHER"
+
+# 認知度A（get_cognition_score準拠）
+COGNITION_SCORES = {
+    SourceClass.SEC_FORM: 1.0,
+    SourceClass.IR_PR: 0.75,
+    SourceClass.GUIDANCE: 0.6
+}
+DEFAULT_COGNITION = 0.1
+
+@dataclass(frozen=True)
+class SourceClassification:
+    """分類結果"""
+    source_class: SourceClass
+    form_type: Optional[str]
+    is_t1: bool
+    is_sec_anchor: bool
+    cognition: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書化"""
+        return dict(asdict(self), source_class=self.source_class.value)
+
+def classify_source(source: str) -> SourceClassification:
+    """分類（キャッシュなし）"""
+    form = SEC_FORM_PATTERN.search(source)
+    edgar = SEC_EDGAR_PATTERN.search(source) is not None
+    ir_pr = IR_PR_PATTERN.search(source) is not None
+    guidance = GUIDANCE_PATTERN.search(source) is not None
+
+    if form:
+        source_class = SourceClass.SEC_FORM
+    elif ir_pr:
+        source_class = SourceClass.IR_PR
+    elif guidance:
+        source_class = SourceClass.GUIDANCE
+    elif SEC_ANCHOR_PATTERN.search(source):
+        source_class = SourceClass.SEC_OTHER
+    else:
+        source_class = SourceClass.OTHER
+
+    return SourceClassification(
+        source_class=source_class,
+        form_type=form.group(0).upper() if form else None,
+        is_t1=bool(form) or edgar or ir_pr or guidance,
+        is_sec_anchor=bool(form) or SEC_ANCHOR_PATTERN.search(source) is not None,
+        cognition=COGNITION_SCORES.get(source_class, DEFAULT_COGNITION)
+    )
+
+class SourceClassifier:
+    """有界LRU付きソース分類"""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self._classify = lru_cache(maxsize=maxsize)(classify_source)
+
+    def classify(self, source: str) -> SourceClassification:
+        """分類（同一文字列はO(1)）"""
+        return self._classify(source or "")
+
+    def cognition_score(self, source: str) -> float:
+        """認知度A"""
+        return self.classify(source).cognition
+
+    def is_t1(self, source: str) -> bool:
+        """T1ソースか"""
+        return self.classify(source).is_t1
+
+    def dual_anchor_status(self, sources: List[str]) -> str:
+        """SECアンカー数 → CONFIRMED / PENDING_SEC / SINGLE"""
+        sec_count = sum(1 for s in sources if self.classify(s).is_sec_anchor)
+        if sec_count >= 2:
+            return 'CONFIRMED'
+        elif sec_count == 1:
+            return 'PENDING_SEC'
+        return 'SINGLE'
+
+    def cache_info(self) -> Dict[str, int]:
+        """キャッシュ統計"""
+        info = self._classify.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+
+    def cache_clear(self):
+        """キャッシュ消去"""
+        self._classify.cache_clear()
+
+# 共有インスタンス
+DEFAULT_CLASSIFIER = SourceClassifier()
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahf_source_class.py <source> [...]")
+        sys.exit(1)
+
+    print(json.dumps({s: DEFAULT_CLASSIFIER.classify(s).to_dict() for s in sys.argv[1:]},
+                     indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+AHF 閾値レジストリ
+docs/supplements/turbo_screen/thresholds.yaml をプロセスごとに一度だけ読み込み、不変・版付きのオブジェクトとして
+評価器・Turbo Screen・数理ガードで共有する（版ハッシュは出力の threshold_version 記録用）
+"""
+
+import os
+import sys
+import json
+import copy
+import hashlib
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
+
+import yaml
+
+DEFAULT_THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "docs", "supplements",
+                                       "turbo_screen", "thresholds.yaml")
+
+# 既定値（thresholds.yaml にない節・キーは従来のハードコード値）
+DEFAULT_THRESHOLDS = {
+    "guards": {                       # 数理ガード（緩和＝SCREEN）
+        "gm_bps_max_abs": 50,         # ±0.5pp
+        "residual_gp_usd_max": 12000000,
+        "alpha5_grid_min": -2500000,
+        "gp_opex_ratio_min": 0.3,
+        "gp_opex_ratio_max": 3.0,
+        "ot_min": 40.0,
+        "ot_max": 70.0
+    },
+    "core_guards": {                  # 数理ガード（CORE）
+        "gm_bps_max_abs": 20,         # ±0.2pp
+        "residual_gp_usd_max": 8000000,
+        "gp_opex_ratio_min": 0.5,
+        "gp_opex_ratio_max": 2.0,
+        "ot_min": 46.8,
+        "ot_max": 61.0
+    },
+    "admission": {
+        "edge_p_min": 60,
+        "core_p_min": 70,
+        "ttl_days_max": 14
+    },
+    "confidence": {
+        "boost_pp_max": 10,
+        "core_boost_pp_max": 5,
+        "clip_min": 45,
+        "clip_max": 95
+    }
+}
+
+# 数理ガード種別 → 節
+GUARD_SECTIONS = {"core": "core_guards", "screen": "guards"}
+
+def _freeze(value: Any) -> Any:
+    """入れ子の辞書・リストを不変化"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _thaw(value: Any) -> Any:
+    """不変化の逆（JSON化用）"""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+def _hash(value: Any) -> str:
+    """正規化JSONのハッシュ"""
+    return hashlib.sha256(json.dumps(_thaw(value), sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def _merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """既定値へ上書き（節単位で再帰）"""
+    merged = copy.deepcopy(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+class ThresholdRegistry:
+    """不変・版付きの閾値レジストリ"""
+
+    def __init__(self, values: Dict[str, Any], source: str = ""):
+        self._values = _freeze(values)
+        self.source = source
+        self.section_versions: Mapping[str, str] = MappingProxyType(
+            {section: _hash(v) for section, v in self._values.items()})
+        self.version = _hash(self._values)
+
+    def __setattr__(self, name: str, value: Any):
+        if name in self.__dict__:
+            raise AttributeError(f"ThresholdRegistry は不変: {name}")
+        super().__setattr__(name, value)
+
+    def section(self, name: str) -> Mapping[str, Any]:
+        """節（読み取り専用）"""
+        return self._values[name]
+
+    def get(self, section: str, key: str, default: Any = None) -> Any:
+        """値取得"""
+        return self._values.get(section, {}).get(key, default)
+
+    def math_guard_thresholds(self, guard_type: str) -> Dict[str, float]:
+        """AHFv081R2MathGuard 形式の閾値（呼び出し側で更新可能な複製）"""
+        g = self._values[GUARD_SECTIONS[guard_type]]
+        return {
+            "gm_deviation_limit": g["gm_bps_max_abs"] / 10000,
+            "residual_gp_limit": g["residual_gp_usd_max"],
+            "gp_opex_ratio_min": g["gp_opex_ratio_min"],
+            "gp_opex_ratio_max": g["gp_opex_ratio_max"],
+            "ot_min": g["ot_min"],
+            "ot_max": g["ot_max"]
+        }
+
+    def math_guard_sets(self) -> Dict[str, Dict[str, float]]:
+        """CORE/SCREEN 両閾値セット"""
+        return {guard_type: self.math_guard_thresholds(guard_type) for guard_type in GUARD_SECTIONS}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書化"""
+        return _thaw(self._values)
+
+def load_registry(path: str = DEFAULT_THRESHOLDS_PATH) -> ThresholdRegistry:
+    """thresholds.yaml 読み込み（キャッシュなし）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f) or {}
+    return ThresholdRegistry(_merge(DEFAULT_THRESHOLDS, data), source=os.path.abspath(path))
+
+_REGISTRIES: Dict[str, ThresholdRegistry] = {}
+
+def get_registry(path: str = DEFAULT_THRESHOLDS_PATH) -> ThresholdRegistry:
+    """プロセス共有のレジストリ（パスごとに一度だけ読み込み）"""
+    key = os.path.abspath(path)
+    if key not in _REGISTRIES:
+        _REGISTRIES[key] = load_registry(key)
+    return _REGISTRIES[key]
+
+def main():
+    """メイン実行"""
+    registry = get_registry(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_THRESHOLDS_PATH)
+
+    print(json.dumps({
+        "source": registry.source,
+        "version": registry.version,
+        "section_versions": dict(registry.section_versions),
+        "thresholds": registry.to_dict()
+    }, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
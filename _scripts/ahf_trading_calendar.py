@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+AHF 取引所カレンダー（NYSE）
+同梱の休場ルール表（ネットワーク不要）から営業日インデックスを事前計算し、
+「date以前の直近営業日」をbisectで解決する（Price-Mode：同日ET終値／休場は直近営業日）
+"""
+
+import sys
+import json
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Union, Iterable
+
+DateLike = Union[str, date, datetime]
+
+# ET終値時刻（これより前の時刻指定は前営業日終値）
+ET_CLOSE = time(16, 0)
+
+# 臨時休場（国葬・災害等）
+SPECIAL_CLOSURES = [
+    "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14",
+    "2004-06-11",
+    "2007-01-02",
+    "2012-10-29", "2012-10-30",
+    "2018-12-05",
+    "2025-01-09"
+]
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """第n曜日（n<0は最終から）"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = (date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1))
+    return last - timedelta(days=(last.weekday() - weekday) % 7 + 7 * (-n - 1))
+
+def _easter(year: int) -> date:
+    """復活祭（グレゴリオ暦）"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+def _observed(d: date) -> Optional[date]:
+    """振替（土→金、日→月）。元日が土曜の場合は振替なし（NYSE規則）"""
+    if d.weekday() == 5:
+        return None if (d.month, d.day) == (1, 1) else d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+def nyse_holidays(year: int) -> List[date]:
+    """NYSE定例休場日"""
+    holidays = [
+        _observed(date(year, 1, 1)),
+        _nth_weekday(year, 2, 0, 3),              # Presidents Day
+        _easter(year) - timedelta(days=2),        # Good Friday
+        _nth_weekday(year, 5, 0, -1),             # Memorial Day
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),              # Labor Day
+        _nth_weekday(year, 11, 3, 4),             # Thanksgiving
+        _observed(date(year, 12, 25))
+    ]
+    if year >= 1998:
+        holidays.append(_nth_weekday(year, 1, 0, 3))   # MLK Day
+    if year >= 2022:
+        holidays.append(_observed(date(year, 6, 19)))  # Juneteenth
+    return sorted(d for d in holidays if d is not None)
+
+class TradingCalendar:
+    """営業日インデックス（序数の昇順リスト）"""
+
+    def __init__(self, start_year: int = 2000, end_year: int = 2035):
+        closed = {d for y in range(start_year, end_year + 1) for d in nyse_holidays(y)}
+        closed.update(date.fromisoformat(d) for d in SPECIAL_CLOSURES)
+
+        self.start = date(start_year, 1, 1)
+        self.end = date(end_year, 12, 31)
+        self.ordinals: List[int] = [
+            o for o in range(self.start.toordinal(), self.end.toordinal() + 1)
+            if date.fromordinal(o).weekday() < 5 and date.fromordinal(o) not in closed
+        ]
+        self._ordinal_set = set(self.ordinals)
+        self._cache: Dict[DateLike, date] = {}
+
+    def is_trading_day(self, d: DateLike) -> bool:
+        """営業日か"""
+        return _to_date(d).toordinal() in self._ordinal_set
+
+    def last_trading_day(self, d: DateLike) -> date:
+        """date以前の直近営業日（datetimeはET換算で終値前なら前営業日）"""
+        cached = self._cache.get(d)
+        if cached is not None:
+            return cached
+
+        value = _parse(d)
+        target = _to_date(value)
+        if isinstance(value, datetime) and value.time() < ET_CLOSE:
+            target -= timedelta(days=1)
+        if not (self.start <= target <= self.end):
+            raise ValueError(f"カレンダー範囲外: {target} ({self.start}〜{self.end})")
+
+        pos = bisect_right(self.ordinals, target.toordinal()) - 1
+        if pos < 0:
+            raise ValueError(f"カレンダー範囲外: {target}")
+
+        resolved = date.fromordinal(self.ordinals[pos])
+        self._cache[d] = resolved
+        return resolved
+
+    def resolve_many(self, dates: Iterable[DateLike]) -> List[date]:
+        """日付配列の一括解決（重複はキャッシュ）"""
+        return [self.last_trading_day(d) for d in dates]
+
+    def same_day_aligned(self, dates: Iterable[DateLike]) -> bool:
+        """全行が同一営業日終値に揃うか"""
+        return len(set(self.resolve_many(dates))) <= 1
+
+def _parse(d: DateLike) -> Union[date, datetime]:
+    """文字列は時刻付きならdatetime、日付のみならdate（datetimeはETへ換算して終値判定）"""
+    if isinstance(d, datetime):
+        return _to_eastern(d)
+    if isinstance(d, date):
+        return d
+    text = str(d).strip()
+    if len(text) > 10:
+        return _to_eastern(datetime.fromisoformat(text))
+    return date.fromisoformat(text)
+
+def _to_eastern(dt: datetime) -> datetime:
+    """タイムゾーン付きdatetime → ET（naive、米国夏時間ルール。naiveはET扱いでそのまま）"""
+    if dt.tzinfo is None or dt.utcoffset() is None:
+        return dt
+    utc = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    year = utc.year
+    if year >= 2007:
+        # 3月第2日曜 2:00 EST 〜 11月第1日曜 2:00 EDT
+        dst_start, dst_end = _nth_weekday(year, 3, 6, 2), _nth_weekday(year, 11, 6, 1)
+    else:
+        # 4月第1日曜 〜 10月最終日曜
+        dst_start, dst_end = _nth_weekday(year, 4, 6, 1), _nth_weekday(year, 10, 6, -1)
+    start = datetime.combine(dst_start, time(7, 0))
+    end = datetime.combine(dst_end, time(6, 0))
+    return utc + timedelta(hours=-4 if start <= utc < end else -5)
+
+def _to_date(d: DateLike) -> date:
+    """日付化"""
+    if isinstance(d, datetime):
+        return d.date()
+    if isinstance(d, date):
+        return d
+    return date.fromisoformat(str(d)[:10])
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahf_trading_calendar.py <YYYY-MM-DD> [...]")
+        sys.exit(1)
+
+    calendar = TradingCalendar()
+    resolved = calendar.resolve_many(sys.argv[1:])
+    print(json.dumps({d: r.isoformat() for d, r in zip(sys.argv[1:], resolved)}, indent=2))
+
+if __name__ == "__main__":
+    main()
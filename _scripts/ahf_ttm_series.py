@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+AHF 四半期時系列 → TTM売上／as-of EV
+銘柄ごとの四半期 売上・負債・現金 を配列で保持し、直近4四半期合計（Sum(last4Q revenue)）と
+公表日基準で揃えたEVを算出する（新四半期の追加は影響する窓のみ再計算、修正再表示は公表日付きの版で保持）
+"""
+
+import sys
+import json
+import math
+import statistics
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from typing import Dict, List, Optional, Any, Tuple, Union
+
+DateLike = Union[str, date, datetime]
+NAN = float("nan")
+
+# EV = MC + Debt + Pref + Minority − Cash
+BALANCE_FIELDS = ["total_debt", "preferred", "minority", "cash"]
+# 欠測はNaN（EV不成立＝data_gap）、優先株・少数株主持分は欠測0
+REQUIRED_BALANCE_FIELDS = ("total_debt", "cash")
+TTM_SOURCE = "Sum(last4Q revenue)"
+
+# 公表日不明時の保守的な提出ラグ（日）：10-K 非早期提出会社の期限90日（期末当日を既知とみなさない）
+DEFAULT_FILING_LAG_DAYS = 90
+
+# 連続四半期とみなす期末間隔（日）
+QUARTER_GAP_DAYS = (80, 100)
+
+class QuarterlySeries:
+    """1銘柄の四半期系列（期末順の配列）"""
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.period_end = array('l')
+        self.available = array('l')
+        self.revenue = array('d')
+        self.balance = {field: array('d') for field in BALANCE_FIELDS}
+        self.ttm = array('d')
+        self.window_count = 0
+        # 修正再表示：期末 → [(公表日, 売上, 残高)]（公表日昇順、配列は初回公表値のまま）
+        self.revisions: Dict[int, List[Tuple[int, float, Dict[str, float]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.period_end)
+
+    def add_quarter(self, period_end: DateLike, revenue: float, available: Optional[DateLike] = None,
+                    **balance: float) -> int:
+        """四半期追加（公表日なしは期末＋DEFAULT_FILING_LAG_DAYS、同一期末は公表日付きの修正再表示）→ 位置"""
+        ordinal = _to_date(period_end).toordinal()
+        available_ordinal = (_to_date(available).toordinal() if available is not None
+                             else ordinal + DEFAULT_FILING_LAG_DAYS)
+        pos = bisect_left(self.period_end, ordinal)
+        values = {field: _to_float(balance.get(field, NAN if field in REQUIRED_BALANCE_FIELDS else 0.0))
+                  for field in BALANCE_FIELDS}
+
+        if pos < len(self) and self.period_end[pos] == ordinal:
+            if available is None or available_ordinal < self.available[pos]:
+                raise ValueError(f"{self.ticker}: 修正再表示には初回公表日以降の公表日が必要 ({_to_date(period_end)})")
+            if available_ordinal > self.available[pos]:
+                self._add_revision(ordinal, available_ordinal, _to_float(revenue), values)
+                return pos
+            # 初回公表と同日の訂正は初回値を置き換え
+            self.revenue[pos] = _to_float(revenue)
+            for field in BALANCE_FIELDS:
+                self.balance[field][pos] = values[field]
+        else:
+            if (pos > 0 and self.available[pos - 1] > available_ordinal) or \
+                    (pos < len(self) and self.available[pos] < available_ordinal):
+                raise ValueError(f"{self.ticker}: 公表日が期末順と矛盾 ({_to_date(period_end)})")
+            self.period_end.insert(pos, ordinal)
+            self.available.insert(pos, available_ordinal)
+            self.revenue.insert(pos, _to_float(revenue))
+            for field in BALANCE_FIELDS:
+                self.balance[field].insert(pos, values[field])
+            self.ttm.insert(pos, NAN)
+
+        # posを含む窓（pos〜pos+3）のみ再計算
+        for i in range(pos, min(pos + 4, len(self))):
+            self.ttm[i] = self._window_sum(i)
+            self.window_count += 1
+        return pos
+
+    def _add_revision(self, ordinal: int, available_ordinal: int, revenue: float, values: Dict[str, float]):
+        """修正再表示の版を追加（同一公表日は置き換え）"""
+        versions = self.revisions.setdefault(ordinal, [])
+        k = bisect_left([v[0] for v in versions], available_ordinal)
+        if k < len(versions) and versions[k][0] == available_ordinal:
+            versions[k] = (available_ordinal, revenue, values)
+        else:
+            versions.insert(k, (available_ordinal, revenue, values))
+
+    def _version(self, i: int, asof_ordinal: int) -> Optional[Tuple[int, float, Dict[str, float]]]:
+        """as-of時点で公表済みの最新の修正版（なければNone＝初回公表値）"""
+        versions = self.revisions.get(self.period_end[i])
+        if not versions:
+            return None
+        k = bisect_right([v[0] for v in versions], asof_ordinal) - 1
+        return versions[k] if k >= 0 else None
+
+    def _window_ok(self, i: int) -> bool:
+        """連続4四半期が揃っているか"""
+        if i < 3:
+            return False
+        low, high = QUARTER_GAP_DAYS
+        return all(low <= self.period_end[j] - self.period_end[j - 1] <= high for j in range(i - 2, i + 1))
+
+    def _window_sum(self, i: int) -> float:
+        """直近4四半期合計（初回公表値、連続4四半期が揃わなければNaN）"""
+        return sum(self.revenue[i - 3:i + 1]) if self._window_ok(i) else NAN
+
+    def index_asof(self, asof: DateLike) -> int:
+        """as-of時点で公表済みの最新四半期（なければ-1）"""
+        return bisect_right(self.available, _to_date(asof).toordinal()) - 1
+
+    def _revenue_window(self, i: int, asof_ordinal: int) -> Optional[List[float]]:
+        """as-of時点の版で見た直近4四半期売上（窓不成立はNone）"""
+        if not self._window_ok(i):
+            return None
+        revenues = []
+        for j in range(i - 3, i + 1):
+            version = self._version(j, asof_ordinal)
+            revenues.append(version[1] if version is not None else self.revenue[j])
+        return revenues
+
+    def ttm_asof(self, asof: DateLike) -> float:
+        """as-of時点のTTM売上（修正再表示は公表日以降のみ反映）"""
+        i = self.index_asof(asof)
+        if i < 0:
+            return NAN
+        if not self.revisions:
+            return self.ttm[i]
+        revenues = self._revenue_window(i, _to_date(asof).toordinal())
+        return sum(revenues) if revenues is not None else NAN
+
+    def last4q_asof(self, asof: DateLike) -> Optional[List[float]]:
+        """as-of時点の直近4四半期売上（vendor_matrixのrevenue_last4q列）"""
+        i = self.index_asof(asof)
+        if i < 0:
+            return None
+        revenues = self._revenue_window(i, _to_date(asof).toordinal())
+        if revenues is None or any(math.isnan(r) for r in revenues):
+            return None
+        return revenues
+
+    def balance_asof(self, i: int, asof: DateLike) -> Dict[str, float]:
+        """四半期 i の as-of 時点の残高（修正再表示は公表日以降のみ反映）"""
+        version = self._version(i, _to_date(asof).toordinal()) if self.revisions else None
+        if version is not None:
+            return dict(version[2])
+        return {field: self.balance[field][i] for field in BALANCE_FIELDS}
+
+    def ev_series(self, dates: List[DateLike], market_caps: List[float]) -> List[float]:
+        """日付列 × 時価総額列 → as-of EV列（負債/現金の欠測はNaN）"""
+        ev = []
+        for d, mc in zip(dates, market_caps):
+            i = self.index_asof(d)
+            if i < 0:
+                ev.append(NAN)
+                continue
+            b = self.balance_asof(i, d)
+            ev.append(_to_float(mc) + b["total_debt"] + b["preferred"] + b["minority"] - b["cash"])
+        return ev
+
+    def evs_series(self, dates: List[DateLike], market_caps: List[float]) -> List[float]:
+        """日付列 × 時価総額列 → EV/S(TTM)列"""
+        ev = self.ev_series(dates, market_caps)
+        sales = [self.ttm_asof(d) for d in dates]
+        return [e / s if s > 0 else NAN for e, s in zip(ev, sales)]
+
+class TTMSeriesStore:
+    """ユニバースの四半期系列"""
+
+    def __init__(self, vendor: str):
+        self.vendor = vendor
+        self.series: Dict[str, QuarterlySeries] = {}
+
+    def add_quarter(self, ticker: str, period_end: DateLike, revenue: float,
+                    available: Optional[DateLike] = None, **balance: float) -> int:
+        """四半期追加"""
+        series = self.series.setdefault(ticker, QuarterlySeries(ticker))
+        return series.add_quarter(period_end, revenue, available, **balance)
+
+    def load_rows(self, rows: List[Dict[str, Any]]):
+        """行形式（ticker, period_end, revenue, available, 負債/現金…）の一括投入"""
+        for row in sorted(rows, key=lambda r: (r["ticker"], str(r["period_end"]), str(r.get("available") or ""))):
+            self.add_quarter(row["ticker"], row["period_end"], row["revenue"], row.get("available"),
+                             **{field: row[field] for field in BALANCE_FIELDS if field in row})
+
+    def evs_ttm(self, ticker: str, asof: DateLike, market_cap: float) -> float:
+        """as-of EV/S(TTM)"""
+        series = self.series.get(ticker)
+        if series is None:
+            return NAN
+        return series.evs_series([asof], [market_cap])[0]
+
+    def snapshot_rows(self, asof: DateLike, market_caps: Dict[str, float]) -> List[Dict[str, Any]]:
+        """PriceSnapshotStore.write_snapshot / VendorEVSEngine.compute_dump 用の行"""
+        rows = []
+        for ticker, mc in market_caps.items():
+            series = self.series.get(ticker)
+            i = series.index_asof(asof) if series is not None else -1
+            row = {"ticker": ticker, "market_cap": mc, "ttm_sales": NAN, "revenue_last4q": None}
+            row.update(series.balance_asof(i, asof) if i >= 0 else {field: NAN for field in BALANCE_FIELDS})
+            if i >= 0:
+                row["ttm_sales"] = series.ttm_asof(asof)
+                row["revenue_last4q"] = series.last4q_asof(asof)
+            rows.append(row)
+        return rows
+
+    def valuation_fields(self, ticker: str, peer_set: List[str], asof: DateLike,
+                         market_caps: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        """ValuationData相当の辞書（ピア有効2銘柄未満・自社欠測はNone＝未判定）"""
+        actual = self.evs_ttm(ticker, asof, market_caps.get(ticker, NAN))
+        peers = [v for v in (self.evs_ttm(p, asof, market_caps.get(p, NAN)) for p in peer_set)
+                 if not math.isnan(v)]
+        if math.isnan(actual) or len(peers) < 2:
+            return None
+        return {
+            "evs_actual_ttm": actual,
+            "evs_peer_median_ttm": statistics.median(peers),
+            "date": _to_date(asof).isoformat(),
+            "source": f"{self.vendor} ({TTM_SOURCE})",
+            "peer_set": list(peer_set)
+        }
+
+def _to_date(d: DateLike) -> date:
+    """日付化"""
+    if isinstance(d, datetime):
+        return d.date()
+    if isinstance(d, date):
+        return d
+    return date.fromisoformat(str(d)[:10])
+
+def _to_float(value: Any) -> float:
+    """数値化（欠測はNaN）"""
+    if value is None or value == "":
+        return NAN
+    return float(value)
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 4:
+        print("Usage: python ahf_ttm_series.py <quarters_json> <asof> <market_caps_json> [vendor]")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        quarters = json.load(f)
+    with open(sys.argv[3], 'r', encoding='utf-8') as f:
+        market_caps = json.load(f)
+
+    store = TTMSeriesStore(sys.argv[4] if len(sys.argv) > 4 else "Unknown")
+    store.load_rows(quarters)
+    result = {t: store.evs_ttm(t, sys.argv[2], mc) for t, mc in market_caps.items()}
+
+    print(json.dumps({t: (None if math.isnan(v) else round(v, 4)) for t, v in result.items()},
+                     indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
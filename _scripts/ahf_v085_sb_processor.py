@@ -10,10 +10,21 @@ import sys
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 
+from ahf_source_class import DEFAULT_CLASSIFIER
+
 class AHFv085Processor:
     """AHF v0.8.5-SB プロセッサー"""
     
-    def __init__(self):
+    def __init__(self, peer_engine=None, verdict_table=None, catalyst_ledgers=None, source_classifier=None):
+        # ソース分類（コンパイル済み正規表現＋LRU、既定は共有インスタンス）
+        self.source_classifier = source_classifier or DEFAULT_CLASSIFIER
+        # ピア中央値エンジン（任意：median_for(ticker)で共有グループのEV/S中央値を返す）
+        self.peer_engine = peer_engine
+        # Verdict決定表（任意：lookup(...)でcalculate_verdict_abcと同じ結果を返す、範囲外はNone）
+        self.verdict_table = verdict_table
+        # カタリスト台帳（任意：ticker → upsert(catalyst) / d_ledger() / d_calculation() を持つ台帳）
+        self.catalyst_ledgers = catalyst_ledgers or {}
+        
         # ステージ定義
         self.stages = {
             'S4': self.process_s4_d_only,
@@ -37,14 +48,7 @@ class AHFv085Processor:
     
     def validate_t1_source(self, source: str) -> bool:
         """T1ソースの検証"""
-        t1_patterns = [
-            r'8-K|10-Q|10-K',
-            r'SEC\s+EDGAR',
-            r'IR\s+PR|Investor\s+Relations',
-            r'ガイダンス|guidance'
-        ]
-        
-        return any(re.search(pattern, source, re.IGNORECASE) for pattern in t1_patterns)
+        return self.source_classifier.is_t1(source)
     
     def calculate_alpha3_nowcast(self, mix_data: Dict, causality_data: Dict) -> int:
         """α3 Now-cast計算"""
@@ -213,6 +217,17 @@ class AHFv085Processor:
             'data_gaps': []
         }
         
+        # 永続台帳があれば差分更新済みの U / Umax を使用
+        ledger = self.catalyst_ledgers.get(data.get('ticker'))
+        if ledger is not None:
+            for catalyst in data.get('catalysts', []):
+                ledger.upsert(catalyst)
+            result['d_ledger'] = ledger.d_ledger()
+            result['d_calculation'] = ledger.d_calculation()
+            result['d_minus'] = data.get('discount_factors', [])
+            result['data_gaps'] = data.get('data_gaps', [])
+            return result
+        
         # カタリスト台帳の構築
         catalysts = data.get('catalysts', [])
         for catalyst in catalysts:
@@ -270,7 +285,19 @@ class AHFv085Processor:
         tax_rate = data.get('tax_rate', 0.25)
         wacc = data.get('wacc', 0.10)
         g_fwd = data.get('g_fwd', 0)
-        
+
+        # 特異点（g_fwd≥WACC）は EVS_fair 不定 → data_gap
+        if wacc - g_fwd <= 0:
+            result['evs_fair_calculation'] = {
+                'opm_fwd': opm_fwd,
+                'tax_rate': tax_rate,
+                'wacc': wacc,
+                'g_fwd': g_fwd,
+                'evs_fair': None
+            }
+            result['data_gaps'] = data.get('data_gaps', []) + ['g_fwd≥WACC']
+            return result
+
         evs_fair = (opm_fwd * (1 - tax_rate)) / (wacc - g_fwd)
         result['evs_fair_calculation'] = {
             'opm_fwd': opm_fwd,
@@ -282,7 +309,18 @@ class AHFv085Processor:
         
         # 相対スコア e
         peers = data.get('peers', [])
-        if peers:
+        # ピアPremの上側中央値（sorted(premiums)[n // 2]）と同じ規則
+        # エンジンは登録グループが peers と一致する場合（peers未指定を含む）のみ採用、不一致は peers から直接計算
+        peer_median = None
+        if self.peer_engine and data.get('ticker'):
+            peer_tickers = frozenset(p.get('ticker') for p in peers if p.get('ticker') != data['ticker'])
+            if not peers or self.peer_engine.group_for(data['ticker']) == peer_tickers:
+                peer_median = self.peer_engine.median_for(data['ticker'], upper=True)
+        if peer_median is not None:
+            # Premは EV/S の単調変換 → Prem_med = (EV/S中央値 − EVS_fair) / EVS_fair
+            prem_med = (peer_median - evs_fair) / evs_fair if evs_fair > 0 else 0
+            result['e_score'] = self._e_score_from_premium(data, evs_fair, prem_med)
+        elif peers:
             premiums = []
             for peer in peers:
                 peer_evs = peer.get('evs', 0)
@@ -291,23 +329,22 @@ class AHFv085Processor:
             
             if premiums:
                 prem_med = sorted(premiums)[len(premiums) // 2]
-                current_premium = (data.get('current_evs', 0) - evs_fair) / evs_fair if evs_fair > 0 else 0
-                
-                # |Prem−Prem_med|≥10pp：0 / 0.25 / 0.50
-                diff = abs(current_premium - prem_med)
-                if diff >= 0.10:
-                    e_score = 0
-                elif diff >= 0.05:
-                    e_score = 0.25
-                else:
-                    e_score = 0.50
-                
-                result['e_score'] = e_score
+                result['e_score'] = self._e_score_from_premium(data, evs_fair, prem_med)
         
         result['data_gaps'] = data.get('data_gaps', [])
         
         return result
     
+    def _e_score_from_premium(self, data: Dict, evs_fair: float, prem_med: float) -> float:
+        """相対スコア e（|Prem−Prem_med|≥10pp：0 / 0.25 / 0.50）"""
+        current_premium = (data.get('current_evs', 0) - evs_fair) / evs_fair if evs_fair > 0 else 0
+        diff = abs(current_premium - prem_med)
+        if diff >= 0.10:
+            return 0
+        elif diff >= 0.05:
+            return 0.25
+        return 0.50
+    
     def process_s6_synthesis(self, data: Dict) -> Dict:
         """S6｜④ 将来EVバリュ（総合）処理（Proof-Ladder仕様）"""
         result = {
@@ -342,8 +379,12 @@ class AHFv085Processor:
         result['e_intensity'] = data.get('e_intensity', 'Med')
         result['red_flags'] = data.get('red_flags', ['集中度の数値開示不足', '運転資本改善の定量化待ち'])
         
-        # ④クイック判定（A/B/Cルール）
-        future_stars, verdict = self.calculate_verdict_abc(
+        # ④クイック判定（A/B/Cルール、決定表があれば表引き）
+        looked_up = None
+        if self.verdict_table is not None:
+            looked_up = self.verdict_table.lookup(lec_stars, nes_stars, current_color, e_score,
+                                                  d_value, visibility_b)
+        future_stars, verdict = looked_up or self.calculate_verdict_abc(
             lec_stars, nes_stars, current_color, e_score, 
             d_value, visibility_b
         )
@@ -404,27 +445,12 @@ class AHFv085Processor:
     
     def determine_dual_anchor_status(self, data: Dict) -> str:
         """dual_anchor_statusの決定"""
-        # T1ソースの確認
-        t1_sources = data.get('t1_sources', [])
-        sec_sources = [s for s in t1_sources if re.search(r'8-K|10-Q|10-K|SEC', s, re.IGNORECASE)]
-        
-        if len(sec_sources) >= 2:
-            return 'CONFIRMED'
-        elif len(sec_sources) == 1:
-            return 'PENDING_SEC'
-        else:
-            return 'SINGLE'
+        # T1ソースの確認（SECアンカー数）
+        return self.source_classifier.dual_anchor_status(data.get('t1_sources', []))
     
     def get_cognition_score(self, source: str) -> float:
         """認知度スコア計算"""
-        if re.search(r'8-K|10-Q|10-K', source, re.IGNORECASE):
-            return 1.0
-        elif re.search(r'IR\s+PR|Investor\s+Relations', source, re.IGNORECASE):
-            return 0.75
-        elif re.search(r'ガイダンス|guidance', source, re.IGNORECASE):
-            return 0.6
-        else:
-            return 0.1
+        return self.source_classifier.cognition_score(source)
     
     def get_impact_score(self, impact: str) -> float:
         """影響度スコア計算"""
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+AHF ベンダ別 EV/S(TTM) 計算エンジン
+docs/supplements/price_mode/vendor_matrix.csv のEV算式・TTM定義を読み込み、
+ベンダの日次ダンプを列単位で一括計算する（Price-Lint：同一ベンダ/同一TTM定義）
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Any, Sequence
+
+DEFAULT_MATRIX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "docs",
+                                   "supplements", "price_mode", "vendor_matrix.csv")
+NAN = float("nan")
+
+# vendor_matrix.csv の算式トークン → スナップショット列名
+EV_TOKENS = {
+    "MC": "market_cap",
+    "Debt": "total_debt",
+    "Pref": "preferred",
+    "Minority": "minority",
+    "Cash": "cash",
+    "Reported EV": "reported_ev"
+}
+TTM_DEFS = {
+    "Sum(last4Q revenue)": "revenue_last4q",
+    "Reported TTM": "reported_ttm_sales"
+}
+
+@dataclass(frozen=True)
+class VendorSpec:
+    """ベンダ仕様"""
+    vendor: str
+    ev_terms: Tuple[Tuple[int, str], ...]
+    ttm_def: str
+    ttm_column: str
+    time_basis: str
+    notes: str
+
+    @property
+    def required_columns(self) -> List[str]:
+        """必要列"""
+        return [column for _, column in self.ev_terms] + [self.ttm_column]
+
+def parse_ev_formula(formula: str) -> Tuple[Tuple[int, str], ...]:
+    """EV算式 → (符号, 列名) 列"""
+    terms = []
+    for sign, token in re.findall(r'([+\-−]?)\s*([A-Za-z][A-Za-z ]*[A-Za-z])', formula):
+        token = token.strip()
+        if token not in EV_TOKENS:
+            raise ValueError(f"未知のEV算式トークン: {token}")
+        terms.append((-1 if sign in ("-", "−") else 1, EV_TOKENS[token]))
+    return tuple(terms)
+
+def load_vendor_matrix(path: str = DEFAULT_MATRIX_PATH) -> Dict[str, VendorSpec]:
+    """vendor_matrix.csv 読み込み"""
+    specs = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            ttm_def = row["ttm_sales_def"].strip()
+            if ttm_def not in TTM_DEFS:
+                raise ValueError(f"未知のTTM定義: {ttm_def}")
+            specs[row["vendor"].strip()] = VendorSpec(
+                vendor=row["vendor"].strip(),
+                ev_terms=parse_ev_formula(row["ev_formula"]),
+                ttm_def=ttm_def,
+                ttm_column=TTM_DEFS[ttm_def],
+                time_basis=row.get("time_basis", "").strip(),
+                notes=row.get("notes", "").strip()
+            )
+    return specs
+
+class VendorEVSEngine:
+    """ベンダ別 EV/S(TTM) 一括計算"""
+
+    def __init__(self, matrix_path: str = DEFAULT_MATRIX_PATH):
+        self.specs = load_vendor_matrix(matrix_path)
+
+    def get_spec(self, vendor: str) -> VendorSpec:
+        """ベンダ仕様取得"""
+        if vendor not in self.specs:
+            raise ValueError(f"vendor_matrix未登録のベンダ: {vendor}")
+        return self.specs[vendor]
+
+    def compute_columns(self, vendor: str, columns: Dict[str, Sequence[Any]]) -> Tuple[List[float], List[float]]:
+        """列辞書から (EV, EV/S) を一括計算"""
+        spec = self.get_spec(vendor)
+        missing = [c for c in spec.required_columns if c not in columns]
+        if missing:
+            raise ValueError(f"{vendor}: 列不足 {missing}")
+
+        length = len(columns[spec.ttm_column])
+        ev = [0.0] * length
+        for sign, column in spec.ev_terms:
+            ev = [acc + sign * _to_float(v) for acc, v in zip(ev, columns[column])]
+
+        if spec.ttm_column == "revenue_last4q":
+            sales = [sum(map(_to_float, q)) if q is not None and len(q) == 4 else NAN
+                     for q in columns[spec.ttm_column]]
+        else:
+            sales = [_to_float(v) for v in columns[spec.ttm_column]]
+
+        evs = [e / s if s > 0 else NAN for e, s in zip(ev, sales)]
+        return ev, evs
+
+    def compute_dump(self, vendor: str, rows: List[Dict[str, Any]]) -> Dict[str, float]:
+        """ベンダ日次ダンプ（行形式）→ ticker: EV/S"""
+        spec = self.get_spec(vendor)
+        columns = {c: [row.get(c) for row in rows] for c in spec.required_columns}
+        _, evs = self.compute_columns(vendor, columns)
+        return {row["ticker"]: v for row, v in zip(rows, evs)}
+
+    def lint_peer_consistency(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Price-Lint：issuer/peerの同一ベンダ・同一TTM定義"""
+        vendors = sorted({e.get("vendor", "") for e in entries})
+        definitions = sorted({e.get("ttm_def") or (self.specs[e["vendor"]].ttm_def
+                                                  if e.get("vendor") in self.specs else "")
+                              for e in entries})
+
+        issues = []
+        if len(vendors) > 1:
+            issues.append(f"ベンダ不一致: {vendors}")
+        if len(definitions) > 1:
+            issues.append(f"TTM定義不一致: {definitions}")
+        unknown = [v for v in vendors if v not in self.specs]
+        if unknown:
+            issues.append(f"vendor_matrix未登録: {unknown}")
+
+        return {
+            "same_source": len(vendors) == 1,
+            "same_definition": len(definitions) == 1,
+            "issues": issues
+        }
+
+def _to_float(value: Any) -> float:
+    """数値化（欠測はNaN）"""
+    if value is None or value == "":
+        return NAN
+    return float(value)
+
+def main():
+    """メイン実行"""
+    if len(sys.argv) < 3:
+        print("Usage: python ahf_vendor_evs.py <vendor> <dump_json>")
+        sys.exit(1)
+
+    vendor = sys.argv[1]
+    with open(sys.argv[2], 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+
+    engine = VendorEVSEngine()
+    result = engine.compute_dump(vendor, rows)
+
+    print(json.dumps({t: (None if math.isnan(v) else round(v, 4)) for t, v in result.items()},
+                     indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
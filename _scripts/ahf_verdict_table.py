@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+AHF Verdict決定表（calculate_verdict_abc の事前計算）
+①★・②★・③色・e帯・d>0.5・B=High の全組合せをルール関数で一度だけ列挙し、
+コンパクトな表として保持する（ルール変更はソースハッシュで検知して再生成、表⇔ルールの完全一致を検証）
+"""
+
+import sys
+import json
+import inspect
+import hashlib
+from array import array
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+Rule = Callable[[int, int, str, float, float, str], Tuple[int, str]]
+
+# 入力の帯（各帯の代表値）
+STAR_VALUES = [0, 1, 2, 3, 4, 5]
+COLOR_VALUES = ["Green", "Amber", "Red", "N/A"]
+E_BINS = [0.0, 0.25, 0.50, 0.75]          # <0.25 / 0.25〜0.50未満 / =0.50 / >0.50
+D_BINS = [0.0, 1.0]                       # d≤0.5 / d>0.5
+B_BINS = ["High", "{B}"]                  # High / その他（表示は実値で置換）
+B_PLACEHOLDER = "{B}"
+RADIX = [len(STAR_VALUES), len(STAR_VALUES), len(COLOR_VALUES), len(E_BINS), len(D_BINS), len(B_BINS)]
+
+def e_bin(e_score: float) -> int:
+    """e → 帯（ルールの境界：≥0.25／≤0.50／=0.50）"""
+    if e_score < 0.25:
+        return 0
+    if e_score < 0.50:
+        return 1
+    return 2 if e_score == 0.50 else 3
+
+def rule_hash(rule: Rule) -> str:
+    """ルール関数のソースハッシュ"""
+    try:
+        source = inspect.getsource(rule)
+    except (OSError, TypeError):
+        source = repr(rule)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+class VerdictTable:
+    """Verdict決定表（混合基数インデックス → ★・verdict番号）"""
+
+    def __init__(self, stars: array, verdict_ids: array, verdicts: List[str], source_hash: str):
+        self.stars = stars
+        self.verdict_ids = verdict_ids
+        self.verdicts = verdicts
+        self.source_hash = source_hash
+
+    @staticmethod
+    def encode(lec_stars: int, nes_stars: int, current_color: str, e_score: float, d_value: float,
+               visibility_b: str) -> Optional[int]:
+        """入力 → 表インデックス（範囲外・非整数の★はNone、4.0等はint化）"""
+        if lec_stars not in STAR_VALUES or nes_stars not in STAR_VALUES:
+            return None
+        lec_stars, nes_stars = int(lec_stars), int(nes_stars)
+        color = COLOR_VALUES.index(current_color) if current_color in COLOR_VALUES[:3] else 3
+        digits = [lec_stars, nes_stars, color, e_bin(e_score), int(d_value > 0.5), int(visibility_b != "High")]
+        index = 0
+        for digit, base in zip(digits, RADIX):
+            index = index * base + digit
+        return index
+
+    def lookup(self, lec_stars: int, nes_stars: int, current_color: str, e_score: float, d_value: float,
+               visibility_b: str) -> Optional[Tuple[int, str]]:
+        """表引き（範囲外はNone）"""
+        index = self.encode(lec_stars, nes_stars, current_color, e_score, d_value, visibility_b)
+        if index is None:
+            return None
+        return self.stars[index], self.verdicts[self.verdict_ids[index]].replace(B_PLACEHOLDER, visibility_b)
+
+    def lookup_many(self, columns: Dict[str, List[Any]]) -> List[Optional[Tuple[int, str]]]:
+        """列入力（lec_stars, nes_stars, current_color, e_score, d_value, visibility_b）の一括表引き"""
+        keys = ["lec_stars", "nes_stars", "current_color", "e_score", "d_value", "visibility_b"]
+        return [self.lookup(*args) for args in zip(*(columns[key] for key in keys))]
+
+    def truth_table(self) -> List[Dict[str, Any]]:
+        """監査用の真理値表"""
+        rows = []
+        for index, args in enumerate(_enumerate_inputs()):
+            lec, nes, color, e, d, b = args
+            rows.append({
+                "lec_stars": lec, "nes_stars": nes, "current_color": color,
+                "e_bin": ["<0.25", "0.25-0.50", "=0.50", ">0.50"][E_BINS.index(e)],
+                "d_gt_0_5": d > 0.5, "b_high": b == "High",
+                "future_stars": self.stars[index], "verdict": self.verdicts[self.verdict_ids[index]]
+            })
+        return rows
+
+    def to_dict(self) -> Dict[str, Any]:
+        """保存形式"""
+        return {
+            "source_hash": self.source_hash,
+            "radix": RADIX,
+            "verdicts": self.verdicts,
+            "stars": list(self.stars),
+            "verdict_ids": list(self.verdict_ids)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VerdictTable":
+        """保存形式から復元"""
+        if data.get("radix") != RADIX:
+            raise ValueError(f"表の次元不一致: {data.get('radix')}")
+        return cls(array('b', data["stars"]), array('H', data["verdict_ids"]), data["verdicts"], data["source_hash"])
+
+def _enumerate_inputs():
+    """全組合せ（インデックス順）"""
+    for lec in STAR_VALUES:
+        for nes in STAR_VALUES:
+            for color in COLOR_VALUES:
+                for e in E_BINS:
+                    for d in D_BINS:
+                        for b in B_BINS:
+                            yield lec, nes, color, e, d, b
+
+def build_table(rule: Rule) -> VerdictTable:
+    """ルール関数から決定表を生成"""
+    stars, verdict_ids = array('b'), array('H')
+    verdicts: List[str] = []
+    ids: Dict[str, int] = {}
+    for args in _enumerate_inputs():
+        future_stars, verdict = rule(*args)
+        stars.append(future_stars)
+        verdict_ids.append(ids.setdefault(verdict, len(ids)))
+        if len(verdicts) < len(ids):
+            verdicts.append(verdict)
+    return VerdictTable(stars, verdict_ids, verdicts, rule_hash(rule))
+
+def verify_table(table: VerdictTable, rule: Rule,
+                 visibility_values: Tuple[str, ...] = ("High", "Med", "Low")) -> List[Dict[str, Any]]:
+    """表⇔ルールの完全一致検証（帯内の代表外の値も含む）→ 不一致リスト"""
+    e_values = [0.0, 0.1, 0.25, 0.3, 0.50, 0.6, 1.0]
+    d_values = [0.0, 0.5, 0.51, 1.0]
+    mismatches = []
+    for lec in STAR_VALUES:
+        for nes in STAR_VALUES:
+            for color in COLOR_VALUES + ["Unknown"]:
+                for e in e_values:
+                    for d in d_values:
+                        for b in visibility_values:
+                            expected = rule(lec, nes, color, e, d, b)
+                            actual = table.lookup(lec, nes, color, e, d, b)
+                            if actual != expected:
+                                mismatches.append({"inputs": [lec, nes, color, e, d, b],
+                                                   "rule": expected, "table": actual})
+    return mismatches
+
+def load_or_build(path: str, rule: Rule) -> VerdictTable:
+    """保存済みの表を読み込み、ルールのハッシュが変わっていれば再生成して保存"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            table = VerdictTable.from_dict(json.load(f))
+        if table.source_hash == rule_hash(rule):
+            return table
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+
+    table = build_table(rule)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(table.to_dict(), f, ensure_ascii=False)
+    return table
+
+def main():
+    """メイン実行"""
+    from ahf_v085_sb_processor import AHFv085Processor
+
+    rule = AHFv085Processor().calculate_verdict_abc
+    table = load_or_build(sys.argv[1], rule) if len(sys.argv) > 1 else build_table(rule)
+    mismatches = verify_table(table, rule)
+
+    print(json.dumps({
+        "source_hash": table.source_hash,
+        "cells": len(table.stars),
+        "verdicts": table.verdicts,
+        "mismatches": mismatches[:10],
+        "verified": not mismatches
+    }, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
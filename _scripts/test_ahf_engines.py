@@ -0,0 +1,1111 @@
+#!/usr/bin/env python3
+"""
+AHF エンジン群テストスクリプト
+Purpose: _scripts配下の補助エンジンの動作確認
+"""
+
+import os
+import sys
+import math
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def test_near_dup():
+    """近似重複検出のテスト"""
+    print("=== テスト: 近似重複検出（MinHash/LSH） ===")
+
+    from ahf_near_dup import NearDuplicateIndex, dedupe_items
+
+    items = [
+        {"id": "H1", "kpi": "guidance_fy26", "verbatim": "FY26 revenue guidance raised to $2.5B"},
+        {"id": "H2", "kpi": "guidance_fy26", "verbatim": "FY26 revenue guidance raised to $2.5B."},
+        {"id": "H3", "kpi": "backlog_growth", "verbatim": "Backlog grew 15% quarter-over-quarter"},
+        {"id": "H4", "kpi": "guidance_fy26", "verbatim": "FY26 Revenue guidance raised to $2.5B!"}
+    ]
+
+    index = NearDuplicateIndex()
+    kept, duplicates = dedupe_items(items, index)
+
+    assert [item["id"] for item in kept] == ["H1", "H3"]
+    assert duplicates == {"H2": "H1", "H4": "H1"}
+    print(f"✓ 重複検出: {duplicates}")
+
+    # 同一IDの再投入は同じ判定を返す
+    assert index.add("H2", "anything").canonical_id == "H1"
+    assert index.add("H1", "anything") is None
+    assert index.get_summary()["duplicate_items"] == 2
+    print("✓ 再投入の冪等性")
+
+def test_independence_graph():
+    """T1*独立性グラフのテスト"""
+    print("\n=== テスト: T1*独立性グラフ（Union-Find） ===")
+
+    from ahf_independence import SourceIndependenceGraph, registrable_domain
+
+    assert registrable_domain("https://investor.company.com/news") == "company.com"
+    assert registrable_domain("https://www.nikkei.co.jp/article") == "nikkei.co.jp"
+    assert registrable_domain("https://investor.sap.de/news") == "sap.de"
+    assert registrable_domain("https://news.abc.de") == "abc.de"
+    assert registrable_domain("https://ir.company.com.au") == "company.com.au"
+
+    graph = SourceIndependenceGraph()
+    item = {
+        "id": "T1STAR-001",
+        "sources": [
+            {"id": "s1", "url": "https://www.reuters.com/a", "author": "Jane Doe", "verbatim": "Guidance raised"},
+            {"id": "s2", "url": "https://finance.yahoo.com/b", "origin": "Reuters", "author": "jane doe"},
+            {"id": "s3", "url": "https://news.reuters.com/c", "verbatim": "Other quote"}
+        ]
+    }
+    # 著者一致(s1-s2)・ドメイン一致(s1-s3)で全て1クラスタ
+    assert graph.count_item_sources(item) == 1
+    print("✓ 非独立連結: 1クラスタ")
+
+    # 独立ソース追加は既存クラスタを再計算しない
+    graph.add_source({"id": "s4", "url": "https://www.wsj.com/d", "author": "John Roe"})
+    s1, s2, s3 = (s["url"] for s in item["sources"])
+    assert graph.count_independent([s1, s2, s3, "s4"]) == 2
+    assert graph.shared_keys(s1, s3) == ["domain:reuters.com"]
+    print(f"✓ 逐次追加: {graph.get_summary()}")
+
+    # アイテムローカルのid（s1/s2）はアイテム間で衝突しない
+    graph = SourceIndependenceGraph()
+    assert graph.count_item_sources({"id": "A", "sources": [
+        {"id": "s1", "url": "https://www.reuters.com/x"}, {"id": "s2", "url": "https://news.reuters.com/y"}]}) == 1
+    assert graph.count_item_sources({"id": "B", "sources": [
+        {"id": "s1", "url": "https://www.bloomberg.com/z"}, {"id": "s2", "url": "https://www.sec.gov/w"}]}) == 2
+    assert graph.count_item_sources({"id": "C", "sources": [{"id": "s1", "author": "A. Smith"},
+                                                            {"id": "s2", "author": "B. Jones"}]}) == 2
+    print("✓ アイテム間のローカルid非衝突")
+
+def test_contradiction_index():
+    """矛盾検出エンジンのテスト"""
+    print("\n=== テスト: 矛盾検出エンジン ===")
+
+    from ahf_contradiction import (ContradictionIndex, RecallAction, bucket_key, evidence_level, parse_value,
+                                   recall_to_uncertain)
+
+    assert parse_value("115-127") == (115.0, 127.0)
+    assert parse_value("H2 2025") is None
+
+    index = ContradictionIndex(tolerance_rel=0.01)
+    base = {"ticker": "AAOI", "kpi": "Q3_revenue_guidance", "period": "Q3", "unit": "million_usd"}
+
+    assert index.insert(dict(base, id="a", value="115-127", evidence_tag="T1*")) == []
+    # 許容幅内・別バケットは矛盾なし
+    assert index.insert(dict(base, id="b", value=127.5, evidence_tag="T2")) == []
+    assert index.insert(dict(base, id="c", value=200, evidence_tag="T1", unit="percent")) == []
+
+    # T1がT1*/T2と矛盾 → T1*降格・T2リコール
+    events = index.insert(dict(base, id="d", value=140, evidence_tag="T1"))
+    assert {(e.action, e.target_id) for e in events} == {(RecallAction.DOWNGRADE, "a"), (RecallAction.RECALL, "b")}
+    assert index.items["a"]["evidence_tag"] == "T2"
+    print(f"✓ 降格/リコール: {[e.to_dict()['action'] for e in events]}")
+
+    # 降格したT1*はバケット上もT2
+    assert [evidence_level(item) for item in index.buckets[bucket_key(base)]] == ["T2", "T1"]
+
+    # T1と矛盾するT2の新規は採用不可、同格（降格済みT2）の既存は双方とも採用不可
+    events = index.insert(dict(base, id="e", value=100, evidence_tag="T2"))
+    assert sorted((e.action.value, e.target_id, e.conflicting_id) for e in events) == [
+        ("recall", "a", "e"), ("reject", "e", "a"), ("reject", "e", "d")]
+    assert index.items["e"]["contradiction_flag"] is True and "contradiction_flag" not in index.items["d"]
+    assert [item["id"] for item in index.buckets[bucket_key(base)]] == ["d"]
+    print("✓ 新規T2の採用不可／同格は双方採用不可")
+
+    # T1*は弱い証拠との矛盾でも即T2降格
+    star_index = ContradictionIndex(tolerance_rel=0.01)
+    star_index.insert(dict(base, id="f", value=120, evidence_tag="T2"))
+    events = star_index.insert(dict(base, id="g", value=140, evidence_tag="T1*"))
+    assert sorted((e.action.value, e.target_id) for e in events) == [("downgrade", "g"), ("recall", "f")]
+    assert evidence_level(star_index.items["g"]) == "T2" and star_index.buckets[bucket_key(base)] == [star_index.items["g"]]
+    events = star_index.insert(dict(base, id="h", value=100, evidence_tag="T1*"))
+    assert ("downgrade", "h") in [(e.action.value, e.target_id) for e in events]
+    print("✓ T1*は矛盾検出で即T2降格")
+
+    triage = {"CONFIRMED": [{"id": "b", "kpi": "x"}, {"id": "z", "kpi": "y"}], "UNCERTAIN": []}
+    assert recall_to_uncertain(triage, index.events) == 1
+    assert [item["id"] for item in triage["UNCERTAIN"]] == ["b"]
+    print(f"✓ UNCERTAIN格納: {index.get_summary()['events']}")
+
+SAMPLE_AXIS_INPUTS = {
+    "g_fwd": 0.15,
+    "delta_opm_fwd": 0.05,
+    "dilution": 0.02,
+    "capex_intensity": 0.08,
+    "next_q_qoq_pct": 12.0,
+    "guidance_revision_pct": 8.0,
+    "backlog_growth_pct": 20.0,
+    "opm_fwd": 0.25,
+    "evs_actual_today": 15.2,
+    "evs_actual_ttm": 15.2,
+    "evs_peer_median_ttm": 18.5
+}
+
+def test_dependency_graph():
+    """依存追跡型再計算のテスト"""
+    print("\n=== テスト: 依存追跡型再計算 ===")
+
+    from ahf_axis_bands import evaluate_axes
+    from ahf_dependency_graph import AxisDependencyGraph
+    from ahf_contradiction import ContradictionIndex
+
+    graph = AxisDependencyGraph()
+    graph.add_ticker("AAA", SAMPLE_AXIS_INPUTS)
+    graph.add_ticker("BBB", SAMPLE_AXIS_INPUTS)
+    assert graph.axis_states("AAA") == evaluate_axes(SAMPLE_AXIS_INPUTS)
+    print(f"✓ 初期評価: {graph.axis_states('AAA')['decision']}")
+
+    # T1*のq/q証拠を登録 → T1で矛盾 → T2降格で②★と DI のみ再計
+    index = ContradictionIndex()
+    t1star = {"id": "E1", "ticker": "AAA", "kpi": "next_q_qoq_pct", "value": 20.0, "evidence_tag": "T1*"}
+    index.insert(t1star)
+    graph.register_evidence("E1", "AAA", "next_q_qoq_pct", 20.0, "T1*")
+    assert graph.axis_states("AAA")["nes"]["stars"] == 5
+
+    before = graph.graph.recompute_count
+    events = index.insert({"id": "E2", "ticker": "AAA", "kpi": "next_q_qoq_pct", "value": 2.0, "evidence_tag": "T1"})
+    cards = graph.apply_recall_events(events)
+    assert graph.graph.recompute_count - before <= 5
+    assert {card.axis for card in cards} == {"nes", "decision"}
+    assert all(card.ticker == "AAA" for card in cards)
+    assert graph.axis_states("BBB") == evaluate_axes(SAMPLE_AXIS_INPUTS)
+    print(f"✓ 降格Delta: {cards[0].render().splitlines()[1]}")
+
+def test_snapshot_diff():
+    """スナップショット差分Deltaカードのテスト"""
+    print("\n=== テスト: スナップショット差分Deltaカード ===")
+
+    from ahf_axis_bands import evaluate_axes
+    from ahf_delta_card import SnapshotDiffEngine, build_snapshot
+
+    changed_inputs = dict(SAMPLE_AXIS_INPUTS, evs_peer_median_ttm=12.0)
+    entries = {t: {"inputs": SAMPLE_AXIS_INPUTS, "axes": evaluate_axes(SAMPLE_AXIS_INPUTS)}
+               for t in ("AAA", "BBB", "CCC")}
+    previous = build_snapshot("2025-09-26", entries)
+    entries["BBB"] = {"inputs": changed_inputs, "axes": evaluate_axes(changed_inputs)}
+    entries["DDD"] = entries["AAA"]
+    current = build_snapshot("2025-09-27", entries)
+
+    engine = SnapshotDiffEngine()
+    cards = engine.diff(previous, current)
+
+    assert engine.stats["unchanged"] == 2 and engine.stats["changed"] == 1 and engine.stats["added"] == 1
+    assert {card.axis for card in cards} == {"current_valuation", "decision"}
+    assert cards[0].cause == "入力変更: evs_peer_median_ttm 18.5→12.0"
+    print(f"✓ 差分カード: {len(cards)}件 {engine.stats}")
+
+    # 評価器出力（NESは margin_term/health_term）でもGMのみの変化は入力変更に帰属
+    from ahf_delta_card import axis_states_from_evaluation, attribute_cause
+    nes_inputs = {"next_q_qoq_pct": 5.0, "guidance_revision_pct": 0.0, "backlog_growth_pct": 0.0,
+                  "margin_term": 0.0, "health_term": 0.0}
+    old_inputs, _ = axis_states_from_evaluation({"nes": {"star_score": 3, "inputs": nes_inputs}})
+    new_inputs, _ = axis_states_from_evaluation({"nes": {"star_score": 4, "inputs": dict(nes_inputs, margin_term=1.0)}})
+    assert attribute_cause("nes", old_inputs, new_inputs) == "入力変更: margin_term 0.0→1.0"
+    assert attribute_cause("decision", old_inputs, new_inputs) == "入力変更: margin_term 0.0→1.0"
+    print("✓ GMのみの変化 → 入力変更（margin_term）")
+    print(cards[0].render())
+
+SAMPLE_PRICE_ROWS = [
+    {"ticker": "AAOI", "market_cap": 1500, "total_debt": 200, "preferred": 0, "minority": 0, "cash": 100, "ttm_sales": 400},
+    {"ticker": "LITE", "market_cap": 6000, "total_debt": 1500, "preferred": 0, "minority": 10, "cash": 900, "ttm_sales": 1400},
+    {"ticker": "COHR", "market_cap": 14000, "total_debt": 4000, "preferred": 2000, "minority": 0, "cash": 1000, "ttm_sales": 5000},
+    {"ticker": "FN", "market_cap": 8000, "total_debt": 0, "preferred": 0, "minority": 0, "cash": 800, "ttm_sales": 3000},
+    {"ticker": "NEW", "market_cap": 500, "total_debt": 0, "preferred": 0, "minority": 0, "cash": 50, "ttm_sales": None}
+]
+
+def test_price_store():
+    """列指向価格スナップショットストアのテスト"""
+    print("\n=== テスト: 列指向価格スナップショットストア ===")
+
+    from ahf_price_store import PriceSnapshotStore
+
+    store = PriceSnapshotStore(tempfile.mkdtemp(prefix="ahf_price_store_"))
+    store.write_snapshot("2025-09-26", "Yahoo", SAMPLE_PRICE_ROWS)
+    assert store.available_dates("Yahoo") == ["2025-09-26"]
+
+    with store.open_snapshot("2025-09-26", "Yahoo") as snapshot:
+        evs = snapshot.evs_ttm()
+        assert evs[0] == 4.0 and math.isnan(evs[4])
+        fields = snapshot.valuation_fields("AAOI", ["LITE", "COHR", "FN", "NEW"], evs)
+        assert fields["evs_peer_median_ttm"] == 3.8 and fields["source"] == "Yahoo"
+        assert snapshot.valuation_fields("AAOI", ["NEW", "FN"], evs) is None
+
+        # エンジンは登録グループ一致・中央値ありの場合のみ採用（未登録・未読込・不一致は直接計算）
+        from ahf_peer_median import PeerGroupEngine
+        engine = PeerGroupEngine()
+        assert snapshot.valuation_fields("AAOI", ["LITE", "COHR", "FN"], evs, engine)["evs_peer_median_ttm"] == 3.8
+        engine.register("AAOI", ["LITE", "COHR", "FN"])
+        assert snapshot.valuation_fields("AAOI", ["LITE", "COHR", "FN"], evs, engine)["evs_peer_median_ttm"] == 3.8
+        engine.load_snapshot({"LITE": 1.0, "COHR": 2.0, "FN": 3.0})
+        assert snapshot.valuation_fields("AAOI", ["LITE", "COHR", "FN"], evs, engine)["evs_peer_median_ttm"] == 2.0
+        assert round(snapshot.valuation_fields("AAOI", ["LITE", "COHR"], evs, engine)["evs_peer_median_ttm"], 2) == 4.26
+    print(f"✓ EV/S一括計算: {[round(v, 2) for v in evs]}")
+
+    # 優先株・少数株主持分・負債の空欄は0（MC・Cash・売上の欠測のみNaN）
+    blank_rows = [dict(SAMPLE_PRICE_ROWS[0], preferred="", minority=None, total_debt=None),
+                  dict(SAMPLE_PRICE_ROWS[1], cash=None)]
+    store.write_snapshot("2025-09-29", "Yahoo", blank_rows)
+    with store.open_snapshot("2025-09-29", "Yahoo") as snapshot:
+        evs = snapshot.evs_ttm()
+        assert evs[0] == (1500 - 100) / 400 and math.isnan(evs[1])
+    print("✓ 空欄の優先株・少数株主持分は0")
+
+def test_vendor_evs():
+    """ベンダ別EV/S計算エンジンのテスト"""
+    print("\n=== テスト: ベンダ別EV/S計算エンジン ===")
+
+    from ahf_vendor_evs import VendorEVSEngine
+
+    engine = VendorEVSEngine()
+    assert set(engine.specs) == {"Yahoo", "WSJ", "YCharts"}
+    assert engine.get_spec("WSJ").ev_terms == ((1, "market_cap"), (1, "total_debt"), (-1, "cash"))
+
+    row = {"ticker": "COHR", "market_cap": 14000, "total_debt": 4000, "preferred": 2000, "minority": 0,
+           "cash": 1000, "revenue_last4q": [1200, 1250, 1250, 1300], "reported_ttm_sales": 4000,
+           "reported_ev": 18000}
+    assert engine.compute_dump("Yahoo", [row])["COHR"] == 3.8
+    assert engine.compute_dump("WSJ", [row])["COHR"] == 4.25
+    assert engine.compute_dump("YCharts", [row])["COHR"] == 4.5
+    print("✓ ベンダ別算式: Yahoo 3.80 / WSJ 4.25 / YCharts 4.50")
+
+    lint = engine.lint_peer_consistency([{"ticker": "AAOI", "vendor": "Yahoo"}, {"ticker": "COHR", "vendor": "WSJ"}])
+    assert not lint["same_source"] and not lint["same_definition"]
+    assert engine.lint_peer_consistency([{"vendor": "Yahoo"}, {"vendor": "Yahoo"}])["issues"] == []
+    print(f"✓ Price-Lint: {lint['issues']}")
+
+def test_trading_calendar():
+    """取引所カレンダーのテスト"""
+    print("\n=== テスト: 取引所カレンダー（NYSE） ===")
+
+    from ahf_trading_calendar import TradingCalendar, nyse_holidays
+    from datetime import date, datetime
+
+    # 2022年元日は土曜のため前年12/31は振替なし、Juneteenthは日曜→月曜振替
+    holidays_2022 = nyse_holidays(2022)
+    assert date(2021, 12, 31) not in nyse_holidays(2021) and date(2022, 6, 20) in holidays_2022
+
+    calendar = TradingCalendar()
+    assert calendar.last_trading_day("2025-07-05") == date(2025, 7, 3)     # 独立記念日＋土曜
+    assert calendar.last_trading_day("2025-04-18") == date(2025, 4, 17)    # Good Friday
+    assert calendar.last_trading_day("2025-01-09") == date(2025, 1, 8)     # 臨時休場
+    assert calendar.last_trading_day(datetime(2025, 9, 29, 10, 0)) == date(2025, 9, 26)
+    assert calendar.same_day_aligned(["2025-07-03", "2025-07-04", "2025-07-06"])
+    assert not calendar.same_day_aligned(["2025-07-02", "2025-07-03"])
+    # 時刻付き文字列も datetime と同じくET終値前は前営業日
+    assert calendar.last_trading_day("2025-09-29T10:00:00") == date(2025, 9, 26)
+    assert calendar.last_trading_day("2025-09-29 16:30") == date(2025, 9, 29)
+    assert calendar.same_day_aligned(["2025-09-29T10:00:00", datetime(2025, 9, 26, 17, 0)])
+    # タイムゾーン付きはETへ換算（20:30Z＝15:30 EST は終値前、21:30Z＝16:30 EST は終値後）
+    assert calendar.last_trading_day("2025-03-03T20:30:00Z") == date(2025, 2, 28)
+    assert calendar.last_trading_day("2025-03-03T21:30:00+00:00") == date(2025, 3, 3)
+    assert calendar.last_trading_day("2025-07-01T20:30:00Z") == date(2025, 7, 1)     # EDT 16:30
+    assert calendar.last_trading_day("2025-07-02T04:00:00+09:00") == date(2025, 6, 30)  # EDT 7/1 15:00
+    try:
+        calendar.last_trading_day("1999-12-31")
+        assert False, "範囲外はValueError"
+    except ValueError:
+        pass
+    print(f"✓ 直近営業日解決: {calendar.resolve_many(['2025-07-05', '2025-12-25'])}")
+
+def test_peer_median():
+    """ピア中央値エンジンのテスト"""
+    print("\n=== テスト: ピア中央値エンジン ===")
+
+    import random
+    import statistics
+    from ahf_peer_median import RunningMedian, PeerGroupEngine
+    from ahf_v085_sb_processor import AHFv085Processor
+
+    # 逐次中央値は挿入/削除の任意列で statistics.median と一致
+    rng = random.Random(7)
+    running, values = RunningMedian(), []
+    for _ in range(300):
+        if values and rng.random() < 0.4:
+            value = values.pop(rng.randrange(len(values)))
+            running.remove(value)
+        else:
+            value = rng.choice([1.0, 2.0, 2.5, 3.0, rng.uniform(0, 10)])
+            values.append(value)
+            running.add(value)
+        assert running.median() == (statistics.median(values) if values else None)
+        assert running.median(upper=True) == (sorted(values)[len(values) // 2] if values else None)
+    print("✓ 二分ヒープ中央値（重複値・削除込み、上側中央値）")
+
+    engine = PeerGroupEngine()
+    engine.register("AAOI", ["LITE", "COHR", "FN"])
+    engine.register("NEW", ["FN", "COHR", "LITE"])
+    engine.register("LITE", ["COHR", "FN"])
+    assert engine.get_summary()["groups"] == 2
+    engine.load_snapshot({"LITE": 4.0, "COHR": 2.0, "FN": 3.0})
+    assert engine.median_for("AAOI") == engine.median_for("NEW") == 3.0
+    assert engine.median_for("LITE") == 2.5
+
+    affected = engine.update("FN", 5.0)
+    assert affected == {"AAOI", "NEW", "LITE"} and engine.update_count == 2
+    assert engine.median_for("AAOI") == 4.0 and engine.median_for("LITE") == 3.5
+    engine.update("COHR", None)
+    assert engine.median_for("LITE") is None and engine.median_for("AAOI") == 4.5
+    print(f"✓ 共有グループ更新: {engine.get_summary()}")
+
+    # S5 Prem_med をエンジンの中央値から算出
+    data = {"ticker": "AAOI", "opm_fwd": 0.15, "tax_rate": 0.25, "wacc": 0.10, "g_fwd": 0.075,
+            "current_evs": 4.5}
+    result = AHFv085Processor(peer_engine=engine).process_s5_e_only(data)
+    assert engine.median_for("AAOI", upper=True) == 5.0
+    # エンジン経路とピア一覧経路は同じ上側中央値
+    direct = AHFv085Processor().process_s5_e_only(dict(data, peers=[{"evs": 4.0}, {"evs": 5.0}]))
+    assert result["e_score"] == direct["e_score"]
+    # 登録グループと異なる peers 指定はエンジンを使わず peers から計算
+    peers = [{"ticker": "X1", "evs": 1.0}, {"ticker": "X2", "evs": 1.2}]
+    assert (AHFv085Processor(peer_engine=engine).process_s5_e_only(dict(data, peers=peers))["e_score"] ==
+            AHFv085Processor().process_s5_e_only(dict(data, peers=peers))["e_score"])
+    matched = [{"ticker": "LITE", "evs": 4.0}, {"ticker": "COHR", "evs": None}, {"ticker": "FN", "evs": 5.0}]
+    assert AHFv085Processor(peer_engine=engine).process_s5_e_only(dict(data, peers=matched))["e_score"] == \
+        result["e_score"]
+    print(f"✓ S5 e-score: {result['e_score']}")
+
+def test_price_lint_table():
+    """列指向Price-Lintのテスト"""
+    print("\n=== テスト: 列指向Price-Lint ===")
+
+    from ahf_price_lint import PriceLintTable, rows_to_columns
+    from ahf_trading_calendar import TradingCalendar
+
+    rows = [
+        {"ticker": "AAOI", "peer": "AAOI", "vendor": "Yahoo", "asof": "2025-07-03", "metric": "EV/S"},
+        {"ticker": "AAOI", "peer": "LITE", "vendor": "Yahoo", "asof": "2025-07-05", "metric": "EV/S"},
+        {"ticker": "AAOI", "peer": "COHR", "vendor": "Yahoo", "asof": "2025-07-03", "metric": "ev / s"},
+        {"ticker": "LITE", "peer": "COHR", "vendor": "WSJ", "asof": "2025-07-03", "metric": "P/S"},
+        {"ticker": "LITE", "peer": "LITE", "vendor": "Yahoo", "asof": "2025-07-02", "metric": "EV/S"},
+        {"ticker": "LITE", "peer": "FN", "vendor": "Yahoo", "asof": None, "metric": "EV/S"}
+    ]
+    columns = rows_to_columns(rows)
+
+    # 休場日（7/4）・土曜（7/5）はカレンダー解決で同日扱い
+    result = PriceLintTable(TradingCalendar()).lint(columns)
+    assert result["summary"]["pass_count"] == 1 and result["summary"]["fail_count"] == 1
+    assert result["masks"]["ps_used"] == [False, False, False, True, False, False]
+    assert result["masks"]["same_day"] == [False, False, False, True, False, True]
+    violation = result["violations"][0]
+    assert violation["ticker"] == "LITE" and violation["rows"] == ["COHR", "FN"]
+    assert violation["issues"] == ["EV使用必須", "P/S使用禁止", "同日データ必須", "同ソースデータ必須"]
+
+    # カレンダーなしは日付文字列の一致のみ
+    assert PriceLintTable().lint(columns)["masks"]["same_day"][1]
+    print(f"✓ 違反レポート: {violation['ticker']} {violation['issues']}")
+
+def test_ttm_series():
+    """四半期時系列TTMのテスト"""
+    print("\n=== テスト: 四半期時系列TTM／as-of EV ===")
+
+    from ahf_ttm_series import TTMSeriesStore
+    from ahf_vendor_evs import VendorEVSEngine
+
+    store = TTMSeriesStore("SEC")
+    quarters = [("2024-09-30", 100, "2024-11-05"), ("2024-12-31", 110, "2025-02-10"),
+                ("2025-03-31", 120, "2025-05-06"), ("2025-06-30", 130, "2025-08-05")]
+    for period_end, revenue, available in quarters:
+        store.add_quarter("AAOI", period_end, revenue, available, total_debt=50, cash=30)
+    series = store.series["AAOI"]
+    assert math.isnan(series.ttm[2]) and series.ttm[3] == 460 and series.window_count == 4
+
+    # 公表前は前四半期基準（TTM未成立）、公表後は EV=900+50−30 → EV/S=2.0
+    assert math.isnan(store.evs_ttm("AAOI", "2025-08-04", 920))
+    assert store.evs_ttm("AAOI", "2025-08-05", 900) == 2.0
+
+    # 新四半期は末尾の窓1つのみ計算
+    before = series.window_count
+    store.add_quarter("AAOI", "2025-09-30", 140, "2025-11-04", total_debt=40, cash=40)
+    assert series.window_count == before + 1 and series.ttm[4] == 500
+    assert series.ev_series(["2025-08-06", "2025-11-04"], [920, 1000]) == [940.0, 1000.0]
+
+    # 欠落四半期は窓不成立
+    store.add_quarter("LITE", "2024-12-31", 10)
+    store.add_quarter("LITE", "2025-06-30", 10)
+    store.add_quarter("LITE", "2025-09-30", 10)
+    store.add_quarter("LITE", "2025-12-31", 10)
+    assert math.isnan(store.series["LITE"].ttm[3])
+    # 公表日なしは期末当日ではなく保守的な提出ラグ後に既知
+    assert store.series["LITE"].index_asof("2025-12-28") == 1
+    assert store.series["LITE"].index_asof("2026-03-31") == 3
+
+    rows = store.snapshot_rows("2025-11-04", {"AAOI": 1000})
+    assert VendorEVSEngine().compute_dump("Yahoo", [dict(rows[0], reported_ttm_sales=500)])["AAOI"] == 2.0
+    print(f"✓ TTM系列: {list(series.ttm)[3:]} / 窓計算 {series.window_count}回")
+
+    # 修正再表示は公表日以降のみ反映（それ以前の as-of は初回公表値）
+    store.add_quarter("AAOI", "2025-06-30", 150, "2025-12-01", total_debt=60, cash=30)
+    assert store.series["AAOI"].ttm_asof("2025-11-30") == 500
+    assert store.series["AAOI"].ttm_asof("2025-12-01") == 520
+    assert store.series["AAOI"].last4q_asof("2025-12-01") == [110, 120, 150, 140]
+    assert store.series["AAOI"].ev_series(["2025-08-06", "2025-12-01"], [920, 1000]) == [940.0, 1000.0]
+    try:
+        store.add_quarter("AAOI", "2025-06-30", 150, "2025-08-01")
+        assert False, "初回公表より前の修正は不可"
+    except ValueError:
+        pass
+
+    # 負債/現金の欠測はEV不成立（0扱いしない）、sourceはベンダ名
+    store = TTMSeriesStore("Yahoo")
+    for ticker, balance in [("AAOI", {"total_debt": 50, "cash": 30}), ("LITE", {"total_debt": 0, "cash": 0}),
+                            ("COHR", {"total_debt": 0, "cash": 0}), ("FN", {"cash": 30})]:
+        for period_end, revenue, available in quarters:
+            store.add_quarter(ticker, period_end, revenue, available, **balance)
+    market_caps = {"AAOI": 900, "LITE": 920, "COHR": 1380, "FN": 900}
+    assert math.isnan(store.evs_ttm("FN", "2025-08-05", 900))
+    fields = store.valuation_fields("AAOI", ["LITE", "COHR", "FN"], "2025-08-05", market_caps)
+    assert fields["evs_peer_median_ttm"] == 2.5 and fields["source"] == "Yahoo (Sum(last4Q revenue))"
+    print("✓ 修正再表示の時点管理／負債・現金欠測はNaN")
+
+def test_fx_layer():
+    """為替レイヤのテスト"""
+    print("\n=== テスト: 為替レイヤ（as-of換算） ===")
+
+    from ahf_fx import FXRateStore, load_ticker_currencies
+    from ahf_price_store import PriceSnapshotStore
+
+    assert set(load_ticker_currencies().values()) == {"USD"}
+
+    store = FXRateStore(tempfile.mkdtemp(prefix="ahf_fx_"))
+    store.write_rates({
+        "2025-09-24": {"JPY": 0.0068, "eur": 1.17},
+        "2025-09-25": {"JPY": 0.0067, "EUR": None},
+        "2025-09-26": {"JPY": 0.0066, "EUR": 1.16}
+    })
+
+    with store.open_matrix() as fx:
+        assert fx.rate("USD", "2025-09-27") == 1.0
+        assert fx.rate("EUR", "2025-09-25") == 1.17            # 欠測は直近有効値
+        assert fx.rate("JPY", "2025-09-28") == 0.0066          # 週末は金曜レート
+        assert math.isnan(fx.rate("JPY", "2025-10-20"))        # 鮮度切れ
+        assert fx.convert([1000000, 100], ["JPY", "USD"], "2025-09-26") == [6600.0, 100.0]
+
+        # ADR：時価総額はUSD、財務は円建て
+        rows = [dict(SAMPLE_PRICE_ROWS[0], ticker="XJP", market_cap=1000, market_cap_currency="USD",
+                     total_debt=50000, preferred=0, minority=0, cash=20000, ttm_sales=200000)]
+        normalized = fx.normalize_rows(rows, "2025-09-26", {"XJP": "JPY"})
+        assert normalized[0]["currency"] == "USD" and normalized[0]["market_cap"] == 1000
+        assert abs(normalized[0]["ttm_sales"] - 1320) < 1e-9
+
+        # 通貨不明の銘柄は換算せずNaN（恒等換算しない）
+        unknown = fx.normalize_rows([dict(SAMPLE_PRICE_ROWS[1], ticker="XXX")], "2025-09-26", {"XJP": "JPY"})
+        assert math.isnan(unknown[0]["market_cap"]) and math.isnan(unknown[0]["ttm_sales"])
+        assert unknown[0]["data_gaps"] == ["currency"]
+
+    price_store = PriceSnapshotStore(tempfile.mkdtemp(prefix="ahf_price_store_"))
+    price_store.write_snapshot("2025-09-26", "Yahoo", SAMPLE_PRICE_ROWS[:4] + normalized)
+    with price_store.open_snapshot("2025-09-26", "Yahoo") as snapshot:
+        evs = snapshot.evs_of(["XJP"])[0]
+    assert abs(evs - 1198 / 1320) < 1e-9
+    print(f"✓ 通貨正規化後 EV/S: {evs:.3f}")
+
+def test_s5_batch():
+    """S5バッチエンジンのテスト"""
+    print("\n=== テスト: S5バッチ（EVS_fair / Prem_med / e） ===")
+
+    from ahf_s5_batch import S5BatchEngine, load_default_wacc
+    from ahf_v085_sb_processor import AHFv085Processor
+
+    default_wacc = load_default_wacc()
+    assert default_wacc["PLTR"] == 0.15
+    engine = S5BatchEngine(default_wacc)
+
+    rows = [
+        {"ticker": "AAOI", "opm_fwd": 0.15, "g_fwd": 0.075, "wacc": 0.10, "current_evs": 4.5,
+         "peer_evs": [4.0, 5.0, 4.6]},
+        {"ticker": "PLTR", "opm_fwd": 0.30, "g_fwd": 0.12, "current_evs": 9.0, "peer_evs": [7.0, 8.5]},
+        {"ticker": "WOLF", "opm_fwd": 0.10, "g_fwd": 0.12, "current_evs": 3.0, "peer_evs": [2.0, 3.0]},
+        {"ticker": "NEW", "opm_fwd": 0.10, "g_fwd": 0.05, "wacc": 0.10, "current_evs": 2.0, "peer_evs": []}
+    ]
+    results = engine.compute_rows(rows)
+    assert [r["data_gap"] for r in results] == [False, False, True, True]
+    assert [r["gap_reason"] for r in results][2:] == ["g_fwd≥WACC", "ピア不足"]
+    assert results[1]["wacc"] == 0.15 and results[1]["e_score"] == 0.25
+    assert results[2]["e_score"] is None and math.isnan(results[2]["evs_fair"])
+
+    # 1銘柄処理と同じ e、特異点は data_gap
+    processor = AHFv085Processor()
+    single = processor.process_s5_e_only(dict(rows[0], tax_rate=0.25,
+                                              peers=[{"evs": v} for v in rows[0]["peer_evs"]]))
+    assert single["e_score"] == results[0]["e_score"] == 0.50
+    singular = processor.process_s5_e_only(dict(rows[2], wacc=0.12))
+    assert singular["data_gaps"] == ["g_fwd≥WACC"] and singular["evs_fair_calculation"]["evs_fair"] is None
+    print(f"✓ e-score: {[r['e_score'] for r in results]}")
+
+def test_sensitivity_grid():
+    """感応度グリッドのテスト"""
+    print("\n=== テスト: 感応度グリッド（WACC×g×OPM） ===")
+
+    from ahf_sensitivity import SensitivityEngine, SensitivityGrid
+    from ahf_s5_batch import S5BatchEngine
+
+    rows = [
+        {"ticker": "AAOI", "wacc": 0.10, "g_fwd": 0.075, "opm_fwd": 0.15, "current_evs": 4.5,
+         "peer_evs": [4.0, 5.0, 4.6], "evs_actual_today": 14.6},
+        {"ticker": "LITE", "wacc": 0.30, "g_fwd": 0.05, "opm_fwd": 0.20, "current_evs": 0.6,
+         "peer_evs": [0.6, 0.6], "evs_actual_today": 5.0}
+    ]
+    engine = SensitivityEngine(SensitivityGrid(), s5_engine=S5BatchEngine({}))
+    aaoi, lite = engine.scan(rows)
+
+    assert aaoi["cells"] == 75 and aaoi["base"]["e_score"] == 0.5 and aaoi["base"]["future_stars"] == 4
+    assert aaoi["fragile"] and not lite["fragile"]
+
+    # g_fwd −1pp で ④★4→★3、WACC−2pp・g+2pp は特異点で e が data_gap
+    flips = {(round(f["wacc"], 3), round(f["g_fwd"], 3), round(f["opm_fwd"], 3)): f for f in aaoi["flips"]}
+    assert flips[(0.10, 0.065, 0.15)]["flipped"] == ["future_stars"]
+    assert flips[(0.08, 0.095, 0.15)]["e_score"] is None
+    print(f"✓ 反転セル: {len(aaoi['flips'])}/{aaoi['cells'] - 1} (flip_ratio {aaoi['flip_ratio']:.2f})")
+
+    # g_fwd 2% −2pp → 0.0 は欠測ではなく評価値（★0の偽反転を出さない）
+    flat, = engine.scan([{"ticker": "FLAT", "wacc": 0.30, "g_fwd": 0.02, "opm_fwd": 0.20, "current_evs": 0.6,
+                          "peer_evs": [0.6, 0.6], "evs_actual_today": 5.0}])
+    zero_g = [cell for cell in flat["flips"] if cell["g_fwd"] == 0.0]
+    assert not zero_g and not flat["fragile"]
+    print(f"✓ g_fwd=0.0 セルは反転なし: base ★{flat['base']['future_stars']}")
+
+def test_monte_carlo():
+    """モンテカルロ不確実性伝播のテスト"""
+    print("\n=== テスト: モンテカルロ（ガイダンスレンジ→NES/DI） ===")
+
+    import json
+    from ahf_monte_carlo import MonteCarloEngine, inputs_from_triage, make_sampler
+
+    triage_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tickers", "AAOI", "current", "triage.json")
+    with open(triage_path, 'r', encoding='utf-8') as f:
+        inputs = inputs_from_triage(json.load(f))
+    assert inputs["next_q_guidance"] == {"dist": "uniform", "low": 115.0, "high": 127.0}
+    assert make_sampler("5")(None, 3) == [5.0, 5.0, 5.0]
+
+    # 103→115〜127 は q/q +11.7〜+23.3%、Health_term −1 → NES 4.8〜10.7（中点7.7）
+    inputs.update({"g_fwd": {"dist": "normal", "mean": 0.15, "sd": 0.03}, "gm_expected": 0.30})
+    engine = MonteCarloEngine(samples=4000, seed=7)
+    result = engine.simulate("AAOI", inputs)
+
+    nes = result["nes"]
+    assert abs(sum(nes["star_distribution"].values()) - 1.0) < 1e-9
+    assert nes["star_distribution"][1] == nes["star_distribution"][2] == 0.0
+    assert max(nes["star_distribution"], key=nes["star_distribution"].get) in (4, 5)
+    assert 0.4 < nes["direction_prob"]["up"] < 0.6
+    assert abs(sum(result["di"]["action_prob"].values()) - 1.0) < 1e-9
+    assert engine.simulate("AAOI", inputs) == result    # シード固定で再現
+
+    assert engine.direction_prob("AAOI", "nes", "down") == nes["direction_prob"]["down"]
+    assert engine.direction_prob("LITE", "nes", "up") is None
+    print(f"✓ NES★分布: {nes['star_distribution']} / up {nes['direction_prob']['up']:.2f}")
+
+def test_verdict_table():
+    """Verdict決定表のテスト"""
+    print("\n=== テスト: Verdict決定表 ===")
+
+    from ahf_verdict_table import build_table, verify_table, load_or_build, VerdictTable
+    from ahf_v085_sb_processor import AHFv085Processor
+
+    processor = AHFv085Processor()
+    table = build_table(processor.calculate_verdict_abc)
+    assert len(table.stars) == 6 * 6 * 4 * 4 * 2 * 2
+    assert verify_table(table, processor.calculate_verdict_abc) == []
+    assert table.lookup(4, 4, "Green", 0.50, 0.2, "Low") == (5, "★5 Under (B=Low)")
+    assert table.lookup(7, 4, "Green", 0.50, 0.2, "Low") is None
+    assert table.lookup(4.0, 4.0, "Green", 0.50, 0.2, "Low") == (5, "★5 Under (B=Low)")
+    assert table.lookup(4.5, 4, "Green", 0.50, 0.2, "Low") is None
+    print(f"✓ 全{len(table.stars)}セル一致（verdict {len(table.verdicts)}種）")
+
+    # ルールのハッシュ一致なら保存済みの表、不一致なら再生成
+    path = os.path.join(tempfile.mkdtemp(prefix="ahf_verdict_"), "verdict_table.json")
+    saved = load_or_build(path, processor.calculate_verdict_abc)
+    assert VerdictTable.from_dict(saved.to_dict()).lookup(2, 5, "Green", 0.25, 0.9, "High") == \
+        processor.calculate_verdict_abc(2, 5, "Green", 0.25, 0.9, "High")
+    rebuilt = load_or_build(path, lambda *args: (3, "★3 Neutral"))
+    assert set(rebuilt.verdicts) == {"★3 Neutral"}
+
+    data = {"lec_stars": 2, "nes_stars": 5, "current_color": "Green", "e_score": 0.5, "d_value": 0.7,
+            "visibility_b": "High"}
+    assert AHFv085Processor(verdict_table=table).process_s6_synthesis(data)["verdict"] == \
+        processor.process_s6_synthesis(data)["verdict"]
+    truth = table.truth_table()
+    print(f"✓ 真理値表: {truth[0]}")
+
+def test_position_sizing():
+    """DI一括計算＋サイジングのテスト"""
+    print("\n=== テスト: DI一括計算＋ポジションサイジング ===")
+
+    from itertools import product
+    from ahf_position_sizing import batch_di, PositionSizingEngine, SizingConstraints, load_sectors
+    from ahf_v085_sb_processor import AHFv085Processor
+
+    # 1銘柄版（Red時DI上限0.55含む）と完全一致
+    processor = AHFv085Processor()
+    grid = list(product(range(1, 6), range(1, 6), [1.05, 0.90, 0.75]))
+    di, decisions = batch_di(*zip(*grid))
+    assert [(a, d) for a, d in zip(decisions, di)] == [processor.calculate_di(*args) for args in grid]
+    print(f"✓ calculate_di と一致: {len(grid)}通り")
+
+    sectors = load_sectors()
+    assert sectors["TSLA"] == "Automotive"
+    columns = {
+        "ticker": ["PLTR", "CRDO", "IOT", "FROG", "TSLA", "WOLF"],
+        "lec_stars": [5, 5, 4, 4, 5, 1],
+        "nes_stars": [5, 5, 5, 4, 5, 1],
+        "vmult": [1.05, 1.05, 0.90, 1.05, 1.05, 1.05]
+    }
+    engine = PositionSizingEngine(SizingConstraints(gross_max_pct=3.0, sector_max_pct=2.0, max_names=4), sectors)
+    result = engine.size_book(columns)
+    positions = {p["ticker"]: p for p in result["positions"]}
+    summary = result["summary"]
+
+    assert positions["WOLF"]["action"] == "NO-GO" and positions["WOLF"]["size_pct"] == 0.0
+    assert positions["IOT"]["raw_size_pct"] == 0.0                      # 最大4銘柄でDI最下位を除外
+    assert summary["binding_constraints"] == ["max_names", "sector_max", "gross_max"]
+    assert summary["names"] == 4 and abs(summary["gross_pct"] - 3.0) < 1e-9
+    assert summary["sector_exposure_pct"]["Technology"] <= 2.0 + 1e-9
+    print(f"✓ 配分: { {t: round(p['size_pct'], 3) for t, p in positions.items()} }")
+
+    # tickers.csv 未収録銘柄は1つの "Unknown" セクターに束ねず、data_gap として報告
+    unknown_book = {
+        "ticker": ["ZZZA", "ZZZB"],
+        "lec_stars": [5, 5],
+        "nes_stars": [5, 5],
+        "vmult": [1.05, 1.05]
+    }
+    engine = PositionSizingEngine(SizingConstraints(gross_max_pct=10.0, sector_max_pct=1.5, max_names=4), sectors)
+    result = engine.size_book(unknown_book)
+    sized = [p["size_pct"] for p in result["positions"]]
+    assert result["summary"]["data_gaps"]["sector_unknown"] == ["ZZZA", "ZZZB"]
+    assert "sector_max" not in result["summary"]["binding_constraints"]
+    assert all(p["sector"] is None for p in result["positions"])
+    assert sized == [p["raw_size_pct"] for p in result["positions"]]
+    print(f"✓ セクター不明銘柄は個別扱い: {sized}")
+
+def test_catalyst_ledger():
+    """カタリスト台帳のテスト"""
+    print("\n=== テスト: カタリスト台帳（S4 d差分更新） ===")
+
+    from ahf_catalyst_ledger import CatalystLedger, load_ledger, save_ledger
+    from ahf_v085_sb_processor import AHFv085Processor
+
+    catalysts = [
+        {"id": "C1", "key": "800G量産", "source": "8-K", "impact": "Large", "probability": 0.7,
+         "expected_date": "2026-02-15"},
+        {"id": "C2", "key": "新規顧客", "source": "業界紙", "impact": "Mid", "probability": 0.5, "horizon": "0-6M"},
+        {"id": "C3", "key": "ガイダンス上方修正", "source": "guidance", "impact": "Mid", "probability": 0.6,
+         "expected_date": "2025-12-01"}
+    ]
+    ledger = CatalystLedger("AAOI", asof="2025-06-01")
+    for catalyst in catalysts:
+        ledger.upsert(catalyst)
+
+    # 全件計算（process_s4_d_only）と一致
+    processor = AHFv085Processor()
+    full = processor.process_s4_d_only({"catalysts": [dict(c, horizon=e.horizon) for c, e in
+                                                      zip(catalysts, ledger.entries.values())]})
+    assert abs(ledger.d_calculation()["d"] - full["d_calculation"]["d"]) < 1e-12
+    assert ledger.entries["C1"].horizon == "6-12M" and ledger.entries["C3"].horizon == "0-6M"
+
+    # ソース差し替え・削除は差分更新、同一(source, impact, horizon)はキャッシュ
+    ledger.upsert({"id": "C4", "key": "提携", "source": "業界紙", "impact": "Mid", "horizon": "0-6M"})
+    assert ledger.stats["score_hits"] == 1
+    ledger.upsert({"id": "C2", "source": "IR PR"})
+    ledger.remove("C3")
+    ledger.remove("C4")
+    before = ledger.d_calculation()
+    assert abs(ledger.recompute()["U"] - before["U"]) < 1e-12
+
+    # 夜間繰上げ：C1（2026-02-15）は 2025-08-15 に 6-12M → 0-6M
+    assert ledger.roll_forward("2025-08-14") == []
+    assert ledger.roll_forward("2025-08-16") == ["C1"] and ledger.entries["C1"].H == 1.0
+
+    path = os.path.join(tempfile.mkdtemp(prefix="ahf_ledger_"), "ledger.json")
+    save_ledger(path, ledger)
+    restored = load_ledger(path, "AAOI")
+    assert restored.d_calculation() == ledger.recompute()
+
+    result = AHFv085Processor(catalyst_ledgers={"AAOI": restored}).process_s4_d_only({"ticker": "AAOI"})
+    assert result["d_calculation"] == ledger.d_calculation() and len(result["d_ledger"]) == 2
+    print(f"✓ d差分更新: {ledger.d_calculation()}")
+
+    # id/keyなしのカタリストは内容ハッシュで別行（再投入は同一行）
+    ledger.upsert({"source": "8-K", "impact": "Mid", "horizon": "0-6M", "quote": "capacity expansion"})
+    ledger.upsert({"source": "IR PR", "impact": "Large", "horizon": "6-12M", "quote": "new design win"})
+    ledger.upsert({"source": "8-K", "impact": "Mid", "horizon": "0-6M", "quote": "capacity expansion"})
+    assert len(ledger.entries) == 4 and "" not in ledger.entries
+    # id/keyなしでもソース差し替え・ホライズン変更は同一行を更新（二重計上しない）
+    ledger.upsert({"source": "業界紙", "impact": "Mid", "horizon": "6-12M", "quote": "capacity expansion"})
+    assert len(ledger.entries) == 4
+    assert abs(ledger.d_calculation()["Umax"] - ledger.recompute()["Umax"]) < 1e-12
+    assert [e.source for e in ledger.entries.values() if e.quote == "capacity expansion"] == ["業界紙"]
+
+    # 繰上げ予定ヒープは旧版を除去して有効件数に比例
+    for _ in range(200):
+        ledger.upsert({"id": "C1"})
+    assert len(ledger._transitions) <= 2 * len(ledger.entries) + 16
+    assert ledger.roll_forward("2026-02-16") == []
+    print(f"✓ 内容ハッシュキー／繰上げ予定 {len(ledger._transitions)}件")
+
+def test_source_classifier():
+    """ソース分類サービスのテスト"""
+    print("\n=== テスト: ソース分類サービス（LRU） ===")
+
+    import re
+    from ahf_source_class import SourceClassifier, SourceClass
+    from ahf_v085_sb_processor import AHFv085Processor
+
+    sources = ["Form 8-K 2025-08-07", "10-q filing", "SEC EDGAR full-text", "IR PR: Q2 results",
+               "Investor Relations deck", "Q3 guidance call", "会社ガイダンス", "SEC comment letter",
+               "業界紙", ""]
+    classifier = SourceClassifier(maxsize=8)
+    classes = [classifier.classify(s).source_class for s in sources]
+    assert classes[:3] == [SourceClass.SEC_FORM, SourceClass.SEC_FORM, SourceClass.SEC_OTHER]
+    assert classifier.classify("10-q filing").form_type == "10-Q"
+    assert classes[-3:] == [SourceClass.SEC_OTHER, SourceClass.OTHER, SourceClass.OTHER]
+
+    # 旧実装（都度の正規表現）と一致
+    for source in sources:
+        legacy_cognition = (1.0 if re.search(r'8-K|10-Q|10-K', source, re.IGNORECASE) else
+                            0.75 if re.search(r'IR\s+PR|Investor\s+Relations', source, re.IGNORECASE) else
+                            0.6 if re.search(r'ガイダンス|guidance', source, re.IGNORECASE) else 0.1)
+        legacy_t1 = any(re.search(p, source, re.IGNORECASE) for p in
+                        [r'8-K|10-Q|10-K', r'SEC\s+EDGAR', r'IR\s+PR|Investor\s+Relations', r'ガイダンス|guidance'])
+        assert classifier.cognition_score(source) == legacy_cognition
+        assert classifier.is_t1(source) == legacy_t1
+
+    processor = AHFv085Processor(source_classifier=classifier)
+    assert processor.determine_dual_anchor_status({"t1_sources": sources}) == "CONFIRMED"
+    assert processor.determine_dual_anchor_status({"t1_sources": ["SEC EDGAR"]}) == "PENDING_SEC"
+    info = classifier.cache_info()
+    assert info["size"] <= 8 and info["hits"] > 0
+    print(f"✓ キャッシュ: {info}")
+
+def test_impact_cards():
+    """インパクトカード評価エンジンのテスト"""
+    print("\n=== テスト: インパクトカード評価（安全な式コンパイラ） ===")
+
+    from ahf_safe_expr import compile_expression, ExpressionError
+    from ahf_impact_cards import ImpactCardEngine, load_cards
+
+    cards_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tickers", "AAOI",
+                              "current", "impact_cards.json")
+    cards = load_cards(cards_path)
+    values = {
+        "AAOI": {"Q3_guidance_mid": 121.0, "Q2_actual": 103.0, "Margin_term": 1.0, "Health_term": 0.5,
+                 "A_R_trend": 1, "DOH_trend": "achieved", "CL_trend": 0, "concentration_trend": True,
+                 "fair_band": 5.0, "EVS_today": 3.8},
+        "LITE": {"Q3_guidance_mid": 100.0, "Q2_actual": 100.0, "Margin_term": 0.0, "Health_term": 0.0,
+                 "fair_band": 5.0, "EVS_today": 4.7},
+        "COHR": {"Q3_guidance_mid": 100.0, "Q2_actual": 0.0, "fair_band": 0.0, "EVS_today": 4.0}
+    }
+    engine = ImpactCardEngine()
+    results = engine.evaluate({t: cards for t in values}, values)
+    by_id = {t: {r["id"]: r for r in rows} for t, rows in results.items()}
+
+    nes = 0.5 * ((121.0 - 103.0) / 103.0 * 100) + 1.0 + 0.5
+    assert abs(by_id["AAOI"]["nes_calculation"]["value"] - nes) < 1e-9
+    assert by_id["AAOI"]["nes_calculation"]["trigger"] == "up"
+    assert by_id["AAOI"]["lec_achievement"]["value"] == 3.0
+    assert by_id["AAOI"]["discount_absolute"]["trigger"] == "up"
+    assert by_id["LITE"]["discount_absolute"]["trigger"] == "down"
+    assert by_id["LITE"]["lec_achievement"]["trigger"] == "down"
+    # 0除算・欠測はデータギャップ
+    assert by_id["COHR"]["nes_calculation"]["data_gap"]
+    assert by_id["COHR"]["discount_absolute"]["value"] is None
+    assert "Margin_term" in by_id["COHR"]["nes_calculation"]["missing"]
+    assert engine.get_summary(results)["compiled"] == 3
+    print(f"✓ 評価: {engine.triggers(results)}")
+
+    # 許可されない構文は拒否
+    for text in ["__import__('os').system('ls')", "fair_band.__class__", "[x for x in y]",
+                 "open('f')", "a if b else c", "a ** 2", "a >= 1", "max(a)", "min()", "abs(a, b)"]:
+        try:
+            compile_expression(text)
+            assert False, text
+        except ExpressionError:
+            pass
+    assert compile_expression("avg(a, b)") is compile_expression("avg(a, b)")
+    print("✓ 拒否: 属性・呼出・内包・比較（比較は allow_compare 時のみ）・引数個数")
+
+    # 不正カードは該当銘柄の data_gap 行となり、他カードの評価は継続
+    bad = {"id": "bad_max", "expr": "max(EVS_today)", "gates": {}}
+    results = engine.evaluate({"AAOI": cards + [bad]}, values)
+    rows = {r["id"]: r for r in results["AAOI"]}
+    assert rows["bad_max"]["data_gap"] and "引数の個数" in rows["bad_max"]["error"]
+    assert rows["nes_calculation"]["trigger"] == "up"
+    print("✓ 不正カードは data_gap 行")
+
+def test_s3_tests():
+    """S3テスト実行のテスト"""
+    print("\n=== テスト: S3テスト実行（四則1行） ===")
+
+    from ahf_s3_tests import S3TestRunner
+
+    evidence = {
+        "AAOI": {"guidance_fy26_mid": 2600, "gm_q2": 0.30, "gm_q1": 0.28},
+        "LITE": {"guidance_fy26_mid": 2400, "gm_q2": 0.41},
+        "COHR": {}
+    }
+    cards = [
+        {"id": "S3-001", "ticker": "AAOI", "test_formula": "guidance_fy26_mid >= 2500"},
+        {"id": "S3-001", "ticker": "LITE", "test_formula": "guidance_fy26_mid >= 2500"},
+        {"id": "S3-001", "ticker": "COHR", "test_formula": "guidance_fy26_mid >= 2500"},
+        {"id": "S3-002", "ticker": "AAOI", "test_formula": "(gm_q2 - gm_q1) * 100 >= 1.5"},
+        {"id": "S3-003", "ticker": "LITE", "test_formula": "gm_q2 * 100 = 41", "evidence": {"gm_q2": 0.41}},
+        {"id": "S3-004", "ticker": "AAOI", "test_formula": "guidance_fy26_mid / 1000"},
+        {"id": "S3-005", "ticker": "AAOI", "test_formula": "__import__('os')"},
+        {"id": "S3-006", "ticker": "AAOI", "test_formula": ""}
+    ]
+    runner = S3TestRunner(evidence)
+    results = runner.run_batch(cards)
+
+    assert [r["status"] for r in results] == ["PASS", "FAIL", "DEFER", "PASS", "PASS", "REWRITE", "REWRITE",
+                                             "REWRITE"]
+    assert results[0]["value"] == 2600 and results[0]["threshold"] == 2500 and results[0]["result"] is True
+    assert abs(results[3]["value"] - 2.0) < 1e-9
+    assert results[2]["missing"] == ["guidance_fy26_mid"]
+    # 合否・値はカードへ書き戻し
+    assert cards[1]["test_result"] == "FAIL" and cards[1]["test_value"] == 2400
+    assert runner.get_summary(results) == {"PASS": 3, "FAIL": 1, "DEFER": 1, "REWRITE": 3, "total": 8}
+    # 同一式は1回のみコンパイル
+    assert runner.compile("guidance_fy26_mid >= 2500") is runner.compile(" guidance_fy26_mid >= 2500")
+    assert runner.is_valid("a + b <= c") and not runner.is_valid("a +")
+    print(f"✓ 結果: {runner.get_summary(results)}")
+
+def test_math_guard_panel():
+    """数理ガード パネルモードのテスト"""
+    print("\n=== テスト: 数理ガード パネルモード（CORE/SCREEN） ===")
+
+    from ahf_math_guard_panel import MathGuardPanel
+
+    columns = {
+        "ticker": ["AAOI", "AAOI", "LITE", "COHR"],
+        "quarter": ["2025Q1", "2025Q2", "2025Q2", "2025Q2"],
+        "gm_actual": [0.750, 0.754, 0.750, 0.760],
+        "gm_expected": [0.750, 0.750, 0.750, 0.750],
+        "gp": [150000, 150000, 10000000, 150000],
+        "revenue": [200000, 200000, 0, 200000],
+        "cogs": [50000, 50000, 0, 40000],
+        "opex": [100000, 100000, 4000000, 100000],
+        "ot": [50.0, 45.0, 65.0, 50.0],
+        "erc": [80000, 0, 0, 80000],
+        "da": [20000, 0, 0, 10000]
+    }
+    result = MathGuardPanel().check_panel(columns)
+
+    # 2行目（GM 0.4pp・OT 45）と3行目（GP $10M・GP/OpEx 2.5）は CORE のみ不合格
+    assert result["fail"]["core"] == [False, True, True, True]
+    assert result["fail"]["screen"] == [False, False, False, True]
+    assert result["masks"]["core"]["ot_range"] == [False, True, True, False]
+    assert result["masks"]["screen"]["gp_opex_high"] == [False, False, False, False]
+    assert result["masks"]["core"]["gp_opex_high"] == [False, False, True, False]
+    # メッセージは不合格行のみ（check_batch と同文言）
+    failures = {f["index"]: f["issues"] for f in result["failures"]["core"]}
+    assert sorted(failures) == [1, 2, 3]
+    assert failures[1] == ["GM乖離が閾値を超過: 0.004 > 0.002", "OTが範囲外: 45.0 (範囲: 46.8-61.0)"]
+    assert "GP計算不一致: 実際=150,000, 計算=160,000" in failures[3]
+    assert "OpEx計算不一致: 実際=100,000, 計算=90,000" in failures[3]
+    assert result["summary"]["screen"]["pass_count"] == 3
+    print(f"✓ サマリー: core={result['summary']['core']['fail_count']}件, "
+          f"screen={result['summary']['screen']['fail_count']}件 不合格")
+
+    # update_thresholds 後もパネル経路と行経路は一致（パネルはガードの現在閾値を使う）
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "_archive", "v081_r2"))
+    from ahf_v081_r2_math_guard import AHFv081R2MathGuard, GuardType
+    from ahf_math_guard_panel import rows_to_columns
+
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    assert rows_to_columns(rows)["ot"] == columns["ot"]
+    row_guard = AHFv081R2MathGuard(GuardType.SCREEN)
+    panel_guard = AHFv081R2MathGuard(GuardType.SCREEN, panel=MathGuardPanel())
+    for guard in (row_guard, panel_guard):
+        guard.update_thresholds({"ot_min": 0, "ot_max": 30})
+    by_row = row_guard.check_batch(rows)
+    by_panel = panel_guard.check_batch(rows)
+    assert [r.status for r in by_panel["results"]] == [r.status for r in by_row["results"]]
+    assert [r.message for r in by_panel["results"]] == [r.message for r in by_row["results"]]
+    assert by_panel["summary"]["fail_count"] == by_row["summary"]["fail_count"] == 4
+    print("✓ update_thresholds 後のパネル/行経路一致")
+
+def test_threshold_registry():
+    """閾値レジストリのテスト"""
+    print("\n=== テスト: 閾値レジストリ（不変・版付き） ===")
+
+    from ahf_threshold_registry import get_registry, load_registry, GUARD_SECTIONS
+    from ahf_math_guard_panel import MathGuardPanel, GUARD_THRESHOLDS
+
+    registry = get_registry()
+    assert get_registry() is registry
+    assert registry.get("guards", "residual_gp_usd_max") == 12000000
+    assert registry.get("admission", "ttl_days_max") == 14
+    # 既定のガード閾値は従来のハードコード値と一致
+    assert registry.math_guard_sets() == GUARD_THRESHOLDS
+    assert MathGuardPanel(threshold_registry=registry).thresholds == GUARD_THRESHOLDS
+    assert set(GUARD_SECTIONS.values()) <= set(registry.section_versions)
+
+    # 不変
+    for mutate in (lambda: setattr(registry, "version", "x"),
+                   lambda: registry.section("guards").__setitem__("gm_bps_max_abs", 1)):
+        try:
+            mutate()
+            assert False
+        except (AttributeError, TypeError):
+            pass
+
+    # 閾値変更は該当節の版のみ変わる
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "thresholds.yaml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("guards:\n  gm_bps_max_abs: 30\nadmission:\n  edge_p_min: 60\n")
+        changed = load_registry(path)
+    assert changed.math_guard_thresholds("screen")["gm_deviation_limit"] == 0.003
+    assert changed.version != registry.version
+    assert changed.section_versions["admission"] == registry.section_versions["admission"]
+    assert changed.section_versions["guards"] != registry.section_versions["guards"]
+    print(f"✓ 版: {registry.version} → {changed.version}")
+
+def test_backtest_grid():
+    """帯・DIカットオフのバックテストのテスト"""
+    print("\n=== テスト: 帯・DIカットオフのバックテスト ===")
+
+    from ahf_axis_bands import evaluate_axes
+    from ahf_backtest import BacktestDataset, BacktestEngine, join_outcomes, load_horizon_index
+
+    rows = []
+    for i, (qoq, peer, ret) in enumerate([(12.0, 18.5, 0.30), (2.0, 18.5, -0.10), (6.0, 12.0, 0.05),
+                                          (-4.0, 15.0, -0.20), (9.0, 30.0, 0.12), (1.0, 10.0, 0.02)]):
+        rows.append(dict(SAMPLE_AXIS_INPUTS, ticker=f"T{i}", asof="2025-06-30", next_q_qoq_pct=qoq,
+                         evs_peer_median_ttm=peer, forward_return=ret, benchmark_return=0.05))
+    rows.append(dict(SAMPLE_AXIS_INPUTS, ticker="NA", asof="2025-06-30"))  # 実現リターンなしは除外
+
+    dataset = BacktestDataset(rows)
+    engine = BacktestEngine(dataset)
+    assert len(dataset) == 6
+    actions, future_stars = engine.decisions()
+    assert actions == [evaluate_axes(row)["decision"]["action"] for row in rows[:6]]
+    assert future_stars == [evaluate_axes(row)["future_valuation"]["stars"] for row in rows[:6]]
+
+    baseline = engine.evaluate()
+    assert baseline["go"] + baseline["watch"] + baseline["no_go"] == 6
+    assert abs(baseline["universe_delta_irr_bp"] - 10000 * (0.19 / 6 - 0.05)) < 1e-6
+
+    grid = {"di_go": [0.45, 0.55, 0.65], "di_watch": [0.32, 0.50], "nes_cutoffs": [(0.0, 2.0, 5.0, 8.0),
+                                                                                  (1.0, 3.0, 6.0, 10.0)]}
+    results = engine.grid_search(grid)
+    assert len(results) == 3 * 2 * 2 - 2  # di_watch > di_go の組合せは除外
+    ranked = [r["delta_irr_bp"] for r in results if r["go"] >= 1]
+    assert ranked == sorted(ranked, reverse=True)
+    # 星は軸×カットオフごとに1回のみ計算
+    assert len(dataset._stars) == 1 + 2 + 1
+    print(f"✓ 最良: {results[0]['params']} → ΔIRR {results[0]['delta_irr_bp']:.0f}bp, "
+          f"ヒット率 {results[0]['hit_rate']:.2f}")
+
+    # horizon_index.csv（カタログ事前推定）は実現リターンのない行のみに使う
+    joined = join_outcomes([dict(SAMPLE_AXIS_INPUTS, ticker="WOLF", asof="2025-09-13"),
+                            dict(SAMPLE_AXIS_INPUTS, ticker="WOLF", asof="2025-09-13", forward_return=0.10)],
+                           load_horizon_index())
+    joined_dataset = BacktestDataset(joined)
+    assert joined_dataset.sources == ["estimate", "realized"]
+    assert joined_dataset.excess[0] == 0.035 and abs(joined_dataset.excess[1] - 0.10) < 1e-12
+    print("✓ horizon_index.csv 結合: WOLF 推定ΔIRR 350bp（実現リターン優先）")
+
+def test_snapshot_store():
+    """時点スナップショットストアのテスト"""
+    print("\n=== テスト: 時点スナップショットストア（内容アドレス） ===")
+
+    import shutil
+    from ahf_snapshot_store import SnapshotStore, SNAPSHOT_FILES
+
+    current = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tickers", "AAOI", "current")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SnapshotStore(os.path.join(tmp, "store"))
+        work = os.path.join(tmp, "AAOI")
+        shutil.copytree(current, work)
+
+        manifest_1, recorded = store.capture("AAOI", "2025-09-01", work)
+        assert recorded and store.stats["blobs_written"] == len(SNAPSHOT_FILES)
+        # 同一内容は記録せず、別銘柄でも同一ブロブを再利用
+        assert store.capture("AAOI", "2025-09-05", work) == (manifest_1, False)
+        assert store.capture("LITE", "2025-09-05", work)[0] == manifest_1
+        assert store.stats["blobs_written"] == len(SNAPSHOT_FILES)
+
+        with open(os.path.join(work, "C.yaml"), "a", encoding="utf-8") as f:
+            f.write("# revised\n")
+        manifest_2, _ = store.capture("AAOI", "2025-09-10", work)
+        assert manifest_2 != manifest_1 and store.stats["blobs_written"] == len(SNAPSHOT_FILES) + 1
+
+        # D時点のチェックアウト
+        assert store.checkout("AAOI", "2025-08-31") is None
+        assert store.checkout("AAOI", "2025-09-09").manifest_id == manifest_1
+        assert store.checkout("AAOI", "2025-09-10").manifest_id == manifest_2
+        assert store.checkout("AAOI", "2026-01-01").text("C.yaml").endswith("# revised\n")
+        assert store.checkout("AAOI", "2025-09-01").json("impact_cards.json")["cards"][0]["id"] == "nes_calculation"
+
+        # 遡及保存・上書き（同一内容が続く変更は冗長として除去）
+        store.capture("AAOI", "2025-08-01", work)
+        assert store.dates("AAOI") == ["2025-08-01", "2025-09-01", "2025-09-10"]
+        assert store.checkout("AAOI", "2025-08-15").manifest_id == manifest_2
+        store.capture("AAOI", "2025-09-01", work)
+        assert store.dates("AAOI") == ["2025-08-01"]
+
+        # 別プロセス相当：refs から復元
+        reopened = SnapshotStore(os.path.join(tmp, "store"))
+        assert reopened.dates("LITE") == ["2025-09-05"]
+        assert reopened.checkout("LITE", "2025-12-31").read("facts.md") == store.read_blob(
+            store.manifest(manifest_1)["facts.md"])
+        print(f"✓ 重複排除: {store.stats}")
+
+def main():
+    """メインテスト実行"""
+    print("=== AHF エンジン群テストスイート ===")
+    print(f"実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print()
+
+    tests = [
+        ("近似重複検出", test_near_dup),
+        ("T1*独立性グラフ", test_independence_graph),
+        ("矛盾検出エンジン", test_contradiction_index),
+        ("依存追跡型再計算", test_dependency_graph),
+        ("スナップショット差分Deltaカード", test_snapshot_diff),
+        ("列指向価格スナップショットストア", test_price_store),
+        ("ベンダ別EV/S計算エンジン", test_vendor_evs),
+        ("取引所カレンダー", test_trading_calendar),
+        ("ピア中央値エンジン", test_peer_median),
+        ("列指向Price-Lint", test_price_lint_table),
+        ("四半期時系列TTM", test_ttm_series),
+        ("為替レイヤ", test_fx_layer),
+        ("S5バッチエンジン", test_s5_batch),
+        ("感応度グリッド", test_sensitivity_grid),
+        ("モンテカルロ不確実性伝播", test_monte_carlo),
+        ("Verdict決定表", test_verdict_table),
+        ("DI一括計算＋サイジング", test_position_sizing),
+        ("カタリスト台帳", test_catalyst_ledger),
+        ("ソース分類サービス", test_source_classifier),
+        ("インパクトカード評価", test_impact_cards),
+        ("S3テスト実行", test_s3_tests),
+        ("数理ガード パネルモード", test_math_guard_panel),
+        ("閾値レジストリ", test_threshold_registry),
+        ("帯・DIカットオフのバックテスト", test_backtest_grid),
+        ("時点スナップショットストア", test_snapshot_store),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"✗ {test_name}: テスト実行エラー - {e}")
+            results.append((test_name, False))
+
+    # 結果サマリー
+    print("\n=== テスト結果サマリー ===")
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "✓ PASS" if result else "✗ FAIL"
+        print(f"{status}: {test_name}")
+
+    print(f"\n総合結果: {passed}/{len(results)} テスト通過")
+    return 0 if passed == len(results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())